@@ -5,15 +5,27 @@ Autor: Ing. Edson Pérez
 Versión: 2.5
 """
 
+import importlib
+import time
+
 import streamlit as st
-from auth.login import mostrar_acceso, verificar_sesion
+from auth.login import es_administrador, mostrar_acceso, verificar_sesion
+from auth.sesion import mostrar_avisos, token_acceso
+from components.depuracion import mostrar_panel_depuracion
 from components.sidebar import mostrar_sidebar
-from modules.dashboard import mostrar_dashboard
-from modules.muestreo import mostrar_muestreo
-"""from modules.slump import mostrar_slump"""
-"""from modules.probetas import mostrar_probetas"""
-"""from modules.reportes import mostrar_reportes"""
 from database.supabase_client import inicializar_supabase
+from database.tiempo_real import iniciar_tiempo_real
+from utils.perfilador import DIRECCION_METRICAS, iniciar_rerun, iniciar_servidor_metricas, medir, perfilado, registrar
+
+# Registro de módulos: opción del menú -> (módulo, función de renderizado)
+# Los módulos se importan recién cuando se eligen por primera vez
+MODULOS = {
+    "🏠 Inicio": ("modules.dashboard", "mostrar_dashboard"),
+    "📊 Registro de Muestreo": ("modules.muestreo", "mostrar_muestreo"),
+    "🎯 Ensayo de Slump": ("modules.slump", "mostrar_slump"),
+    "🧪 Probetas en Laboratorio": ("modules.probetas", "mostrar_probetas"),
+    "📈 Reportes y Estadísticas": ("modules.reportes", "mostrar_reportes")
+}
 
 # Configuración de página
 st.set_page_config(
@@ -24,6 +36,7 @@ st.set_page_config(
 )
 
 # Estilos CSS globales
+@perfilado()
 def cargar_estilos():
     """Carga los estilos CSS personalizados de la aplicación"""
     estilo_personalizado = """
@@ -53,10 +66,64 @@ def cargar_estilos():
     """
     st.markdown(estilo_personalizado, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def cargar_modulo(opcion):
+    """
+    Importa el módulo de una opción del menú (una sola vez por proceso)
+    
+    Args:
+        opcion (str): Opción del menú principal
+    
+    Returns:
+        tuple: (función de renderizado, segundos que tomó la importación)
+    """
+    nombre_modulo, nombre_funcion = MODULOS[opcion]
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nombre_modulo)
+    tiempo_importacion = time.perf_counter() - inicio
+    registrar('importacion', opcion, tiempo_importacion)
+    return getattr(modulo, nombre_funcion), tiempo_importacion
+
+def renderizar_modulo(opcion, supabase):
+    """
+    Renderiza el módulo elegido midiendo su tiempo en el perfilador
+    
+    Args:
+        opcion (str): Opción del menú principal
+        supabase: Cliente de Supabase
+    """
+    mostrar, _ = cargar_modulo(opcion)
+    
+    with medir('modulo', opcion):
+        mostrar(supabase)
+
+def iniciar_metricas():
+    """
+    Expone /metrics para Prometheus si [metricas] puerto está en los secretos
+
+    [metricas] direccion cambia la interfaz (por defecto 127.0.0.1) y
+    [metricas] token exige 'Authorization: Bearer <token>'.
+    """
+    try:
+        config = st.secrets.get("metricas", {})
+    except Exception:
+        config = {}
+    if config.get("puerto"):
+        iniciar_servidor_metricas(
+            config["puerto"],
+            config.get("direccion", DIRECCION_METRICAS),
+            config.get("token")
+        )
+
 # Inicialización de la aplicación
+@perfilado()
 def main():
     """Función principal que controla el flujo de la aplicación"""
     
+    # Perfil del rerun y endpoint de métricas
+    iniciar_rerun()
+    iniciar_metricas()
+    
     # Cargar estilos
     cargar_estilos()
     
@@ -64,13 +131,22 @@ def main():
     supabase = inicializar_supabase()
     
     # Verificar estado de sesión
-    if not verificar_sesion():
+    sesion_activa = verificar_sesion(supabase)
+    
+    # Avisos pendientes (acceso, cierre de sesión, vencimiento)
+    mostrar_avisos()
+    
+    if not sesion_activa:
         # Usuario no autenticado - mostrar pantalla de login
         mostrar_acceso(supabase)
     else:
+        # Cambios en tiempo real (una suscripción por proceso, si está habilitada)
+        iniciar_tiempo_real(token_acceso())
+        
         # Usuario autenticado - mostrar aplicación principal
         mostrar_aplicacion(supabase)
 
+@perfilado()
 def mostrar_aplicacion(supabase):
     """Renderiza la aplicación principal después del login"""
     
@@ -94,29 +170,18 @@ def mostrar_aplicacion(supabase):
     # Menú de navegación principal
     modulo = st.selectbox(
         "🔧 Selecciona un Módulo:",
-        [
-            "🏠 Inicio",
-            "📊 Registro de Muestreo",
-            "🎯 Ensayo de Slump",
-            "🧪 Probetas en Laboratorio",
-            "📈 Reportes y Estadísticas"
-        ],
+        list(MODULOS),
         key="menu_principal"
     )
     
     st.divider()
     
     # Router - Renderiza el módulo seleccionado
-    if modulo == "🏠 Inicio":
-        mostrar_dashboard(supabase)
-    elif modulo == "📊 Registro de Muestreo":
-        mostrar_muestreo(supabase)
-    elif modulo == "🎯 Ensayo de Slump":
-        mostrar_slump(supabase)
-    elif modulo == "🧪 Probetas en Laboratorio":
-        mostrar_probetas(supabase)
-    elif modulo == "📈 Reportes y Estadísticas":
-        mostrar_reportes(supabase)
+    renderizar_modulo(modulo, supabase)
+    
+    # Tiempos por etapa y consulta (solo administradores)
+    if es_administrador():
+        mostrar_panel_depuracion()
 
 # Punto de entrada de la aplicación
 if __name__ == "__main__":
@@ -4,19 +4,48 @@ Maneja login, registro y cambio de contraseña
 """
 
 import streamlit as st
-import time
+from auth.sesion import avisar, cerrar_en_segundo_plano, guardar_sesion, olvidar_sesion, sesion_vigente, token_acceso
+from database.supabase_client import liberar_cliente_sesion
 
-def verificar_sesion():
+def verificar_sesion(supabase):
     """
     Verifica si existe una sesión activa
     
+    El token se valida localmente y se renueva en segundo plano antes de vencer.
+    
+    Args:
+        supabase: Cliente de Supabase
+    
     Returns:
         bool: True si hay sesión activa, False en caso contrario
     """
     if 'usuario' not in st.session_state:
         st.session_state['usuario'] = None
     
-    return st.session_state['usuario'] is not None
+    return sesion_vigente(supabase)
+
+def es_administrador():
+    """
+    Verifica si el usuario actual es administrador
+    
+    Es administrador si su app_metadata tiene role = 'admin' o si su correo
+    figura en la lista [admin] correos de los secretos.
+    
+    Returns:
+        bool: True si el usuario tiene permisos de administrador
+    """
+    usuario = st.session_state.get('usuario')
+    if usuario is None:
+        return False
+    
+    if (getattr(usuario, 'app_metadata', None) or {}).get('role') == 'admin':
+        return True
+    
+    try:
+        correos = st.secrets.get("admin", {}).get("correos", [])
+    except Exception:
+        correos = []
+    return usuario.email in correos
 
 def mostrar_acceso(supabase):
     """
@@ -77,12 +106,13 @@ def autenticar_usuario(supabase, email, password):
             "email": email,
             "password": password
         })
-        st.session_state['usuario'] = response.user
-        st.success("✅ Acceso autorizado")
-        time.sleep(1)
-        st.rerun()
     except Exception as e:
         st.error("❌ Usuario o contraseña incorrectos")
+        return
+    
+    guardar_sesion(response.session, supabase)
+    avisar("Acceso autorizado", "✅")
+    st.rerun()
 
 def renderizar_registro(supabase):
     """
@@ -237,12 +267,11 @@ def cambiar_password(supabase, email, otp_code, new_password, confirm_password):
             update_response = supabase.auth.update_user({"password": new_password})
             
             if update_response.user:
-                st.success("🎉 ¡Contraseña actualizada exitosamente!")
-                st.info("Ahora puedes iniciar sesión con tu nueva contraseña.")
+                avisar("¡Contraseña actualizada exitosamente! Ahora puedes iniciar sesión con tu nueva contraseña.", "🎉")
                 
                 # Cerrar sesión temporal
-                supabase.auth.sign_out()
-                time.sleep(3)
+                cerrar_en_segundo_plano(supabase, response.session.access_token if response.session else None)
+                liberar_cliente_sesion()
                 st.rerun()
             else:
                 st.error("Error al actualizar la contraseña.")
@@ -256,8 +285,8 @@ def cerrar_sesion(supabase):
     Args:
         supabase: Cliente de Supabase
     """
-    supabase.auth.sign_out()
-    st.session_state['usuario'] = None
-    st.success("Sesión cerrada")
-    time.sleep(1)
+    cerrar_en_segundo_plano(supabase, token_acceso())
+    liberar_cliente_sesion()
+    olvidar_sesion()
+    avisar("Sesión cerrada", "👋")
     st.rerun()
\ No newline at end of file
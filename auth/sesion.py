@@ -0,0 +1,242 @@
+"""
+Sesión de autenticación
+Guarda los tokens en la sesión, valida el JWT localmente y lo renueva en segundo plano
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# Claves en session_state
+CLAVE_SESION = 'sesion_auth'
+CLAVE_RENOVACION = '_renovacion_auth'
+CLAVE_CLIENTE = '_cliente_auth'
+CLAVE_AVISOS = '_avisos_auth'
+
+# Segundos antes del vencimiento en que se pide un token nuevo en segundo plano
+MARGEN_RENOVACION = 5 * 60
+
+# Hilos para renovaciones y cierres de sesión, compartidos por todo el proceso
+MAX_HILOS_AUTH = 4
+
+@st.cache_resource(show_spinner=False)
+def obtener_ejecutor_auth():
+    """
+    Crea el pool de hilos de autenticación compartido por todo el proceso
+
+    Returns:
+        ThreadPoolExecutor: Ejecutor de llamadas de autenticación
+    """
+    return ThreadPoolExecutor(max_workers=MAX_HILOS_AUTH, thread_name_prefix='auth')
+
+def _base64url(texto):
+    """Decodifica base64url sin relleno"""
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+def decodificar_jwt(token, secreto=None):
+    """
+    Decodifica un JWT sin llamar a Supabase
+
+    Si se indica el secreto del proyecto y el token es HS256 se verifica
+    la firma; de lo contrario solo se leen los claims. En ambos casos
+    Supabase vuelve a verificar la firma en cada consulta.
+
+    Args:
+        token (str): Access token
+        secreto (str, optional): JWT secret del proyecto
+
+    Returns:
+        dict: Claims del token, o None si es inválido
+    """
+    try:
+        encabezado, carga, firma = token.split('.')
+        cabecera = json.loads(_base64url(encabezado))
+        claims = json.loads(_base64url(carga))
+    except (AttributeError, ValueError):
+        return None
+
+    if secreto and cabecera.get('alg') == 'HS256':
+        esperada = hmac.new(secreto.encode(), f"{encabezado}.{carga}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(esperada, _base64url(firma)):
+            return None
+
+    return claims if isinstance(claims, dict) and 'exp' in claims else None
+
+def _secreto_jwt():
+    """Retorna el JWT secret configurado en los secretos, si existe"""
+    try:
+        return st.secrets["supabase"].get("jwt_secret")
+    except Exception:
+        return None
+
+def guardar_sesion(sesion, supabase=None):
+    """
+    Guarda en session_state el usuario y los tokens de una sesión de Supabase
+
+    Args:
+        sesion (Session): Sesión devuelta por Supabase Auth
+        supabase (Client, optional): Cliente que ya tiene la sesión cargada
+    """
+    st.session_state['usuario'] = sesion.user
+    st.session_state[CLAVE_SESION] = {
+        'access_token': sesion.access_token,
+        'refresh_token': sesion.refresh_token
+    }
+    if supabase is not None:
+        st.session_state[CLAVE_CLIENTE] = id(supabase)
+
+def token_acceso():
+    """
+    Retorna el access token de la sesión actual
+
+    Returns:
+        str: Access token, o None si no hay sesión
+    """
+    tokens = st.session_state.get(CLAVE_SESION)
+    return tokens['access_token'] if tokens else None
+
+def identidad_sesion():
+    """
+    Retorna el usuario autenticado de la sesión actual (claim sub del token)
+
+    Las políticas RLS filtran los datos por este usuario: lo que se guarda
+    a nivel de proceso (caché, KPIs) se separa por identidad.
+
+    Returns:
+        str: ID del usuario, o None si no hay sesión
+    """
+    token = token_acceso()
+    claims = decodificar_jwt(token) if token else None
+    return claims.get('sub') if claims else None
+
+def olvidar_sesion():
+    """Elimina el usuario y los tokens de la sesión actual"""
+    st.session_state['usuario'] = None
+    for clave in (CLAVE_SESION, CLAVE_RENOVACION, CLAVE_CLIENTE):
+        st.session_state.pop(clave, None)
+
+def avisar(mensaje, icono=None):
+    """
+    Deja un aviso para mostrar en el próximo rerun (ej: tras st.rerun)
+
+    Args:
+        mensaje (str): Texto del aviso
+        icono (str, optional): Emoji del aviso
+    """
+    st.session_state.setdefault(CLAVE_AVISOS, []).append((mensaje, icono))
+
+def mostrar_avisos():
+    """Muestra y descarta los avisos pendientes de la sesión"""
+    for mensaje, icono in st.session_state.pop(CLAVE_AVISOS, []):
+        st.toast(mensaje, icon=icono)
+
+def renovar_en_segundo_plano(supabase):
+    """
+    Pide un token nuevo sin bloquear el rerun
+
+    El resultado se aplica en el siguiente rerun (ver sesion_vigente).
+
+    Args:
+        supabase: Cliente de Supabase de la sesión
+    """
+    if CLAVE_RENOVACION in st.session_state:
+        return
+    refresh_token = st.session_state[CLAVE_SESION]['refresh_token']
+    st.session_state[CLAVE_RENOVACION] = obtener_ejecutor_auth().submit(
+        supabase.auth.refresh_session, refresh_token
+    )
+
+def cerrar_en_segundo_plano(supabase, access_token):
+    """
+    Revoca una sesión en Supabase sin esperar la respuesta
+
+    La solicitud lleva una copia del access token y no usa la sesión del
+    cliente: cuando salga, el cliente puede tener ya otro ingreso, y el
+    alcance 'local' revoca solo la sesión de ese token.
+
+    Args:
+        supabase: Cliente de Supabase
+        access_token (str): Access token de la sesión a cerrar
+    """
+    if access_token:
+        obtener_ejecutor_auth().submit(supabase.auth.admin.sign_out, access_token, 'local')
+
+def _aplicar_renovacion(esperar=False):
+    """
+    Aplica el resultado de una renovación en segundo plano ya terminada
+
+    Args:
+        esperar (bool): Esperar a que termine si sigue en curso
+
+    Returns:
+        bool: False si la renovación falló
+    """
+    futuro = st.session_state.get(CLAVE_RENOVACION)
+    if futuro is None or not (esperar or futuro.done()):
+        return True
+    del st.session_state[CLAVE_RENOVACION]
+    try:
+        respuesta = futuro.result()
+    except Exception:
+        return False
+    if respuesta.session:
+        guardar_sesion(respuesta.session)
+    return True
+
+def sesion_vigente(supabase):
+    """
+    Verifica la sesión del usuario sin llamar a Supabase en el caso normal
+
+    El access token se valida localmente. Cuando le quedan menos de
+    MARGEN_RENOVACION segundos se renueva en segundo plano; solo si ya
+    venció (por ejemplo, tras dejar la pestaña abierta) la renovación
+    bloquea el rerun, esperando primero la que ya esté en curso.
+
+    Args:
+        supabase: Cliente de Supabase de la sesión
+
+    Returns:
+        bool: True si hay una sesión válida
+    """
+    tokens = st.session_state.get(CLAVE_SESION)
+    if st.session_state.get('usuario') is None or tokens is None:
+        return False
+
+    renovada = _aplicar_renovacion()
+    tokens = st.session_state[CLAVE_SESION]
+    claims = decodificar_jwt(tokens['access_token'], _secreto_jwt())
+    if claims is None:
+        olvidar_sesion()
+        return False
+
+    restante = claims['exp'] - time.time()
+    if restante <= 0 and CLAVE_RENOVACION in st.session_state:
+        # La renovación en curso ya envió el refresh token: se espera su resultado
+        # en lugar de enviarlo otra vez (el segundo uso sería rechazado)
+        renovada = _aplicar_renovacion(esperar=True)
+        tokens = st.session_state[CLAVE_SESION]
+        claims = decodificar_jwt(tokens['access_token'], _secreto_jwt())
+        restante = claims['exp'] - time.time() if claims else 0
+    try:
+        if restante <= 0:
+            guardar_sesion(supabase.auth.refresh_session(tokens['refresh_token']).session, supabase)
+        elif restante < MARGEN_RENOVACION and renovada:
+            renovar_en_segundo_plano(supabase)
+
+        # Un cliente nuevo del pool (creado o descartado por inactividad) no tiene la sesión
+        if st.session_state.get(CLAVE_CLIENTE) != id(supabase):
+            if supabase.auth.get_session() is None:
+                tokens = st.session_state[CLAVE_SESION]
+                supabase.auth.set_session(tokens['access_token'], tokens['refresh_token'])
+            st.session_state[CLAVE_CLIENTE] = id(supabase)
+    except Exception:
+        olvidar_sesion()
+        avisar("Tu sesión expiró. Ingresa nuevamente.", "🔒")
+        return False
+
+    return True
@@ -0,0 +1,158 @@
+"""
+Datos sintéticos para benchmarks
+Genera muestreos y roturas reproducibles con la forma de los datos de obra
+"""
+
+import random
+import uuid
+from datetime import date, timedelta
+
+from utils.helpers import generar_codigo_muestra, generar_codigo_probeta
+
+PROYECTOS = [f"Edificio {nombre}" for nombre in ("Los Álamos", "Miraflores", "San Isidro", "La Molina", "Surco", "Barranco")]
+ELEMENTOS = ["Zapata", "Columna", "Viga", "Losa", "Muro", "Placa", "Escalera"]
+PROVEEDORES = ["UNICON", "Mixercon", "Supermix", "Concremax", "Dino"]
+RESPONSABLES = ["J. Quispe", "M. Rojas", "L. Huamán", "C. Flores", "R. Vargas"]
+OBSERVACIONES = ["", "", "", "Segregación leve en descarga", "Retraso en llegada del mixer", "Se añadió aditivo en obra"]
+RESISTENCIAS = [175, 210, 245, 280, 350]
+
+# Días hacia atrás que cubren las fechas de vaciado
+DIAS_HISTORIAL = 365
+
+# Fracción de muestreos con resultados de rotura (acotada para los datasets grandes)
+FRACCION_ROTURAS = 0.2
+MAX_MUESTREOS_CON_ROTURAS = 20000
+
+def generar_muestreos(cantidad, semilla=0, hoy=None):
+    """
+    Genera muestreos sintéticos
+
+    Args:
+        cantidad (int): Número de muestreos
+        semilla (int): Semilla para que el dataset sea reproducible
+        hoy (date, optional): Fecha de referencia (por defecto hoy)
+
+    Yields:
+        dict: Un muestreo con las columnas de la tabla
+    """
+    azar = random.Random(semilla)
+    hoy = hoy or date.today()
+    consecutivos = {}
+
+    for _ in range(cantidad):
+        # Más muestreos recientes que antiguos, y algunos de hoy para los KPIs
+        fecha = hoy - timedelta(days=min(int(azar.expovariate(1 / 60)), DIAS_HISTORIAL))
+        proyecto = azar.choice(PROYECTOS)
+        consecutivo = consecutivos[fecha] = consecutivos.get(fecha, 0) + 1
+        codigo = generar_codigo_muestra(fecha, consecutivo)
+        elemento = azar.choice(ELEMENTOS)
+
+        yield {
+            'id_local': str(uuid.UUID(int=azar.getrandbits(128))),
+            'proyecto': proyecto,
+            'elemento': elemento,
+            'ubicacion': f"{elemento} eje {azar.choice('ABCDEFG')}-{azar.randint(1, 12)}, piso {azar.randint(1, 20)}",
+            'fecha_vaciado': fecha.isoformat(),
+            'hora_vaciado': f"{azar.randint(7, 17):02d}:{azar.choice(('00', '15', '30', '45'))}",
+            'temperatura': round(azar.uniform(14, 30), 1),
+            'fc_diseno': azar.choice(RESISTENCIAS),
+            'slump_especificado': azar.choice((3.0, 4.0, 5.0, 6.0)),
+            'tipo_cemento': azar.choice(("Tipo I", "Tipo V", "Tipo HS")),
+            'tamano_max_agregado': azar.choice(('1/2"', '3/4"', '1"')),
+            'relacion_ac': round(azar.uniform(0.45, 0.60), 2),
+            'aditivo': azar.choice(("", "Plastificante", "Acelerante")),
+            'proveedor': azar.choice(PROVEEDORES),
+            'guia_remision': f"{azar.randint(1, 9):03d}-{azar.randint(1, 99999):05d}",
+            'num_camion': f"{azar.choice('ABCDXZ')}{azar.randint(1, 9)}{azar.choice('ABCDXZ')}-{azar.randint(100, 999)}",
+            'volumen_pedido': float(azar.choice((4, 6, 8))),
+            'hora_salida_planta': f"{azar.randint(6, 15):02d}:{azar.randint(0, 59):02d}",
+            'hora_llegada_obra': f"{azar.randint(7, 16):02d}:{azar.randint(0, 59):02d}",
+            'codigo_muestra': codigo,
+            'probetas': [generar_codigo_probeta(codigo, letra) for letra in "ABC"],
+            'diametro_cm': 15.0,
+            'altura_cm': 30.0,
+            'edad_7': True,
+            'edad_28': True,
+            'otra_edad': 0,
+            'observaciones': azar.choice(OBSERVACIONES),
+            'responsable_muestreo': azar.choice(RESPONSABLES),
+            'hora_moldeo': f"{azar.randint(7, 17):02d}:{azar.randint(0, 59):02d}",
+            'usuario': "benchmark@concreto5.local"
+        }
+
+def generar_roturas(muestreos, semilla=0, hoy=None):
+    """
+    Genera roturas a 7 y 28 días para parte de los muestreos ya ensayables
+
+    Args:
+        muestreos (list): Muestreos generados
+        semilla (int): Semilla del generador
+        hoy (date, optional): Fecha de referencia (por defecto hoy)
+
+    Yields:
+        dict: Una rotura con las columnas de la tabla
+    """
+    azar = random.Random(semilla + 1)
+    hoy = hoy or date.today()
+    con_roturas = 0
+
+    for muestreo in muestreos:
+        if con_roturas >= MAX_MUESTREOS_CON_ROTURAS:
+            return
+        if azar.random() > FRACCION_ROTURAS:
+            continue
+        con_roturas += 1
+        vaciado = date.fromisoformat(muestreo['fecha_vaciado'])
+
+        for edad, madurez in ((7, 0.70), (28, 1.0)):
+            fecha_ensayo = vaciado + timedelta(days=edad)
+            if fecha_ensayo > hoy:
+                continue
+            for codigo_probeta in muestreo['probetas'][:2 if edad == 7 else 3]:
+                resistencia = round(muestreo['fc_diseno'] * madurez * azar.gauss(1.12, 0.09), 1)
+                yield {
+                    'codigo_probeta': f"{codigo_probeta}-{edad}-{muestreo['id_local'][:8]}",
+                    'codigo_muestra': muestreo['codigo_muestra'],
+                    'proyecto': muestreo['proyecto'],
+                    'proveedor': muestreo['proveedor'],
+                    'fc_diseno': muestreo['fc_diseno'],
+                    'edad_dias': edad,
+                    'fecha_ensayo': fecha_ensayo.isoformat(),
+                    'carga_kg': round(resistencia * 176.7, 0),
+                    'resistencia': resistencia,
+                    'usuario': "benchmark@concreto5.local"
+                }
+
+def sembrar(base, cantidad, semilla=0, dias_pendientes=3):
+    """
+    Llena una base falsa con un dataset sintético
+
+    Los ensayos programados los crea el trigger de muestreos; se marcan
+    como completados los que vencieron hace más de `dias_pendientes` días,
+    como en una obra al día con sus roturas. Conviene sembrar con la
+    latencia de la base en cero.
+
+    Args:
+        base (BaseFalsa): Base de destino
+        cantidad (int): Número de muestreos
+        semilla (int): Semilla del generador
+        dias_pendientes (int): Días de atraso que se dejan pendientes
+    """
+    hoy = date.today()
+    lote = []
+    muestra_roturas = []
+    for muestreo in generar_muestreos(cantidad, semilla, hoy):
+        lote.append(muestreo)
+        if len(muestra_roturas) < MAX_MUESTREOS_CON_ROTURAS / FRACCION_ROTURAS:
+            muestra_roturas.append(muestreo)
+        if len(lote) >= 10000:
+            base.insertar_masivo('muestreos', lote)
+            lote = []
+    if lote:
+        base.insertar_masivo('muestreos', lote)
+
+    base.insertar_masivo('roturas', generar_roturas(muestra_roturas, semilla, hoy))
+    base.ejecutar(
+        "UPDATE ensayos_programados SET completado = 1 WHERE fecha_programada < ?",
+        ((hoy - timedelta(days=dias_pendientes)).isoformat(),)
+    )
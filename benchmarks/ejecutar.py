@@ -0,0 +1,188 @@
+"""
+Benchmark de la aplicación
+Ejecuta cada página con AppTest sobre una base local con latencia simulada
+
+Uso:
+    python -m benchmarks.ejecutar --filas 1000 100000 --latencia 0.03 --reruns 5
+    python -m benchmarks.ejecutar --filas 10000 --sesiones 8 --json resultados.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import database.supabase_client as supabase_client
+from benchmarks.datos_sinteticos import sembrar
+from benchmarks.sesion import conectar_base, ejecutar_rerun, nueva_sesion, sesion_en_proceso
+from benchmarks.supabase_falso import BaseFalsa
+from database.metricas import obtener_acumulador_kpis
+
+# Páginas medidas: nombre -> opción del menú (None = pantalla de acceso)
+PAGINAS = {
+    "Acceso": None,
+    "Inicio": "🏠 Inicio",
+    "Muestreo": "📊 Registro de Muestreo",
+    "Slump": "🎯 Ensayo de Slump",
+    "Probetas": "🧪 Probetas en Laboratorio",
+    "Reportes": "📈 Reportes y Estadísticas"
+}
+
+def instalar_base(filas, latencia):
+    """
+    Crea y siembra la base local y la conecta en lugar de Supabase
+
+    Args:
+        filas (int): Muestreos del dataset
+        latencia (float): Segundos de latencia por consulta
+
+    Returns:
+        tuple: (BaseFalsa, segundos que tomó sembrar)
+    """
+    base = BaseFalsa()
+    inicio = time.perf_counter()
+    sembrar(base, filas)
+    segundos = time.perf_counter() - inicio
+    base.latencia = latencia
+    conectar_base(base)
+    vaciar_caches()
+    return base, segundos
+
+def vaciar_caches():
+    """Descarta la caché de consultas y los KPIs acumulados del proceso"""
+    cache = supabase_client.obtener_cache()
+    for tabla in ('muestreos', 'ensayos_programados', 'resumen_resistencias'):
+        cache.invalidar_tabla(tabla)
+    obtener_acumulador_kpis().invalidar()
+
+def medir_pagina(base, opcion, reruns):
+    """
+    Mide una página en frío (sin caché) y en caliente
+
+    Args:
+        base (BaseFalsa): Base local
+        opcion (str): Opción del menú o None
+        reruns (int): Reruns en caliente
+
+    Returns:
+        dict: Latencias en ms, consultas por rerun y memoria pico en MB
+    """
+    vaciar_caches()
+    at = nueva_sesion(opcion)
+    frio, consultas_frio = ejecutar_rerun(at, base)
+
+    calientes = [ejecutar_rerun(at, base) for _ in range(reruns)]
+    tiempos = sorted(t for t, _ in calientes)
+
+    # La memoria se mide aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    ejecutar_rerun(at, base)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'frio_ms': frio * 1000,
+        'caliente_ms': statistics.median(tiempos) * 1000,
+        'p95_ms': tiempos[min(len(tiempos) - 1, int(0.95 * len(tiempos)))] * 1000,
+        'consultas_frio': consultas_frio,
+        'consultas_caliente': statistics.median(c for _, c in calientes),
+        'memoria_mb': pico / 2 ** 20
+    }
+
+def carga_concurrente(base, opcion, sesiones, reruns):
+    """
+    Ejecuta varias sesiones en paralelo sobre la misma página
+
+    Cada sesión corre en su propio proceso con su propia caché, como
+    varios inspectores usando réplicas de la aplicación a la vez.
+
+    Args:
+        base (BaseFalsa): Base local
+        opcion (str): Opción del menú
+        sesiones (int): Sesiones simultáneas
+        reruns (int): Reruns por sesión (tras uno inicial que no se mide)
+
+    Returns:
+        dict: Reruns por segundo y latencias mediana y p95 en ms
+    """
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = str(Path(carpeta) / 'base.sqlite3')
+        base.guardar(ruta)
+
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=sesiones, mp_context=contexto) as ejecutor:
+            futuros = [
+                ejecutor.submit(sesion_en_proceso, ruta, base.latencia, opcion, reruns)
+                for _ in range(sesiones)
+            ]
+            por_sesion = [futuro.result() for futuro in futuros]
+
+    # El arranque de los procesos no cuenta: se mide solo el tiempo en reruns
+    tiempos = sorted(t for lista in por_sesion for t in lista)
+    total = max(sum(lista) for lista in por_sesion)
+
+    return {
+        'sesiones': sesiones,
+        'reruns_por_segundo': len(tiempos) / total,
+        'mediana_ms': statistics.median(tiempos) * 1000,
+        'p95_ms': tiempos[min(len(tiempos) - 1, int(0.95 * len(tiempos)))] * 1000
+    }
+
+def imprimir_tabla(filas, columnas):
+    """Imprime una tabla de texto alineada"""
+    anchos = [max(len(c), *(len(f"{f[c]:.1f}" if isinstance(f[c], float) else str(f[c])) for f in filas)) for c in columnas]
+    print("  ".join(c.ljust(a) for c, a in zip(columnas, anchos)))
+    for fila in filas:
+        valores = [f"{fila[c]:.1f}" if isinstance(fila[c], float) else str(fila[c]) for c in columnas]
+        print("  ".join(v.ljust(a) for v, a in zip(valores, anchos)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la aplicación con AppTest y una base local")
+    parser.add_argument('--filas', type=int, nargs='+', default=[1000, 10000],
+                        help="Tamaños del dataset de muestreos (ej: 1000 100000 1000000)")
+    parser.add_argument('--latencia', type=float, default=0.03, help="Segundos de latencia por consulta")
+    parser.add_argument('--reruns', type=int, default=5, help="Reruns en caliente por página")
+    parser.add_argument('--paginas', nargs='+', choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument('--sesiones', type=int, default=0,
+                        help="Sesiones simultáneas para la prueba de carga (0 = omitir)")
+    parser.add_argument('--json', help="Archivo donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultados = []
+    for filas in args.filas:
+        base, siembra = instalar_base(filas, args.latencia)
+        print(f"\n== {filas} muestreos · latencia {args.latencia * 1000:.0f} ms · sembrado en {siembra:.1f} s ==")
+
+        por_pagina = []
+        for nombre in args.paginas:
+            medicion = medir_pagina(base, PAGINAS[nombre], args.reruns)
+            por_pagina.append({'pagina': nombre, **medicion})
+        imprimir_tabla(por_pagina, ['pagina', 'frio_ms', 'caliente_ms', 'p95_ms',
+                                    'consultas_frio', 'consultas_caliente', 'memoria_mb'])
+
+        carga = []
+        if args.sesiones:
+            for nombre in args.paginas:
+                if PAGINAS[nombre]:
+                    carga.append({'pagina': nombre, **carga_concurrente(base, PAGINAS[nombre], args.sesiones, args.reruns)})
+            print()
+            imprimir_tabla(carga, ['pagina', 'sesiones', 'reruns_por_segundo', 'mediana_ms', 'p95_ms'])
+
+        resultados.append({
+            'filas': filas,
+            'latencia': args.latencia,
+            'sembrado_s': siembra,
+            'paginas': por_pagina,
+            'carga': carga
+        })
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding='utf-8')
+
+if __name__ == "__main__":
+    main()
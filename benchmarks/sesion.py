@@ -0,0 +1,90 @@
+"""
+Sesiones de benchmark
+Conecta la base local en lugar de Supabase y ejecuta reruns de app.py con AppTest
+"""
+
+import base64
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from streamlit.testing.v1 import AppTest
+
+import database.supabase_client as supabase_client
+from benchmarks.supabase_falso import BaseFalsa, PoolFalso
+
+RUTA_APP = str(Path(__file__).resolve().parent.parent / 'app.py')
+
+USUARIO = SimpleNamespace(email="benchmark@concreto5.local", app_metadata={})
+TIMEOUT_RERUN = 120
+
+def token_prueba(duracion=3600):
+    """
+    Crea un access token sin firmar que vence en `duracion` segundos
+
+    Returns:
+        str: JWT con los claims mínimos que valida auth.sesion
+    """
+    def codificar(datos):
+        return base64.urlsafe_b64encode(json.dumps(datos).encode()).rstrip(b'=').decode()
+
+    claims = {'sub': 'benchmark', 'email': USUARIO.email, 'exp': int(time.time()) + duracion}
+    return f"{codificar({'alg': 'none', 'typ': 'JWT'})}.{codificar(claims)}."
+
+def conectar_base(base):
+    """
+    Hace que la aplicación use la base local en lugar de Supabase
+
+    Args:
+        base (BaseFalsa): Base local
+    """
+    pool = PoolFalso(base)
+    supabase_client.obtener_pool = lambda: pool
+
+def nueva_sesion(opcion):
+    """
+    Crea una sesión de AppTest sobre app.py en la página indicada
+
+    Args:
+        opcion (str): Opción del menú o None para la pantalla de acceso
+
+    Returns:
+        AppTest: Sesión lista para ejecutar
+    """
+    at = AppTest.from_file(RUTA_APP, default_timeout=TIMEOUT_RERUN)
+    at.session_state['usuario'] = USUARIO if opcion else None
+    if opcion:
+        at.session_state['menu_principal'] = opcion
+        at.session_state['sesion_auth'] = {'access_token': token_prueba(), 'refresh_token': 'benchmark'}
+    return at
+
+def ejecutar_rerun(at, base):
+    """
+    Ejecuta un rerun y mide su latencia y sus consultas
+
+    Returns:
+        tuple: (segundos, consultas)
+    """
+    consultas = base.consultas
+    inicio = time.perf_counter()
+    at.run()
+    segundos = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return segundos, base.consultas - consultas
+
+def sesion_en_proceso(ruta, latencia, opcion, reruns):
+    """
+    Ejecuta una sesión en un proceso aparte sobre una copia de la base
+
+    AppTest no admite varias sesiones simultáneas en un mismo proceso.
+
+    Returns:
+        list: Segundos de cada rerun
+    """
+    base = BaseFalsa(latencia, ruta)
+    conectar_base(base)
+    at = nueva_sesion(opcion)
+    ejecutar_rerun(at, base)
+    return [ejecutar_rerun(at, base)[0] for _ in range(reruns)]
@@ -0,0 +1,497 @@
+"""
+Supabase local para benchmarks
+Cliente compatible con la parte de supabase-py que usa la aplicación, sobre SQLite en memoria
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+# Esquema de las tablas: columna -> tipo ('int', 'real', 'text', 'bool', 'json')
+ESQUEMA = {
+    'muestreos': {
+        'id': 'int', 'id_local': 'text', 'proyecto': 'text', 'elemento': 'text', 'ubicacion': 'text',
+        'fecha_vaciado': 'text', 'hora_vaciado': 'text', 'temperatura': 'real', 'fc_diseno': 'int',
+        'slump_especificado': 'real', 'tipo_cemento': 'text', 'tamano_max_agregado': 'text',
+        'relacion_ac': 'real', 'aditivo': 'text', 'proveedor': 'text', 'guia_remision': 'text',
+        'num_camion': 'text', 'volumen_pedido': 'real', 'hora_salida_planta': 'text',
+        'hora_llegada_obra': 'text', 'codigo_muestra': 'text', 'probetas': 'json',
+        'diametro_cm': 'real', 'altura_cm': 'real', 'edad_7': 'bool', 'edad_28': 'bool',
+        'otra_edad': 'int', 'observaciones': 'text', 'responsable_muestreo': 'text',
+        'hora_moldeo': 'text', 'usuario': 'text'
+    },
+    'ensayos_programados': {
+        'id': 'int', 'muestreo_id': 'int', 'codigo_muestra': 'text', 'proyecto': 'text',
+        'proveedor': 'text', 'fc_diseno': 'int', 'diametro_cm': 'real', 'edad_dias': 'int',
+        'fecha_programada': 'text', 'completado': 'bool'
+    },
+    'roturas': {
+        'id': 'int', 'codigo_probeta': 'text', 'codigo_muestra': 'text', 'proyecto': 'text',
+        'proveedor': 'text', 'fc_diseno': 'int', 'edad_dias': 'int', 'fecha_ensayo': 'text',
+        'carga_kg': 'real', 'resistencia': 'real', 'usuario': 'text'
+    },
+    'resumen_resistencias': {
+        'proyecto': 'text', 'proveedor': 'text', 'fc_diseno': 'int', 'edad_dias': 'int',
+        'ensayos': 'int', 'suma': 'real', 'suma_cuadrados': 'real', 'minimo': 'real',
+        'maximo': 'real', 'cumplen': 'int'
+    }
+}
+
+TIPOS_SQL = {'int': 'INTEGER', 'real': 'REAL', 'text': 'TEXT', 'bool': 'INTEGER', 'json': 'TEXT'}
+
+# Restricciones e índices equivalentes a las migraciones
+DDL_EXTRA = """
+CREATE UNIQUE INDEX muestreos_id_local_idx ON muestreos (id_local);
+CREATE INDEX muestreos_fecha_vaciado_id_idx ON muestreos (fecha_vaciado, id);
+CREATE INDEX muestreos_proyecto_id_idx ON muestreos (proyecto, id);
+CREATE INDEX muestreos_elemento_id_idx ON muestreos (elemento, id);
+CREATE UNIQUE INDEX ensayos_muestreo_edad_idx ON ensayos_programados (muestreo_id, edad_dias);
+CREATE INDEX ensayos_pendientes_fecha_idx ON ensayos_programados (fecha_programada, id) WHERE NOT completado;
+CREATE UNIQUE INDEX roturas_codigo_idx ON roturas (codigo_probeta);
+CREATE UNIQUE INDEX resumen_grupo_idx ON resumen_resistencias (proyecto, proveedor, fc_diseno, edad_dias);
+CREATE TABLE consecutivos_diarios (fecha TEXT PRIMARY KEY, ultimo INTEGER);
+
+CREATE VIRTUAL TABLE muestreos_busqueda USING fts5(
+    proyecto, elemento, ubicacion, proveedor, guia_remision, observaciones,
+    content='muestreos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER muestreos_busqueda_ai AFTER INSERT ON muestreos BEGIN
+    INSERT INTO muestreos_busqueda (rowid, proyecto, elemento, ubicacion, proveedor, guia_remision, observaciones)
+    VALUES (new.id, new.proyecto, new.elemento, new.ubicacion, new.proveedor, new.guia_remision, new.observaciones);
+END;
+
+CREATE TRIGGER programar_ensayos_muestreo AFTER INSERT ON muestreos BEGIN
+    INSERT INTO ensayos_programados (muestreo_id, codigo_muestra, proyecto, proveedor, fc_diseno,
+                                     diametro_cm, edad_dias, fecha_programada, completado)
+    SELECT new.id, new.codigo_muestra, new.proyecto, coalesce(new.proveedor, ''), new.fc_diseno,
+           coalesce(new.diametro_cm, 15), edad, date(new.fecha_vaciado, '+' || edad || ' days'), 0
+    FROM (SELECT 7 AS edad WHERE new.edad_7
+          UNION SELECT 28 WHERE new.edad_28
+          UNION SELECT new.otra_edad WHERE new.otra_edad > 0);
+END;
+
+CREATE TRIGGER actualizar_resumen_resistencias AFTER INSERT ON roturas BEGIN
+    INSERT INTO resumen_resistencias (proyecto, proveedor, fc_diseno, edad_dias, ensayos, suma,
+                                      suma_cuadrados, minimo, maximo, cumplen)
+    VALUES (new.proyecto, new.proveedor, new.fc_diseno, new.edad_dias, 1, new.resistencia,
+            new.resistencia * new.resistencia, new.resistencia, new.resistencia,
+            new.resistencia >= new.fc_diseno)
+    ON CONFLICT (proyecto, proveedor, fc_diseno, edad_dias) DO UPDATE SET
+        ensayos = ensayos + 1,
+        suma = suma + excluded.suma,
+        suma_cuadrados = suma_cuadrados + excluded.suma_cuadrados,
+        minimo = min(minimo, excluded.minimo),
+        maximo = max(maximo, excluded.maximo),
+        cumplen = cumplen + excluded.cumplen;
+END;
+"""
+
+OPERADORES = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=', 'like': 'LIKE'}
+
+class BaseFalsa:
+    """
+    Base de datos SQLite con contadores de consultas y latencia simulada
+
+    Cada execute() espera `latencia` segundos fuera del lock, como un
+    viaje de red, de modo que las consultas concurrentes se solapan.
+    """
+
+    def __init__(self, latencia=0.0, ruta=None):
+        """
+        Args:
+            latencia (float): Segundos de espera por consulta
+            ruta (str, optional): Archivo de una base ya sembrada (ver guardar);
+                por defecto se crea una base vacía en memoria
+        """
+        self.latencia = latencia
+        self.consultas = 0
+        self._lock = threading.Lock()
+        self.conexion = sqlite3.connect(ruta or ':memory:', check_same_thread=False)
+        if ruta:
+            return
+        for tabla, columnas in ESQUEMA.items():
+            definicion = ', '.join(
+                f"{c} {TIPOS_SQL[t]}" + (' PRIMARY KEY AUTOINCREMENT' if c == 'id' else '')
+                for c, t in columnas.items()
+            )
+            self.conexion.execute(f"CREATE TABLE {tabla} ({definicion})")
+        self.conexion.executescript(DDL_EXTRA)
+
+    def ejecutar(self, sql, parametros=()):
+        """
+        Ejecuta SQL simulando un viaje a Supabase
+
+        Returns:
+            list: Filas como diccionarios
+        """
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._lock:
+            self.consultas += 1
+            cursor = self.conexion.execute(sql, parametros)
+            columnas = [d[0] for d in cursor.description or ()]
+            filas = [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+            self.conexion.commit()
+        return filas
+
+    def insertar_masivo(self, tabla, filas):
+        """
+        Inserta filas sin latencia ni conteo (para sembrar datos)
+
+        Args:
+            tabla (str): Tabla de destino
+            filas (iterable): Diccionarios con las columnas del esquema
+        """
+        columnas = [c for c in ESQUEMA[tabla] if c != 'id']
+        sql = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+        with self._lock:
+            self.conexion.executemany(
+                sql, ([_a_sql(tabla, c, fila.get(c)) for c in columnas] for fila in filas)
+            )
+            self.conexion.commit()
+
+    def guardar(self, ruta):
+        """
+        Copia la base a un archivo para abrirla desde otros procesos
+
+        Args:
+            ruta (str): Archivo de destino
+        """
+        with self._lock:
+            destino = sqlite3.connect(ruta)
+            self.conexion.backup(destino)
+            destino.close()
+
+    def contar(self, tabla):
+        """Retorna el número de filas de una tabla"""
+        with self._lock:
+            return self.conexion.execute(f"SELECT count(*) FROM {tabla}").fetchone()[0]
+
+def _a_sql(tabla, columna, valor):
+    """Convierte un valor de Python al formato guardado en SQLite"""
+    tipo = ESQUEMA.get(tabla, {}).get(columna)
+    if tipo == 'json' and valor is not None:
+        return json.dumps(valor)
+    if isinstance(valor, bool):
+        return int(valor)
+    return valor
+
+def _de_sql(tabla, fila):
+    """Convierte una fila de SQLite a los tipos que devuelve PostgREST"""
+    tipos = ESQUEMA.get(tabla, {})
+    for columna, valor in fila.items():
+        if valor is None:
+            continue
+        if tipos.get(columna) == 'json':
+            fila[columna] = json.loads(valor)
+        elif tipos.get(columna) == 'bool':
+            fila[columna] = bool(valor)
+    return fila
+
+def _partir(texto):
+    """Separa una lista de condiciones de PostgREST por las comas de primer nivel"""
+    partes, actual, nivel, en_comillas, escapado = [], '', 0, False, False
+    for caracter in texto:
+        if escapado:
+            escapado = False
+        elif caracter == '\\':
+            escapado = True
+        elif caracter == '"':
+            en_comillas = not en_comillas
+        elif not en_comillas and caracter == '(':
+            nivel += 1
+        elif not en_comillas and caracter == ')':
+            nivel -= 1
+        elif not en_comillas and nivel == 0 and caracter == ',':
+            partes.append(actual)
+            actual = ''
+            continue
+        actual += caracter
+    partes.append(actual)
+    return partes
+
+def _valor(texto):
+    """Interpreta el valor de un filtro de PostgREST (entrecomillado o literal)"""
+    if texto.startswith('"') and texto.endswith('"'):
+        return re.sub(r'\\(.)', r'\1', texto[1:-1])
+    return texto
+
+def condicion_sql(texto, parametros):
+    """
+    Traduce un filtro lógico de PostgREST (argumento de or_) a SQL
+
+    Args:
+        texto (str): Condición, ej. 'fecha.lt."2024-01-01",and(fecha.eq."2024-01-01",id.lt.5)'
+        parametros (list): Lista donde se agregan los parámetros
+
+    Returns:
+        str: Expresión SQL
+    """
+    for logico in ('and', 'or'):
+        if texto.startswith(f'{logico}(') and texto.endswith(')'):
+            partes = [condicion_sql(p, parametros) for p in _partir(texto[len(logico) + 1:-1])]
+            return '(' + f' {logico.upper()} '.join(partes) + ')'
+
+    columna, resto = texto.split('.', 1)
+    negado = resto.startswith('not.')
+    if negado:
+        resto = resto[4:]
+    operador, valor = resto.split('.', 1)
+    if operador == 'is':
+        sql = f"{columna} IS NULL" if valor == 'null' else f"{columna} = ?"
+        if valor != 'null':
+            parametros.append(valor == 'true')
+    else:
+        sql = f"{columna} {OPERADORES[operador]} ?"
+        parametros.append(_valor(valor))
+    return f"NOT ({sql})" if negado else sql
+
+class Respuesta:
+    """Respuesta con la misma forma que la de postgrest"""
+
+    def __init__(self, data):
+        self.data = data
+
+class ConsultaFalsa:
+    """Constructor de consultas con la interfaz encadenable de postgrest"""
+
+    def __init__(self, base, tabla, metodo='GET', datos=None, on_conflict=None, ignorar_duplicados=False):
+        self.base = base
+        self.tabla = tabla
+        self.metodo = metodo
+        self.datos = datos
+        self.on_conflict = on_conflict
+        self.ignorar_duplicados = ignorar_duplicados
+        self.columnas = '*'
+        self.condiciones = []
+        self.parametros = []
+        self.ordenes = []
+        self.limite = None
+        # Mismos atributos que usa el perfilador para nombrar la consulta
+        self.request = SimpleNamespace(path=f"falso/rest/v1/{tabla}", http_method=metodo)
+
+    def select(self, columnas='*'):
+        self.columnas = columnas
+        return self
+
+    def _filtro(self, columna, operador, valor):
+        self.condiciones.append(f"{columna} {OPERADORES[operador]} ?")
+        self.parametros.append(_a_sql(self.tabla, columna, valor))
+        return self
+
+    def eq(self, columna, valor):
+        return self._filtro(columna, 'eq', valor)
+
+    def neq(self, columna, valor):
+        return self._filtro(columna, 'neq', valor)
+
+    def gt(self, columna, valor):
+        return self._filtro(columna, 'gt', valor)
+
+    def gte(self, columna, valor):
+        return self._filtro(columna, 'gte', valor)
+
+    def lt(self, columna, valor):
+        return self._filtro(columna, 'lt', valor)
+
+    def lte(self, columna, valor):
+        return self._filtro(columna, 'lte', valor)
+
+    def in_(self, columna, valores):
+        valores = list(valores)
+        self.condiciones.append(f"{columna} IN ({', '.join('?' * len(valores))})" if valores else "0")
+        self.parametros.extend(_a_sql(self.tabla, columna, v) for v in valores)
+        return self
+
+    def filter(self, columna, operador, valor):
+        return self._filtro(columna, operador, valor)
+
+    def is_(self, columna, valor):
+        self.condiciones.append(condicion_sql(f"{columna}.is.{valor}", self.parametros))
+        return self
+
+    def or_(self, filtros):
+        self.condiciones.append(condicion_sql(f"or({filtros})", self.parametros))
+        return self
+
+    def order(self, columna, desc=False):
+        # Igual que Postgres: nulos al final en ascendente y al inicio en descendente
+        self.ordenes.append(f"{columna} IS NULL {'DESC' if desc else 'ASC'}, {columna} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, cantidad):
+        self.limite = cantidad
+        return self
+
+    def _where(self):
+        return f" WHERE {' AND '.join(self.condiciones)}" if self.condiciones else ''
+
+    def execute(self):
+        if self.metodo == 'GET':
+            sql = f"SELECT {self.columnas} FROM {self.tabla}{self._where()}"
+            if self.ordenes:
+                sql += f" ORDER BY {', '.join(self.ordenes)}"
+            if self.limite is not None:
+                sql += f" LIMIT {int(self.limite)}"
+            filas = self.base.ejecutar(sql, self.parametros)
+            return Respuesta([_de_sql(self.tabla, f) for f in filas])
+
+        if self.metodo == 'PATCH':
+            asignaciones = ', '.join(f"{c} = ?" for c in self.datos)
+            valores = [_a_sql(self.tabla, c, v) for c, v in self.datos.items()]
+            self.base.ejecutar(f"UPDATE {self.tabla} SET {asignaciones}{self._where()}", valores + self.parametros)
+            return Respuesta([])
+
+        if self.metodo == 'DELETE':
+            self.base.ejecutar(f"DELETE FROM {self.tabla}{self._where()}", self.parametros)
+            return Respuesta([])
+
+        filas = self.datos if isinstance(self.datos, list) else [self.datos]
+        columnas = sorted({c for fila in filas for c in fila})
+        # Una sola sentencia por lote, como el insert masivo de PostgREST
+        marcadores = f"({', '.join('?' * len(columnas))})"
+        sql = f"INSERT INTO {self.tabla} ({', '.join(columnas)}) VALUES {', '.join([marcadores] * len(filas))}"
+        if self.on_conflict and self.ignorar_duplicados:
+            sql += f" ON CONFLICT ({self.on_conflict}) DO NOTHING"
+        elif self.on_conflict:
+            actualizar = ', '.join(f"{c} = excluded.{c}" for c in columnas if c != self.on_conflict)
+            sql += f" ON CONFLICT ({self.on_conflict}) DO UPDATE SET {actualizar}"
+        parametros = [_a_sql(self.tabla, c, fila.get(c)) for fila in filas for c in columnas]
+        # Como PostgREST: devuelve las filas escritas (no las omitidas por duplicadas)
+        insertadas = self.base.ejecutar(sql + " RETURNING *", parametros)
+        return Respuesta([_de_sql(self.tabla, f) for f in insertadas])
+
+class TablaFalsa:
+    """Punto de entrada de supabase.table(nombre)"""
+
+    def __init__(self, base, tabla):
+        self.base = base
+        self.tabla = tabla
+
+    def select(self, columnas='*'):
+        return ConsultaFalsa(self.base, self.tabla).select(columnas)
+
+    def insert(self, datos):
+        return ConsultaFalsa(self.base, self.tabla, 'POST', datos)
+
+    def upsert(self, datos, on_conflict=None, ignore_duplicates=False):
+        return ConsultaFalsa(self.base, self.tabla, 'POST', datos, on_conflict or 'id', ignore_duplicates)
+
+    def update(self, datos):
+        return ConsultaFalsa(self.base, self.tabla, 'PATCH', datos)
+
+    def delete(self):
+        return ConsultaFalsa(self.base, self.tabla, 'DELETE')
+
+class RpcFalsa:
+    """Llamada a una función de la base de datos (equivalentes de las migraciones)"""
+
+    def __init__(self, base, nombre, parametros):
+        self.base = base
+        self.nombre = nombre
+        self.parametros = parametros
+        self.columnas = None
+        self.request = SimpleNamespace(path=f"falso/rest/v1/rpc/{nombre}", http_method='POST')
+
+    def select(self, columnas='*'):
+        self.columnas = None if columnas == '*' else columnas.split(',')
+        return self
+
+    def execute(self):
+        p = self.parametros
+        if self.nombre == 'resumen_muestreos_desde':
+            filas = self.base.ejecutar(
+                "SELECT fecha_vaciado, count(*) AS muestras, "
+                "coalesce(sum(coalesce(json_array_length(probetas), 0)), 0) AS probetas, "
+                "max(id) AS ultimo_id FROM muestreos WHERE id > ? AND fecha_vaciado >= ? "
+                "GROUP BY fecha_vaciado",
+                (p['p_desde_id'], p['p_desde_fecha'])
+            )
+        elif self.nombre == 'buscar_muestreos':
+            palabras = re.findall(r'\w+', p['p_texto'].lower())
+            if not palabras:
+                return Respuesta([])
+            consulta = ' '.join(f'"{palabra}"*' for palabra in palabras)
+            filas = self.base.ejecutar(
+                "SELECT m.* FROM muestreos_busqueda b JOIN muestreos m ON m.id = b.rowid "
+                "WHERE muestreos_busqueda MATCH ? ORDER BY b.rank, m.id DESC LIMIT ? OFFSET ?",
+                (consulta, p['p_limite'], p['p_desplazamiento'])
+            )
+            filas = [_de_sql('muestreos', f) for f in filas]
+        elif self.nombre == 'contar_ensayos_pendientes':
+            filas = self.base.ejecutar(
+                "SELECT coalesce(sum(fecha_programada < ?), 0) AS vencidos, "
+                "coalesce(sum(fecha_programada = ?), 0) AS hoy, "
+                "coalesce(sum(fecha_programada > ?), 0) AS proximos "
+                "FROM ensayos_programados WHERE NOT completado AND fecha_programada <= ?",
+                (p['p_hoy'], p['p_hoy'], p['p_hoy'], p['p_hasta'])
+            )
+        elif self.nombre == 'reservar_consecutivos':
+            fila = self.base.ejecutar(
+                "INSERT INTO consecutivos_diarios (fecha, ultimo) VALUES (?, ?) "
+                "ON CONFLICT (fecha) DO UPDATE SET ultimo = ultimo + excluded.ultimo "
+                "RETURNING ultimo - ? + 1 AS inicio",
+                (p['p_fecha'], p['p_cantidad'], p['p_cantidad'])
+            )
+            return Respuesta(fila[0]['inicio'])
+        else:
+            raise NotImplementedError(f"RPC no soportada: {self.nombre}")
+
+        if self.columnas:
+            filas = [{c: f.get(c) for c in self.columnas} for f in filas]
+        return Respuesta(filas)
+
+class AuthFalsa:
+    """Autenticación mínima: la sesión del benchmark ya viene iniciada"""
+
+    def get_session(self):
+        return None
+
+    def set_session(self, access_token, refresh_token):
+        pass
+
+    def sign_out(self, *args):
+        pass
+
+    @property
+    def admin(self):
+        return self
+
+class ClienteFalso:
+    """Cliente con la interfaz de supabase.Client usada por la aplicación"""
+
+    def __init__(self, base):
+        self.base = base
+        self.auth = AuthFalsa()
+
+    def table(self, tabla):
+        return TablaFalsa(self.base, tabla)
+
+    def rpc(self, nombre, parametros=None):
+        return RpcFalsa(self.base, nombre, parametros or {})
+
+class PoolFalso:
+    """Reemplazo de PoolSupabase: un cliente por sesión sobre la misma base"""
+
+    def __init__(self, base):
+        self.base = base
+        self._clientes = {}
+
+    def obtener(self, id_sesion):
+        return self._clientes.setdefault(id_sesion, ClienteFalso(self.base))
+
+    def cliente_con_token(self, access_token):
+        return ClienteFalso(self.base)
+
+    def reportar_fallo(self, cliente):
+        pass
+
+    def liberar(self, id_sesion):
+        self._clientes.pop(id_sesion, None)
+
+    def estadisticas(self):
+        return {'activos': len(self._clientes), 'creados': len(self._clientes), 'reconstruidos': 0}
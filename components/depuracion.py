@@ -0,0 +1,76 @@
+"""
+Componente de Depuración
+Panel de tiempos por etapa y consulta, visible solo para administradores
+"""
+
+import streamlit as st
+from database.resiliencia import obtener_circuito
+from database.supabase_client import obtener_cache, obtener_pool
+from database.tiempo_real import obtener_suscripcion, tiempo_real_habilitado
+from utils.perfilador import obtener_perfilador, ultimo_rerun
+
+def mostrar_panel_depuracion():
+    """
+    Renderiza el panel de depuración con el perfil del último rerun
+    y las estadísticas acumuladas del proceso
+    """
+    with st.expander("🛠️ Depuración (administrador)"):
+        mediciones = ultimo_rerun()
+
+        st.write("**Último rerun**")
+        if not mediciones:
+            st.caption("Sin mediciones todavía; aparecerán en el próximo rerun.")
+        else:
+            total = sum(s for tipo, nombre, s in mediciones if (tipo, nombre) == ('etapa', 'main'))
+            consultas = [s for tipo, _, s in mediciones if tipo == 'consulta']
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total", f"{total * 1000:.0f} ms")
+            with col2:
+                st.metric("Consultas", len(consultas))
+            with col3:
+                st.metric("Tiempo en consultas", f"{sum(consultas) * 1000:.0f} ms")
+
+            st.dataframe(
+                [{"Tipo": tipo, "Nombre": nombre, "ms": round(s * 1000, 1)} for tipo, nombre, s in mediciones],
+                use_container_width=True,
+                hide_index=True
+            )
+
+        st.write("**Acumulado del proceso**")
+        perfilador = obtener_perfilador()
+        st.dataframe(
+            [{
+                "Tipo": r['tipo'],
+                "Nombre": r['nombre'],
+                "Llamadas": r['llamadas'],
+                "Promedio (ms)": round(r['promedio'] * 1000, 1),
+                "p95 (ms) ≤": r['p95'] * 1000
+            } for r in perfilador.resumen()],
+            use_container_width=True,
+            hide_index=True
+        )
+
+        cache = obtener_cache().estadisticas()
+        circuito = obtener_circuito().estadisticas()
+        pool = obtener_pool().estadisticas()
+        st.caption(
+            f"Caché: {cache['tasa_aciertos']:.0%} aciertos, {cache['entradas']} entradas · "
+            f"Circuito: {circuito['estado']} ({circuito['rechazadas']} rechazadas) · "
+            f"Pool: {pool['activos']} clientes"
+        )
+        if tiempo_real_habilitado():
+            vivo = obtener_suscripcion().estadisticas()
+            st.caption(
+                f"Tiempo real: {'conectada' if vivo['conectada'] else 'desconectada'} · "
+                f"{vivo['eventos']} eventos, {cache['actualizaciones']} consultas actualizadas, "
+                f"{vivo['reconexiones']} reconexiones"
+                + (f" · Último error: {vivo['ultimo_error']}" if vivo['ultimo_error'] else "")
+            )
+
+        st.download_button(
+            "⬇️ Métricas (Prometheus)",
+            perfilador.exportar_prometheus(),
+            file_name="metrics.txt",
+            mime="text/plain"
+        )
@@ -0,0 +1,60 @@
+"""
+Componente de Exportación
+Descarga de conjuntos de datos completos en CSV o Parquet
+"""
+
+from functools import partial
+
+import streamlit as st
+from database.exportacion import CONJUNTOS, FORMATOS, generar_exportacion, nombre_archivo
+
+# Conjunto -> etiqueta
+ETIQUETAS_CONJUNTO = {'muestreos': "Muestreos", 'roturas': "Resultados de rotura"}
+ETIQUETAS_FORMATO = {'csv': "CSV (Excel)", 'parquet': "Parquet (análisis de datos)"}
+
+def mostrar_exportacion(supabase):
+    """
+    Renderiza el formulario de exportación y su botón de descarga
+
+    El archivo se genera recién al pulsar el botón, en un hilo aparte,
+    con las columnas y filtros elegidos aplicados en la consulta.
+
+    Args:
+        supabase: Cliente de Supabase
+    """
+    col1, col2 = st.columns(2)
+    with col1:
+        conjunto = st.radio("Datos", list(CONJUNTOS), format_func=ETIQUETAS_CONJUNTO.get,
+                            horizontal=True, key="exp_conjunto")
+    with col2:
+        formato = st.radio("Formato", list(FORMATOS), format_func=ETIQUETAS_FORMATO.get,
+                           horizontal=True, key="exp_formato")
+
+    disponibles = list(CONJUNTOS[conjunto]['columnas'])
+    columnas = st.multiselect("Columnas", disponibles, default=disponibles, key=f"exp_columnas_{conjunto}")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        proyecto = st.text_input("Proyecto", key="exp_proyecto", placeholder="Todos (o nombre exacto)")
+    with col2:
+        desde = st.date_input("Desde", value=None, key="exp_desde")
+    with col3:
+        hasta = st.date_input("Hasta", value=None, key="exp_hasta")
+
+    campo_fecha = "vaciado" if conjunto == 'muestreos' else "ensayo"
+    st.caption(f"Las fechas filtran por fecha de {campo_fecha}. El archivo se genera al descargarlo.")
+
+    if not columnas:
+        st.warning("⚠️ Elige al menos una columna.")
+        return
+
+    st.download_button(
+        "📤 Descargar",
+        data=partial(generar_exportacion, supabase, conjunto, formato, columnas,
+                     {'proyecto': proyecto} if proyecto else None, desde, hasta),
+        file_name=nombre_archivo(conjunto, formato),
+        mime=FORMATOS[formato]['mime'],
+        on_click="ignore",
+        type="primary",
+        key="exp_descargar"
+    )
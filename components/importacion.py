@@ -0,0 +1,99 @@
+"""
+Componente de Importación
+Carga masiva de planillas CSV/XLSX con reporte de errores por fila
+"""
+
+import streamlit as st
+from database.importacion import importar_guias, importar_roturas
+from utils.planillas import GUIAS, ROTURAS, reporte_csv
+
+# Importaciones disponibles: título, función y reglas de la planilla
+IMPORTACIONES = {
+    'guias': ("guías de remisión", importar_guias, GUIAS),
+    'roturas': ("resultados de laboratorio", importar_roturas, ROTURAS)
+}
+
+# Filas del reporte que se muestran en pantalla (el CSV trae todas)
+MAX_FILAS_REPORTE = 1000
+
+def mostrar_importacion(supabase, tipo):
+    """
+    Renderiza la carga de una planilla y el resultado de la última importación
+
+    Args:
+        supabase: Cliente de Supabase
+        tipo (str): 'guias' o 'roturas'
+    """
+    titulo, importar, reglas = IMPORTACIONES[tipo]
+    clave = f'_importacion_{tipo}'
+
+    obligatorias = [columna for columna, regla in reglas.items() if regla.get('requerida')]
+    st.caption(
+        f"Importa {titulo} desde CSV o Excel (una fila por registro). "
+        f"Columnas obligatorias: {', '.join(obligatorias)}. "
+        "Volver a importar el mismo archivo no duplica registros."
+    )
+
+    archivo = st.file_uploader("Planilla", type=['csv', 'xlsx'], key=f'archivo_{tipo}')
+    if archivo is not None and st.button("📥 Importar", key=f'importar_{tipo}', type="primary"):
+        with st.status(f"Importando {archivo.name}...", expanded=True) as estado:
+            avance = st.empty()
+
+            def progreso(parcial):
+                avance.write(f"{parcial['filas']:,} filas leídas · {parcial['guardadas']:,} guardadas · "
+                             f"{len(parcial['errores']):,} con errores")
+
+            try:
+                resultado = importar(supabase, archivo, archivo.name, st.session_state['usuario'].email, progreso)
+            except ValueError as e:
+                estado.update(label=f"❌ {e}", state="error")
+                return
+            st.session_state[clave] = resultado
+            estado.update(label="Importación terminada", state="complete", expanded=False)
+
+    resultado = st.session_state.get(clave)
+    if resultado is not None:
+        mostrar_resultado(resultado, tipo)
+
+def mostrar_resultado(resultado, tipo):
+    """
+    Muestra el resumen de una importación y el reporte de errores por fila
+
+    Args:
+        resultado (dict): Resultado de importar_guias o importar_roturas
+        tipo (str): Tipo de importación (para las claves de los widgets)
+    """
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Filas leídas", f"{resultado['filas']:,}")
+    with col2:
+        st.metric("Guardadas", f"{resultado['guardadas']:,}")
+    with col3:
+        st.metric("Con errores", f"{len({fila for fila, _, _ in resultado['errores']}):,}")
+    with col4:
+        st.metric("Advertencias", f"{len(resultado['advertencias']):,}")
+
+    if resultado['sin_conexion']:
+        st.warning("⚠️ Se perdió la conexión con la base de datos. Vuelve a importar el archivo para completar la carga.")
+
+    problemas = [
+        {"Fila": fila, "Columna": columna, "Tipo": tipo_problema, "Detalle": mensaje}
+        for tipo_problema, filas in (("Error", resultado['errores']), ("Advertencia", resultado['advertencias']))
+        for fila, columna, mensaje in filas
+    ]
+    if not problemas:
+        st.success("✅ Todas las filas se importaron sin observaciones")
+        return
+
+    problemas.sort(key=lambda p: p["Fila"])
+    if len(problemas) > MAX_FILAS_REPORTE:
+        st.caption(f"Se muestran las primeras {MAX_FILAS_REPORTE:,} de {len(problemas):,} observaciones; "
+                   "descarga el reporte para verlas todas.")
+    st.dataframe(problemas[:MAX_FILAS_REPORTE], use_container_width=True, hide_index=True)
+    st.download_button(
+        "📄 Descargar reporte",
+        data=reporte_csv(resultado['errores'], resultado['advertencias']),
+        file_name=f"reporte_importacion_{tipo}.csv",
+        mime="text/csv",
+        key=f'reporte_{tipo}'
+    )
@@ -5,7 +5,10 @@ Muestra información del usuario y opciones de navegación
 
 import streamlit as st
 from auth.login import cerrar_sesion
+from database.journal import estado_sincronizacion
+from utils.perfilador import perfilado
 
+@perfilado()
 def mostrar_sidebar(supabase):
     """
     Renderiza el sidebar con información del usuario y opciones
@@ -18,6 +21,11 @@ def mostrar_sidebar(supabase):
         st.write(f"👤 {st.session_state['usuario'].email}")
         st.divider()
         
+        # Estado de sincronización del journal local
+        mostrar_estado_sincronizacion()
+        
+        st.divider()
+        
         # Información sobre cambio de contraseña
         st.info("🔐 **Para cambiar tu contraseña:** Cierra sesión y usa la pestaña 'Cambiar Contraseña'.")
         
@@ -25,4 +33,21 @@ def mostrar_sidebar(supabase):
         
         # Botón de cerrar sesión
         if st.button("🚪 Cerrar Sesión", type="primary", use_container_width=True):
-            cerrar_sesion(supabase)
\ No newline at end of file
+            cerrar_sesion(supabase)
+
+def mostrar_estado_sincronizacion():
+    """
+    Muestra cuántos registros locales faltan enviar a Supabase
+    """
+    estado = estado_sincronizacion()
+    
+    if estado['pendientes']:
+        st.warning(f"🔄 {estado['pendientes']} registro(s) pendientes de sincronizar")
+    else:
+        st.success("✅ Todo sincronizado")
+    
+    if estado['conflictos']:
+        st.error(f"⚠️ {estado['conflictos']} registro(s) rechazados por la base de datos")
+    
+    if estado['ultimo_error']:
+        st.caption(f"Último error: {estado['ultimo_error']}")
\ No newline at end of file
@@ -0,0 +1,285 @@
+"""
+Aceptación de resistencias
+Estado del motor ACI 318 por usuario, reconstruido desde las roturas y
+actualizado con cada resultado guardado
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from auth.sesion import identidad_sesion
+from database.resiliencia import ejecutar
+from utils.aci318 import MotorAceptacion
+
+# Edad de diseño: solo sus ensayos cuentan para la aceptación
+EDAD_DISEÑO = 28
+# Cada cuánto se reconstruye el estado (recoge roturas guardadas por otros procesos)
+RECONSTRUCCION = 10 * 60
+# Roturas leídas por consulta al reconstruir
+TAMAÑO_PAGINA = 1000
+# Usuarios con estado propio (se descartan los menos usados)
+MAX_AMBITOS = 64
+
+def agrupar_ensayos(roturas):
+    """
+    Agrupa las roturas a la edad de diseño en ensayos (una muestra = un ensayo)
+
+    Args:
+        roturas (iterable): Roturas con codigo_muestra, proyecto, fc_diseno,
+            edad_dias, fecha_ensayo, resistencia e id (opcional)
+
+    Returns:
+        list: Dicts con 'codigo_muestra', 'proyecto', 'fc_diseno', 'fecha_ensayo'
+        y 'resistencia' (promedio de sus probetas), en orden cronológico
+    """
+    ensayos = {}
+    for rotura in roturas:
+        if rotura.get('edad_dias') != EDAD_DISEÑO or rotura.get('resistencia') is None:
+            continue
+        ensayo = ensayos.setdefault(rotura['codigo_muestra'], {
+            'codigo_muestra': rotura['codigo_muestra'],
+            'proyecto': rotura['proyecto'],
+            'fc_diseno': rotura['fc_diseno'],
+            'fecha_ensayo': rotura['fecha_ensayo'],
+            'suma': 0.0,
+            'probetas': 0,
+            'orden': rotura.get('id') or 0
+        })
+        ensayo['suma'] += float(rotura['resistencia'])
+        ensayo['probetas'] += 1
+        ensayo['fecha_ensayo'] = max(ensayo['fecha_ensayo'], rotura['fecha_ensayo'])
+
+    resultado = [
+        {**ensayo, 'resistencia': ensayo['suma'] / ensayo['probetas']}
+        for ensayo in ensayos.values()
+    ]
+    resultado.sort(key=lambda e: (e['fecha_ensayo'], e['orden']))
+    return resultado
+
+class AceptacionRoturas:
+    """
+    Motores de aceptación del proceso, uno por usuario, alimentados por las roturas guardadas
+
+    Las políticas RLS pueden darle a cada usuario un conjunto distinto de
+    roturas, así que cada uno tiene su propio estado, leído con su cliente.
+    El estado se reconstruye desde la tabla roturas la primera vez que se
+    consulta y cada RECONSTRUCCION segundos; entre reconstrucciones cada
+    resultado que guarda el usuario se incorpora en O(1). Cuando guarda
+    otro usuario, el estado queda pendiente y en la próxima consulta se
+    ponen al día solo las roturas con id mayor al último leído. Si una
+    rotura no puede agregarse al final de la secuencia (una muestra ya
+    contada o un ensayo anterior al último del grupo), el estado se
+    reconstruye completo.
+
+    Las lecturas de la base de datos se hacen fuera del lock del proceso,
+    con una sola carga a la vez por usuario; el lock solo protege el
+    intercambio y la actualización de los estados en memoria.
+    """
+
+    def __init__(self, max_ambitos=MAX_AMBITOS):
+        """
+        Args:
+            max_ambitos (int): Número máximo de usuarios con estado propio
+        """
+        self.max_ambitos = max_ambitos
+        self._lock = threading.Lock()
+        self._estados = OrderedDict()
+        # Un lock por usuario: evita dos cargas simultáneas del mismo estado
+        self._cargas = {}
+        # Aumenta con cada guardado: una carga que lo ve cambiar queda pendiente
+        self._version = 0
+
+    def invalidar(self):
+        """Fuerza una reconstrucción de todos los estados en la próxima consulta"""
+        with self._lock:
+            self._estados.clear()
+            self._version += 1
+
+    def _leer_roturas(self, supabase, desde=0):
+        """Recorre las roturas a la edad de diseño con id mayor a `desde`, en orden de id"""
+        ultimo_id = desde
+        while True:
+            filas = ejecutar(
+                supabase.table('roturas')
+                .select('id,codigo_muestra,proyecto,fc_diseno,edad_dias,fecha_ensayo,resistencia')
+                .eq('edad_dias', EDAD_DISEÑO)
+                .gt('id', ultimo_id)
+                .order('id')
+                .limit(TAMAÑO_PAGINA)
+            ).data
+            yield from filas
+            if len(filas) < TAMAÑO_PAGINA:
+                return
+            ultimo_id = filas[-1]['id']
+
+    @staticmethod
+    def _vigente(estado):
+        """Indica si un estado existe y no le toca la reconstrucción periódica"""
+        return estado is not None and time.monotonic() - estado['construido'] < RECONSTRUCCION
+
+    @staticmethod
+    def _incorporar(estado, roturas):
+        """
+        Agrega roturas al final de la secuencia de un estado (requiere el lock)
+
+        Returns:
+            dict | None: Código de muestra -> evaluación, o None si alguna no
+            puede agregarse al final (el estado queda sin cambios)
+        """
+        ensayos = agrupar_ensayos(roturas)
+        ultimas = dict(estado['ultimas'])
+        codigos = set()
+        for ensayo in ensayos:
+            grupo = (ensayo['proyecto'], ensayo['fc_diseno'])
+            if ensayo['codigo_muestra'] in estado['contadas'] or ensayo['fecha_ensayo'] < ultimas.get(grupo, ''):
+                return None
+            codigos.add(ensayo['codigo_muestra'])
+            ultimas[grupo] = ensayo['fecha_ensayo']
+
+        evaluaciones = {}
+        for ensayo in ensayos:
+            evaluaciones[ensayo['codigo_muestra']] = estado['motor'].registrar_ensayo(
+                ensayo['proyecto'], ensayo['fc_diseno'], ensayo['resistencia']
+            )
+        estado['contadas'] |= codigos
+        estado['ultimas'] = ultimas
+        estado['ultimo_id'] = max([estado['ultimo_id']] + [r['id'] for r in roturas if r.get('id') is not None])
+        return evaluaciones
+
+    def _construir(self, supabase):
+        """Lee todas las roturas del usuario y arma un estado nuevo (sin el lock)"""
+        roturas = list(self._leer_roturas(supabase))
+        estado = {'motor': MotorAceptacion(), 'contadas': set(), 'ultimas': {}, 'ultimo_id': 0}
+        for ensayo in agrupar_ensayos(roturas):
+            grupo = (ensayo['proyecto'], ensayo['fc_diseno'])
+            estado['contadas'].add(ensayo['codigo_muestra'])
+            estado['ultimas'][grupo] = ensayo['fecha_ensayo']
+            estado['motor'].registrar_ensayo(ensayo['proyecto'], ensayo['fc_diseno'], ensayo['resistencia'])
+        estado['ultimo_id'] = max([0] + [r['id'] for r in roturas])
+        estado['construido'] = time.monotonic()
+        return estado
+
+    def _usar(self, ambito, estado):
+        """Marca el estado como el más usado y descarta los sobrantes (requiere el lock)"""
+        self._estados[ambito] = estado
+        self._estados.move_to_end(ambito)
+        while len(self._estados) > self.max_ambitos:
+            descartado, _ = self._estados.popitem(last=False)
+            self._cargas.pop(descartado, None)
+        return estado['motor']
+
+    def cargar(self, supabase, ambito=None):
+        """
+        Pone al día el estado de un usuario desde la base de datos si hace falta
+
+        Args:
+            supabase: Cliente de Supabase del usuario
+            ambito (str, optional): Usuario (ver auth.sesion.identidad_sesion)
+
+        Returns:
+            MotorAceptacion: Motor del usuario
+        """
+        with self._lock:
+            estado = self._estados.get(ambito)
+            if self._vigente(estado) and not estado['pendiente']:
+                return self._usar(ambito, estado)
+            carga = self._cargas.setdefault(ambito, threading.Lock())
+
+        with carga:
+            with self._lock:
+                # Otra sesión del mismo usuario pudo terminar la carga mientras se esperaba
+                estado = self._estados.get(ambito)
+                if self._vigente(estado) and not estado['pendiente']:
+                    return self._usar(ambito, estado)
+                version = self._version
+
+            if self._vigente(estado):
+                nuevas = list(self._leer_roturas(supabase, estado['ultimo_id']))
+                with self._lock:
+                    if self._estados.get(ambito) is estado and self._incorporar(estado, nuevas) is not None:
+                        estado['pendiente'] = self._version != version
+                        return self._usar(ambito, estado)
+
+            estado = self._construir(supabase)
+            with self._lock:
+                # Un guardado durante la lectura puede haber quedado fuera: se pone al día después
+                estado['pendiente'] = self._version != version
+                return self._usar(ambito, estado)
+
+    def registrar(self, roturas, ambito=None):
+        """
+        Incorpora las roturas recién guardadas por un usuario
+
+        Args:
+            roturas (list): Roturas insertadas (las que devolvió la base de datos)
+            ambito (str, optional): Usuario que las guardó
+
+        Returns:
+            dict: Código de muestra -> evaluación del ensayo (ver EstadoAceptacion.agregar)
+        """
+        if not agrupar_ensayos(roturas):
+            return {}
+
+        with self._lock:
+            self._version += 1
+            # Los demás usuarios pueden ver o no la rotura: se ponen al día al consultar
+            for otro, estado in self._estados.items():
+                if otro != ambito:
+                    estado['pendiente'] = True
+
+            # Sin estado al día, la próxima carga ya trae estas roturas
+            estado = self._estados.get(ambito)
+            if estado is None or estado['pendiente']:
+                return {}
+            evaluaciones = self._incorporar(estado, roturas)
+            if evaluaciones is None:
+                del self._estados[ambito]
+                return {}
+            return evaluaciones
+
+    def resumenes(self, supabase, proyecto=None, ambito=None):
+        """
+        Retorna el estado de aceptación de cada grupo (proyecto, f'c) de un usuario
+
+        Args:
+            supabase: Cliente de Supabase del usuario
+            proyecto (str, optional): Limitar a un proyecto
+            ambito (str, optional): Usuario
+
+        Returns:
+            list: Dicts con 'proyecto' y el resumen del grupo (ver EstadoAceptacion.resumen)
+        """
+        motor = self.cargar(supabase, ambito)
+        with self._lock:
+            grupos = sorted(g for g in motor.grupos() if proyecto in (None, g[0]))
+            return [{'proyecto': p, **motor.resumen(p, fc)} for p, fc in grupos]
+
+@st.cache_resource(show_spinner=False)
+def obtener_aceptacion():
+    """
+    Crea los estados de aceptación compartidos por todo el proceso
+
+    Returns:
+        AceptacionRoturas: Motores de aceptación por usuario
+    """
+    return AceptacionRoturas()
+
+def obtener_estado_aceptacion(supabase, proyecto=None):
+    """
+    Retorna el estado de aceptación ACI 318 por proyecto y f'c
+
+    Args:
+        supabase: Cliente de Supabase
+        proyecto (str, optional): Limitar a un proyecto
+
+    Returns:
+        list: Ver AceptacionRoturas.resumenes ([] si la consulta falló)
+    """
+    try:
+        return obtener_aceptacion().resumenes(supabase, proyecto, identidad_sesion())
+    except Exception as e:
+        st.error(f"Error al evaluar la aceptación: {e}")
+        return []
@@ -0,0 +1,373 @@
+"""
+Caché de consultas
+Caché TTL/LRU de lecturas con invalidación precisa en escrituras
+y actualización en sitio con los cambios recibidos en tiempo real
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Valores por defecto de la caché
+TTL_SEGUNDOS = 60
+MAX_ENTRADAS = 256
+# Vigencia de las tablas cuyos cambios llegan en tiempo real (acota un evento perdido)
+TTL_EN_VIVO = 10 * 60
+
+def _congelar(valor):
+    """Convierte dicts y listas en estructuras inmutables utilizables como clave"""
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+def _fila_coincide(fila, filtros, rangos, estricto=False):
+    """
+    Determina si una fila podría formar parte del resultado de una consulta
+
+    Una columna ausente en la fila se considera coincidente, ya que no
+    permite descartar la consulta. Con `estricto` la fila debe traer todas
+    las columnas filtradas y cumplir cada filtro.
+
+    Args:
+        fila (dict): Datos de la fila escrita
+        filtros (dict): Filtros de igualdad de la consulta
+        rangos (dict): Filtros de rango de la consulta
+        estricto (bool): Exigir que la fila cumpla los filtros con certeza
+
+    Returns:
+        bool: False solo si la fila queda fuera de la consulta con certeza
+        (con `estricto`, True solo si forma parte de ella con certeza)
+    """
+    for key, value in (filtros or {}).items():
+        if key not in fila:
+            if estricto:
+                return False
+        elif fila[key] != value:
+            return False
+
+    for key, (minimo, maximo) in (rangos or {}).items():
+        if key not in fila or fila[key] is None:
+            if estricto:
+                return False
+            continue
+        try:
+            if minimo is not None and fila[key] < minimo:
+                return False
+            if maximo is not None and fila[key] > maximo:
+                return False
+        except TypeError:
+            if estricto:
+                return False
+            continue
+
+    return True
+
+def _clave_orden(fila, orden):
+    """Clave de ordenamiento de una fila según las columnas de la consulta"""
+    return tuple(fila.get(columna) for columna in orden)
+
+class CacheConsultas:
+    """
+    Caché de resultados de lectura indexada por tabla, filtros y proyección
+
+    Cada entrada pertenece al usuario que hizo la consulta (`ambito`): las
+    políticas RLS pueden darle a cada uno un resultado distinto, así que
+    una sesión nunca recibe lo consultado por otro usuario.
+
+    Las entradas expiran tras `ttl` segundos y, al superar `max_entradas`,
+    se descartan las menos usadas recientemente. Las escrituras invalidan
+    solo las consultas cuyo resultado podría haber cambiado, sean de quien
+    sean. Las tablas marcadas en vivo reciben sus cambios en tiempo real
+    (aplicar_cambio) y las entradas del usuario de la suscripción duran
+    TTL_EN_VIVO.
+    """
+
+    def __init__(self, ttl=TTL_SEGUNDOS, max_entradas=MAX_ENTRADAS):
+        """
+        Args:
+            ttl (float): Segundos de vigencia de cada entrada
+            max_entradas (int): Número máximo de consultas en caché
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.actualizaciones = 0
+        self.tablas_en_vivo = set()
+        self.ambito_en_vivo = None
+
+    @staticmethod
+    def clave(tabla, filtros=None, columnas=None, rangos=None, columnar=False, ambito=None):
+        """
+        Construye la clave de una consulta
+
+        Args:
+            tabla (str): Nombre de la tabla
+            filtros (dict, optional): Filtros de igualdad
+            columnas (list, optional): Proyección
+            rangos (dict, optional): Filtros de rango
+            columnar (bool): Si el resultado es un RegistrosColumnares
+            ambito (str, optional): Usuario que hace la consulta (ver auth.sesion.identidad_sesion)
+
+        Returns:
+            tuple: Clave inmutable de la consulta
+        """
+        return (
+            ambito,
+            tabla,
+            _congelar(filtros or {}),
+            _congelar(sorted(columnas) if columnas else ['*']),
+            _congelar(rangos or {}),
+            columnar
+        )
+
+    def obtener(self, tabla, filtros=None, columnas=None, rangos=None, columnar=False, ambito=None):
+        """
+        Busca el resultado de una consulta en la caché
+
+        Args:
+            tabla (str): Nombre de la tabla
+            filtros (dict, optional): Filtros de igualdad
+            columnas (list, optional): Proyección
+            rangos (dict, optional): Filtros de rango
+            columnar (bool): Buscar el resultado columnar de la consulta
+            ambito (str, optional): Usuario que hace la consulta
+
+        Returns:
+            list: Copia de la lista de registros (o el RegistrosColumnares,
+            inmutable y compartido), o None si no está en caché
+        """
+        clave = self.clave(tabla, filtros, columnas, rangos, columnar, ambito)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or time.monotonic() > entrada['expira']:
+                if entrada is not None:
+                    del self._entradas[clave]
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada['datos'] if columnar else list(entrada['datos'])
+
+    def guardar(self, tabla, datos, filtros=None, columnas=None, rangos=None, orden=None, limite=None,
+                columnar=False, ambito=None):
+        """
+        Guarda el resultado de una consulta
+
+        Args:
+            tabla (str): Nombre de la tabla
+            datos (list): Registros obtenidos
+            filtros (dict, optional): Filtros de igualdad
+            columnas (list, optional): Proyección
+            rangos (dict, optional): Filtros de rango
+            orden (tuple, optional): Columnas por las que viene ordenado el resultado
+            limite (int, optional): Límite de filas de la consulta
+            columnar (bool): Si `datos` es un RegistrosColumnares (se guarda sin copiar)
+            ambito (str, optional): Usuario que hizo la consulta
+        """
+        clave = self.clave(tabla, filtros, columnas, rangos, columnar, ambito)
+        with self._lock:
+            en_vivo = tabla in self.tablas_en_vivo and ambito == self.ambito_en_vivo
+            ttl = TTL_EN_VIVO if en_vivo else self.ttl
+            self._entradas[clave] = {
+                'ambito': ambito,
+                'tabla': tabla,
+                'filtros': dict(filtros or {}),
+                'rangos': dict(rangos or {}),
+                'columnas': list(columnas) if columnas else None,
+                'orden': tuple(orden) if orden else None,
+                'limite': limite,
+                'columnar': columnar,
+                'datos': datos if columnar else list(datos),
+                'expira': time.monotonic() + ttl
+            }
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def _descartar(self, condicion):
+        """Elimina las entradas que cumplen la condición (requiere el lock)"""
+        claves = [c for c, entrada in self._entradas.items() if condicion(entrada)]
+        for clave in claves:
+            del self._entradas[clave]
+        self.invalidaciones += len(claves)
+
+    def invalidar_insercion(self, tabla, filas):
+        """
+        Invalida las consultas que podrían incluir las filas insertadas
+
+        Args:
+            tabla (str): Nombre de la tabla
+            filas (dict | list): Fila o filas insertadas
+        """
+        if isinstance(filas, dict):
+            filas = [filas]
+        with self._lock:
+            self._descartar(lambda e: e['tabla'] == tabla and any(
+                _fila_coincide(fila, e['filtros'], e['rangos']) for fila in filas
+            ))
+
+    def invalidar_registro(self, tabla, id):
+        """
+        Invalida las consultas afectadas por la modificación o eliminación de un registro
+
+        Como no se conocen los valores anteriores de la fila, solo se conservan
+        las consultas que filtran explícitamente por otro id.
+
+        Args:
+            tabla (str): Nombre de la tabla
+            id (int): ID del registro modificado
+        """
+        with self._lock:
+            self._descartar(lambda e: e['tabla'] == tabla and e['filtros'].get('id', id) == id)
+
+    def invalidar_tabla(self, tabla):
+        """
+        Invalida todas las consultas de una tabla
+
+        Args:
+            tabla (str): Nombre de la tabla
+        """
+        with self._lock:
+            self._descartar(lambda e: e['tabla'] == tabla)
+
+    def marcar_en_vivo(self, tabla, en_vivo, ambito=None):
+        """
+        Indica si los cambios de una tabla llegan en tiempo real
+
+        Al dejar de estar en vivo se descartan sus consultas, ya que pudieron
+        perderse cambios mientras la suscripción estaba caída. Solo las
+        consultas del usuario del token de la suscripción reciben todos sus
+        cambios; las de otros usuarios conservan el TTL normal.
+
+        Args:
+            tabla (str): Nombre de la tabla
+            en_vivo (bool): True si la suscripción a la tabla está activa
+            ambito (str, optional): Usuario con cuyo token llegan los cambios
+        """
+        with self._lock:
+            self.ambito_en_vivo = ambito
+            if en_vivo:
+                self.tablas_en_vivo.add(tabla)
+            else:
+                self.tablas_en_vivo.discard(tabla)
+            self._descartar(lambda e: e['tabla'] == tabla)
+
+    def cambiar_ambito_en_vivo(self, ambito):
+        """
+        Cambia el usuario con cuyo token llegan los cambios en tiempo real
+
+        Solo se descartan las consultas en vivo del usuario anterior, que
+        dejan de recibir eventos, y las del nuevo, que pudieron perder
+        cambios con el TTL normal; las de los demás usuarios no cambian.
+
+        Args:
+            ambito (str): Usuario del nuevo token de la suscripción
+        """
+        with self._lock:
+            anterior, self.ambito_en_vivo = self.ambito_en_vivo, ambito
+            if anterior != ambito:
+                self._descartar(lambda e: e['tabla'] in self.tablas_en_vivo and e['ambito'] in (anterior, ambito))
+
+    def aplicar_cambio(self, tabla, tipo, registro, anterior=None, ambito=None):
+        """
+        Actualiza en sitio las consultas afectadas por un cambio en tiempo real
+
+        Se quita la versión anterior de la fila y, si la nueva cumple los
+        filtros de la consulta, se agrega con sus columnas y en la posición
+        que le corresponde según el orden. Las consultas que no se pueden
+        actualizar con certeza (sin id en la proyección, truncadas por su
+        límite o de otro usuario que el del evento, que podría no tener
+        acceso a la fila) y los resultados columnares, que son inmutables,
+        se descartan.
+
+        Args:
+            tabla (str): Nombre de la tabla
+            tipo (str): 'INSERT', 'UPDATE' o 'DELETE'
+            registro (dict): Fila nueva (vacía en DELETE)
+            anterior (dict, optional): Fila anterior (al menos su id)
+            ambito (str, optional): Usuario con cuyo token se recibió el evento
+
+        Returns:
+            int: Consultas actualizadas
+        """
+        id = (registro or anterior or {}).get('id')
+        nueva = registro if tipo != 'DELETE' else None
+        actualizadas = 0
+
+        with self._lock:
+            descartadas = []
+            for clave, entrada in self._entradas.items():
+                if entrada['tabla'] != tabla:
+                    continue
+
+                datos = entrada['datos']
+                columnas = entrada['columnas']
+                entra = nueva is not None and _fila_coincide(nueva, entrada['filtros'], entrada['rangos'], estricto=True)
+
+                # Sin id no se puede ubicar la versión anterior de la fila
+                if entrada['columnar'] or id is None or (columnas and 'id' not in columnas):
+                    if entra or tipo != 'INSERT':
+                        descartadas.append(clave)
+                    continue
+
+                posicion = next((i for i, fila in enumerate(datos) if fila.get('id') == id), None)
+                if posicion is None and not entra:
+                    continue
+
+                # Un resultado que llenó su límite pudo dejar filas fuera, y
+                # el evento no dice si las políticas RLS de otro usuario le dan acceso a la fila
+                if entrada['ambito'] != ambito or (entrada['limite'] is not None and len(datos) >= entrada['limite']):
+                    descartadas.append(clave)
+                    continue
+
+                datos = [fila for fila in datos if fila.get('id') != id]
+                if entra:
+                    fila = {c: nueva.get(c) for c in columnas} if columnas else dict(nueva)
+                    if entrada['orden']:
+                        try:
+                            clave_nueva = _clave_orden(nueva, entrada['orden'])
+                            posicion = next(
+                                (i for i, f in enumerate(datos) if _clave_orden(f, entrada['orden']) > clave_nueva),
+                                len(datos)
+                            )
+                        except TypeError:
+                            descartadas.append(clave)
+                            continue
+                    elif posicion is None:
+                        posicion = len(datos)
+                    datos.insert(posicion, fila)
+
+                entrada['datos'] = datos
+                actualizadas += 1
+
+            for clave in descartadas:
+                del self._entradas[clave]
+            self.invalidaciones += len(descartadas)
+            self.actualizaciones += actualizadas
+
+        return actualizadas
+
+    def estadisticas(self):
+        """
+        Retorna los contadores de la caché
+
+        Returns:
+            dict: Aciertos, fallos, tasa de aciertos, invalidaciones,
+            actualizaciones en tiempo real y entradas
+        """
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / total if total else 0.0,
+                'invalidaciones': self.invalidaciones,
+                'actualizaciones': self.actualizaciones,
+                'entradas': len(self._entradas)
+            }
@@ -0,0 +1,113 @@
+"""
+Asignación de códigos de muestra y probeta
+Reserva consecutivos diarios (comunes a todos los proyectos) por bloques con un contador atómico en la base de datos
+"""
+
+import threading
+
+import streamlit as st
+
+from database.resiliencia import ejecutar
+from utils.helpers import generar_codigo_muestra, generar_codigo_probeta
+
+# Consecutivos reservados por solicitud cuando el bloque local se agota
+TAMAÑO_BLOQUE = 10
+
+# Una letra por campo de probeta del formulario; por defecto se codifica un set de 3
+LETRAS_PROBETAS = "ABCD"
+PROBETAS_POR_MUESTRA = 3
+
+class AsignadorCodigos:
+    """
+    Entrega consecutivos diarios desde bloques reservados
+
+    El consecutivo es único por día entre todos los proyectos, ya que el
+    código de muestra (M-AAAAMMDD-NNN) no incluye el proyecto.
+
+    Cada bloque se reserva con una sola llamada a reservar_consecutivos(),
+    y los números se reparten localmente hasta agotarlo. Los números de un
+    bloque que no llegan a usarse (por ejemplo, si el proceso se reinicia)
+    quedan como saltos en la secuencia, nunca como duplicados.
+    """
+
+    def __init__(self, tamaño_bloque=TAMAÑO_BLOQUE):
+        """
+        Args:
+            tamaño_bloque (int): Consecutivos mínimos a reservar por solicitud
+        """
+        self.tamaño_bloque = tamaño_bloque
+        self._lock = threading.Lock()
+        self._bloques = {}
+
+    def reservar(self, supabase, fecha, cantidad):
+        """
+        Reserva consecutivos de un día
+
+        Args:
+            supabase: Cliente de Supabase
+            fecha (date): Fecha del muestreo
+            cantidad (int): Consecutivos necesarios
+
+        Returns:
+            list: Consecutivos reservados, en orden
+        """
+        clave = fecha.isoformat()
+        with self._lock:
+            siguiente, limite = self._bloques.get(clave, (0, 0))
+            consecutivos = list(range(siguiente, min(limite, siguiente + cantidad)))
+            faltantes = cantidad - len(consecutivos)
+
+            if faltantes:
+                # Un solo viaje a la base de datos cubre todo lo que falta
+                bloque = max(faltantes, self.tamaño_bloque)
+                # No idempotente: repetirla reservaría otro bloque
+                inicio = ejecutar(supabase.rpc('reservar_consecutivos', {
+                    'p_fecha': fecha.isoformat(),
+                    'p_cantidad': bloque
+                }), idempotente=False).data
+                consecutivos += list(range(inicio, inicio + faltantes))
+                siguiente, limite = inicio + faltantes, inicio + bloque
+            else:
+                siguiente += cantidad
+
+            self._bloques[clave] = (siguiente, limite)
+            return consecutivos
+
+@st.cache_resource(show_spinner=False)
+def obtener_asignador():
+    """
+    Crea el asignador de códigos compartido por todo el proceso
+
+    Returns:
+        AsignadorCodigos: Asignador de consecutivos
+    """
+    return AsignadorCodigos()
+
+def asignar_codigos_muestra(supabase, fecha, cantidad=1, probetas=PROBETAS_POR_MUESTRA):
+    """
+    Asigna códigos de muestra y de sus probetas
+
+    Args:
+        supabase: Cliente de Supabase
+        fecha (date): Fecha del muestreo
+        cantidad (int): Número de muestras del vaciado
+        probetas (int): Probetas por muestra
+
+    Returns:
+        list: Un dict por muestra con 'codigo_muestra' y 'probetas'
+
+    Raises:
+        ValueError: Si el número de probetas no tiene letras disponibles
+    """
+    if not 1 <= probetas <= len(LETRAS_PROBETAS):
+        raise ValueError(f"Se admiten de 1 a {len(LETRAS_PROBETAS)} probetas por muestra")
+    letras = LETRAS_PROBETAS[:probetas]
+
+    codigos = []
+    for consecutivo in obtener_asignador().reservar(supabase, fecha, cantidad):
+        codigo = generar_codigo_muestra(fecha, consecutivo)
+        codigos.append({
+            'codigo_muestra': codigo,
+            'probetas': [generar_codigo_probeta(codigo, letra) for letra in letras]
+        })
+    return codigos
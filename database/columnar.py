@@ -0,0 +1,257 @@
+"""
+Resultados columnares
+Contenedor compacto de lecturas masivas: un arreglo por columna en lugar
+de un dict por fila
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Filas convertidas a dicts por tramo al recorrer el resultado fila a fila
+TAMAÑO_TRAMO = 1000
+
+def _tipo_codigos(categorias):
+    """Entero más pequeño para los códigos (el mismo que elige pandas, para no copiarlos)"""
+    for tipo in (np.int8, np.int16, np.int32):
+        if categorias < np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+class _Columna:
+    """
+    Acumula los valores de una columna página por página
+
+    Cada página se convierte de inmediato a arreglos; los textos (también
+    los de las listas) se codifican contra un diccionario común a todas
+    las páginas.
+    """
+
+    def __init__(self, tipo):
+        self.tipo = tipo
+        self.partes = []
+        self.mascaras = []
+        self.longitudes = []
+        self.categorias = {} if tipo in ('texto', 'hora', 'lista') else None
+
+    def _codificar(self, valores):
+        """Códigos de los textos en el diccionario de la columna (-1 para None)"""
+        codigos = self.categorias
+        return np.array([-1 if v is None else codigos.setdefault(v, len(codigos)) for v in valores], dtype=np.int64)
+
+    def agregar(self, valores):
+        """Convierte y guarda los valores de una página"""
+        if self.tipo == 'numero':
+            self.partes.append(np.array(valores, dtype=np.float64))
+        elif self.tipo == 'fecha':
+            self.partes.append(np.array(valores, dtype='datetime64[s]'))
+        elif self.tipo in ('entero', 'booleano'):
+            tipo = np.int64 if self.tipo == 'entero' else np.bool_
+            self.mascaras.append(np.array([v is None for v in valores], dtype=np.bool_))
+            self.partes.append(np.array([0 if v is None else v for v in valores], dtype=tipo))
+        elif self.tipo == 'lista':
+            self.mascaras.append(np.array([v is None for v in valores], dtype=np.bool_))
+            self.longitudes.append(np.array([len(v or ()) for v in valores], dtype=np.int32))
+            self.partes.append(self._codificar([elemento for v in valores for elemento in v or ()]))
+        else:
+            self.partes.append(self._codificar(valores))
+
+    def cerrar(self):
+        """
+        Une las páginas en los arreglos finales
+
+        Returns:
+            dict: 'valores', y según el tipo 'mascara', 'categorias' y 'desplazamientos'
+        """
+        arreglos = {}
+        if self.categorias is not None:
+            # Las listas no pasan por pandas.Categorical: basta con int32
+            tipo = np.int32 if self.tipo == 'lista' else _tipo_codigos(len(self.categorias))
+            arreglos['categorias'] = pa.array(list(self.categorias), pa.string())
+        else:
+            tipo = {'numero': np.float64, 'fecha': 'datetime64[s]', 'entero': np.int64, 'booleano': np.bool_}[self.tipo]
+
+        arreglos['valores'] = np.concatenate(self.partes).astype(tipo, copy=False) if self.partes else np.empty(0, tipo)
+        if self.tipo in ('entero', 'booleano', 'lista'):
+            arreglos['mascara'] = np.concatenate(self.mascaras) if self.mascaras else np.empty(0, np.bool_)
+        if self.tipo == 'lista':
+            longitudes = np.concatenate(self.longitudes) if self.longitudes else np.empty(0, np.int32)
+            arreglos['desplazamientos'] = np.concatenate(([0], np.cumsum(longitudes))).astype(np.int32)
+        return arreglos
+
+class RegistrosColumnares:
+    """
+    Resultado de una lectura masiva guardado por columnas
+
+    Según el tipo de la columna (ver database/esquema.py):
+      - numero: float64 con NaN como nulo
+      - entero, booleano: int64 / bool más una máscara de nulos
+      - fecha: datetime64[s] con NaT como nulo
+      - texto, hora: códigos enteros sobre los valores distintos, guardados
+        como un solo bloque UTF-8 de Arrow (sin un objeto str por valor)
+      - lista: desplazamientos más los códigos de sus elementos
+
+    Para un proyecto típico ocupa cerca de una décima parte de la lista de
+    dicts equivalente, es inmutable (la caché lo comparte entre sesiones
+    sin copiarlo) y se convierte a pandas sin copiar los arreglos.
+    """
+
+    def __init__(self, tipos, arreglos, filas):
+        """
+        Args:
+            tipos (dict): Columna -> tipo
+            arreglos (dict): Columna -> arreglos de _Columna.cerrar()
+            filas (int): Número de filas
+        """
+        self.tipos = dict(tipos)
+        self._arreglos = arreglos
+        self._filas = filas
+        for columna in arreglos.values():
+            for arreglo in columna.values():
+                if isinstance(arreglo, np.ndarray):
+                    arreglo.flags.writeable = False
+
+    @classmethod
+    def desde_paginas(cls, paginas, tipos):
+        """
+        Construye el contenedor a partir de páginas de registros
+
+        Solo la página en curso existe como dicts; las anteriores ya están
+        convertidas a arreglos.
+
+        Args:
+            paginas (iterable): Listas de registros (ej. iterar_paginas)
+            tipos (dict): Columna -> tipo
+
+        Returns:
+            RegistrosColumnares: Contenedor con todas las filas
+        """
+        columnas = {columna: _Columna(tipo) for columna, tipo in tipos.items()}
+        filas = 0
+        for pagina in paginas:
+            for nombre, columna in columnas.items():
+                columna.agregar([fila.get(nombre) for fila in pagina])
+            filas += len(pagina)
+        return cls(tipos, {nombre: columna.cerrar() for nombre, columna in columnas.items()}, filas)
+
+    def __len__(self):
+        return self._filas
+
+    @property
+    def columnas(self):
+        """Nombres de las columnas, en orden"""
+        return list(self.tipos)
+
+    def _arrow(self, columna):
+        """Arreglo de Arrow de una columna de texto o lista, compartiendo la memoria"""
+        arreglos = self._arreglos[columna]
+        valores = arreglos['valores']
+        if self.tipos[columna] == 'lista':
+            elementos = pa.DictionaryArray.from_arrays(pa.array(valores), arreglos['categorias'])
+            return pa.ListArray.from_arrays(pa.array(arreglos['desplazamientos']), elementos,
+                                            mask=pa.array(arreglos['mascara']))
+        return pa.DictionaryArray.from_arrays(pa.array(valores, mask=valores < 0), arreglos['categorias'])
+
+    def a_numpy(self, columna):
+        """
+        Retorna una columna como arreglo de NumPy
+
+        Las columnas numero y fecha, y las entero/booleano sin nulos, se
+        entregan sin copiar (de solo lectura). Las demás se materializan:
+        entero con nulos como float64 con NaN, y booleano con nulos, texto
+        y lista como arreglos de objetos con None.
+
+        Args:
+            columna (str): Nombre de la columna
+
+        Returns:
+            numpy.ndarray: Valores de la columna
+        """
+        arreglos = self._arreglos[columna]
+        tipo = self.tipos[columna]
+        if 'categorias' in arreglos:
+            resultado = np.empty(self._filas, dtype=object)
+            resultado[:] = self._arrow(columna).to_pylist()
+            return resultado
+
+        valores, mascara = arreglos['valores'], arreglos.get('mascara')
+        if mascara is None or not mascara.any():
+            return valores
+        if tipo == 'entero':
+            return np.where(mascara, np.nan, valores)
+        resultado = valores.astype(object)
+        resultado[mascara] = None
+        return resultado
+
+    def _serie(self, columna):
+        """Arreglo de pandas de una columna, compartiendo la memoria"""
+        arreglos = self._arreglos[columna]
+        tipo = self.tipos[columna]
+        if tipo == 'lista':
+            return pd.arrays.ArrowExtensionArray(self._arrow(columna))
+        if tipo in ('texto', 'hora'):
+            categorias = pd.Index(pd.arrays.ArrowStringArray(arreglos['categorias']))
+            return pd.Categorical.from_codes(arreglos['valores'], dtype=pd.CategoricalDtype(categorias), validate=False)
+        if tipo == 'entero':
+            return pd.arrays.IntegerArray(arreglos['valores'], arreglos['mascara'])
+        if tipo == 'booleano':
+            return pd.arrays.BooleanArray(arreglos['valores'], arreglos['mascara'])
+        return arreglos['valores']
+
+    def a_pandas(self):
+        """
+        Convierte el resultado en DataFrame sin copiar los arreglos
+
+        Los textos quedan como columnas categóricas, los enteros y booleanos
+        con los tipos nullable de pandas (Int64, boolean) y las listas como
+        listas de Arrow.
+
+        Returns:
+            pd.DataFrame: Una columna por columna del resultado
+        """
+        return pd.DataFrame({columna: self._serie(columna) for columna in self.tipos}, copy=False)
+
+    def filas(self, tamaño_tramo=TAMAÑO_TRAMO):
+        """
+        Recorre el resultado como dicts con los valores de la base de datos
+
+        Para código que espera la lista de registros de PostgREST; los
+        valores de Python se arman por tramos, no para todo el resultado.
+
+        Args:
+            tamaño_tramo (int): Filas convertidas por tramo
+
+        Yields:
+            dict: Un registro por iteración
+        """
+        nombres = list(self.tipos)
+        for inicio in range(0, self._filas, tamaño_tramo):
+            columnas = [self._a_python(columna, inicio, tamaño_tramo) for columna in nombres]
+            for valores in zip(*columnas):
+                yield dict(zip(nombres, valores))
+
+    def _a_python(self, columna, inicio, cantidad):
+        """Valores de un tramo de la columna como tipos de Python (None como nulo)"""
+        arreglos = self._arreglos[columna]
+        tipo = self.tipos[columna]
+        if 'categorias' in arreglos:
+            return self._arrow(columna).slice(inicio, cantidad).to_pylist()
+
+        valores = arreglos['valores'][inicio:inicio + cantidad]
+        if tipo == 'fecha':
+            return [None if texto == 'NaT' else texto for texto in np.datetime_as_string(valores, unit='D').tolist()]
+        if tipo == 'numero':
+            return [None if v != v else v for v in valores.tolist()]
+        if 'mascara' in arreglos:
+            mascara = arreglos['mascara'][inicio:inicio + cantidad]
+            return [None if nulo else v for v, nulo in zip(valores.tolist(), mascara.tolist())]
+        return valores.tolist()
+
+    def memoria(self):
+        """
+        Bytes ocupados por el contenedor
+
+        Returns:
+            int: Suma de los arreglos de todas las columnas
+        """
+        return sum(arreglo.nbytes for columna in self._arreglos.values() for arreglo in columna.values())
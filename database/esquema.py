@@ -0,0 +1,54 @@
+"""
+Esquema de las tablas
+Columnas de muestreos y roturas con su tipo, compartidas por la exportación
+y por los resultados columnares
+"""
+
+# Columnas de cada tabla y su tipo
+# tipo: texto | numero | entero | fecha | hora | booleano | lista
+COLUMNAS_MUESTREOS = {
+    'id': 'entero',
+    'proyecto': 'texto',
+    'elemento': 'texto',
+    'ubicacion': 'texto',
+    'fecha_vaciado': 'fecha',
+    'hora_vaciado': 'hora',
+    'temperatura': 'numero',
+    'fc_diseno': 'entero',
+    'slump_especificado': 'numero',
+    'tipo_cemento': 'texto',
+    'tamano_max_agregado': 'texto',
+    'relacion_ac': 'numero',
+    'aditivo': 'texto',
+    'proveedor': 'texto',
+    'guia_remision': 'texto',
+    'num_camion': 'texto',
+    'volumen_pedido': 'numero',
+    'hora_salida_planta': 'hora',
+    'hora_llegada_obra': 'hora',
+    'codigo_muestra': 'texto',
+    'probetas': 'lista',
+    'diametro_cm': 'numero',
+    'altura_cm': 'numero',
+    'edad_7': 'booleano',
+    'edad_28': 'booleano',
+    'otra_edad': 'entero',
+    'observaciones': 'texto',
+    'responsable_muestreo': 'texto',
+    'hora_moldeo': 'hora',
+    'usuario': 'texto'
+}
+
+COLUMNAS_ROTURAS = {
+    'id': 'entero',
+    'codigo_probeta': 'texto',
+    'codigo_muestra': 'texto',
+    'proyecto': 'texto',
+    'proveedor': 'texto',
+    'fc_diseno': 'entero',
+    'edad_dias': 'entero',
+    'fecha_ensayo': 'fecha',
+    'carga_kg': 'numero',
+    'resistencia': 'numero',
+    'usuario': 'texto'
+}
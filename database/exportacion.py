@@ -0,0 +1,179 @@
+"""
+Exportación masiva
+Descarga de muestreos y roturas a CSV o Parquet, escrita página por página
+"""
+
+import csv
+import io
+import tempfile
+from datetime import date
+
+from database.esquema import COLUMNAS_MUESTREOS, COLUMNAS_ROTURAS
+from database.supabase_client import iterar_paginas
+
+# Conjuntos exportables: tabla, columnas y columna del filtro de fechas
+CONJUNTOS = {
+    'muestreos': {'tabla': 'muestreos', 'columnas': COLUMNAS_MUESTREOS, 'fecha': 'fecha_vaciado'},
+    'roturas': {'tabla': 'roturas', 'columnas': COLUMNAS_ROTURAS, 'fecha': 'fecha_ensayo'}
+}
+
+FORMATOS = {
+    'csv': {'extension': 'csv', 'mime': 'text/csv'},
+    'parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'}
+}
+
+# Bytes que el archivo de salida mantiene en memoria antes de pasar a disco
+MEMORIA_MAXIMA = 16 * 1024 * 1024
+
+# Filas por row group de Parquet (las páginas se acumulan hasta completarlo)
+FILAS_POR_GRUPO = 50_000
+
+def _valor_csv(valor, tipo):
+    """Convierte un valor de la base de datos en texto de la planilla"""
+    if valor is None:
+        return ''
+    if tipo == 'lista':
+        return ', '.join(map(str, valor))
+    if tipo == 'booleano':
+        return 'sí' if valor else 'no'
+    return valor
+
+def escribir_csv(paginas, columnas, destino):
+    """
+    Escribe las páginas como CSV (UTF-8 con BOM, para que Excel lo abra con tildes)
+
+    Los encabezados son los nombres de columna que acepta la importación.
+
+    Args:
+        paginas (iterable): Listas de registros
+        columnas (dict): Columna -> tipo
+        destino: Archivo binario de salida
+    """
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    escritor = csv.writer(texto)
+    escritor.writerow(columnas)
+    for pagina in paginas:
+        escritor.writerows(
+            [_valor_csv(fila.get(columna), tipo) for columna, tipo in columnas.items()]
+            for fila in pagina
+        )
+    texto.flush()
+    texto.detach()
+
+def _esquema_arrow(columnas):
+    """Construye el esquema de Arrow de las columnas exportadas"""
+    import pyarrow as pa
+
+    tipos = {
+        'texto': pa.string(),
+        'hora': pa.string(),
+        'numero': pa.float64(),
+        'entero': pa.int64(),
+        'fecha': pa.date32(),
+        'booleano': pa.bool_(),
+        'lista': pa.list_(pa.string())
+    }
+    return pa.schema([(columna, tipos[tipo]) for columna, tipo in columnas.items()])
+
+def _lote_arrow(pagina, columnas, esquema):
+    """Convierte una página de registros en un RecordBatch con el esquema fijo"""
+    import pyarrow as pa
+
+    arreglos = []
+    for columna, tipo in columnas.items():
+        valores = [fila.get(columna) for fila in pagina]
+        if tipo == 'fecha':
+            # Las fechas llegan en ISO 8601 desde PostgREST
+            arreglos.append(pa.array(valores, pa.string()).cast(pa.date32()))
+        else:
+            arreglos.append(pa.array(valores, esquema.field(columna).type))
+    return pa.RecordBatch.from_arrays(arreglos, schema=esquema)
+
+def escribir_parquet(paginas, columnas, destino, filas_por_grupo=FILAS_POR_GRUPO):
+    """
+    Escribe las páginas como Parquet, un row group cada `filas_por_grupo` filas
+
+    Args:
+        paginas (iterable): Listas de registros
+        columnas (dict): Columna -> tipo
+        destino: Archivo binario de salida
+        filas_por_grupo (int): Filas por row group
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_arrow(columnas)
+    with pq.ParquetWriter(destino, esquema, compression='zstd') as escritor:
+        lotes, filas = [], 0
+        for pagina in paginas:
+            lotes.append(_lote_arrow(pagina, columnas, esquema))
+            filas += len(pagina)
+            if filas >= filas_por_grupo:
+                escritor.write_table(pa.Table.from_batches(lotes, esquema), row_group_size=filas)
+                lotes, filas = [], 0
+        if lotes:
+            escritor.write_table(pa.Table.from_batches(lotes, esquema))
+
+def generar_exportacion(supabase, conjunto, formato, columnas=None, filtros=None, desde=None, hasta=None):
+    """
+    Genera el archivo de exportación de un conjunto de datos
+
+    La selección de columnas y los filtros se resuelven en la consulta y las
+    filas se escriben página por página: nunca hay más de una página (o un
+    row group de Parquet) en memoria. El archivo de salida pasa a disco al
+    superar MEMORIA_MAXIMA.
+
+    Args:
+        supabase: Cliente de Supabase
+        conjunto (str): 'muestreos' o 'roturas'
+        formato (str): 'csv' o 'parquet'
+        columnas (list, optional): Columnas a exportar (por defecto todas)
+        filtros (dict, optional): Columna -> valor exacto
+        desde (date, optional): Fecha mínima (vaciado o ensayo)
+        hasta (date, optional): Fecha máxima (vaciado o ensayo)
+
+    Returns:
+        SpooledTemporaryFile: Archivo listo para leer desde el inicio
+
+    Raises:
+        ValueError: Si el conjunto, el formato o alguna columna no existen
+        Exception: Si alguna consulta falla
+    """
+    if conjunto not in CONJUNTOS or formato not in FORMATOS:
+        raise ValueError(f"Exportación no soportada: {conjunto} en {formato}")
+    definicion = CONJUNTOS[conjunto]
+
+    seleccion = list(columnas or definicion['columnas'])
+    desconocidas = [c for c in seleccion if c not in definicion['columnas']]
+    if desconocidas:
+        raise ValueError(f"Columnas no exportables: {', '.join(desconocidas)}")
+    tipos = {columna: definicion['columnas'][columna] for columna in seleccion}
+
+    rangos = {}
+    if desde or hasta:
+        rangos[definicion['fecha']] = (
+            desde.isoformat() if isinstance(desde, date) else desde,
+            hasta.isoformat() if isinstance(hasta, date) else hasta
+        )
+
+    paginas = iterar_paginas(supabase, definicion['tabla'], seleccion, filtros, rangos)
+    destino = tempfile.SpooledTemporaryFile(max_size=MEMORIA_MAXIMA)
+    try:
+        if formato == 'csv':
+            escribir_csv(paginas, tipos, destino)
+        else:
+            escribir_parquet(paginas, tipos, destino)
+    except BaseException:
+        destino.close()
+        raise
+    destino.seek(0)
+    return destino
+
+def nombre_archivo(conjunto, formato, hoy=None):
+    """
+    Nombre sugerido del archivo de exportación
+
+    Returns:
+        str: Ej. 'muestreos_2024-05-31.parquet'
+    """
+    return f"{conjunto}_{(hoy or date.today()).isoformat()}.{FORMATOS[formato]['extension']}"
@@ -0,0 +1,194 @@
+"""
+Importación masiva
+Guías de remisión y resultados de laboratorio desde planillas, leídas y escritas por bloques
+"""
+
+import hashlib
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from database.supabase_client import (completar_ensayos, guardar_registros_muestreo, guardar_registros_rotura,
+                                      obtener_muestras_por_codigo)
+from utils.planillas import GUIAS, ROTURAS, a_registros, columnas_faltantes, leer_por_bloques, validar_bloque
+
+# Espacio de nombres de las claves de idempotencia de las filas importadas
+ESPACIO_IMPORTACION = uuid.UUID('6f0c3f1e-4b7a-5d2e-9a61-3c8e2b7d1f40')
+
+# Columnas de la planilla de guías que no van a la base de datos tal cual
+COLUMNAS_PROBETAS = ['probeta_1', 'probeta_2', 'probeta_3', 'probeta_4']
+COLUMNAS_SOLO_VALIDACION = ['slump_medido']
+
+# Datos de la muestra que completan cada rotura
+COLUMNAS_MUESTRA = ['codigo_muestra', 'proyecto', 'proveedor', 'fc_diseno', 'diametro_cm']
+
+# Columna usada en el reporte para los rechazos de la base de datos
+COLUMNA_BASE_DATOS = 'base de datos'
+
+def huella_archivo(archivo):
+    """
+    Calcula el SHA-256 de un archivo sin cargarlo completo
+
+    Args:
+        archivo: Archivo binario
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    archivo.seek(0)
+    huella = hashlib.sha256()
+    for parte in iter(lambda: archivo.read(1024 * 1024), b''):
+        huella.update(parte)
+    archivo.seek(0)
+    return huella.hexdigest()
+
+def _nuevo_resultado():
+    """Acumulador del resultado de una importación"""
+    return {'filas': 0, 'guardadas': 0, 'errores': [], 'advertencias': [], 'sin_conexion': False}
+
+def _bloques_validados(archivo, nombre, reglas, resultado):
+    """
+    Lee y valida la planilla por bloques, acumulando errores y advertencias
+
+    Yields:
+        DataFrame: Filas válidas de cada bloque
+
+    Raises:
+        ValueError: Si faltan columnas obligatorias
+    """
+    for numero, bloque in enumerate(leer_por_bloques(archivo, nombre)):
+        if numero == 0:
+            faltantes = columnas_faltantes(bloque, reglas)
+            if faltantes:
+                raise ValueError(f"Faltan columnas obligatorias: {', '.join(faltantes)}")
+
+        validas, errores, advertencias = validar_bloque(bloque, reglas)
+        resultado['filas'] += len(bloque)
+        resultado['errores'] += errores
+        resultado['advertencias'] += advertencias
+        yield validas
+
+def _acumular_escritura(resultado, escritura, filas):
+    """
+    Suma una escritura por lotes al resultado, con los errores por fila de la planilla
+
+    Returns:
+        set: Posiciones (dentro del bloque) de las filas rechazadas
+    """
+    rechazadas = {indice for indice, _ in escritura['errores']}
+    resultado['guardadas'] += escritura['guardados']
+    resultado['errores'] += [(int(filas[indice]), COLUMNA_BASE_DATOS, mensaje) for indice, mensaje in escritura['errores']]
+    resultado['sin_conexion'] |= escritura['sin_conexion']
+    return rechazadas
+
+def importar_guias(supabase, archivo, nombre, usuario, progreso=None):
+    """
+    Importa una planilla de guías de remisión como muestreos
+
+    Cada fila recibe una clave de idempotencia derivada del archivo y de su
+    número de fila: volver a importar el mismo archivo (por ejemplo, tras un
+    corte de red) no duplica muestreos. Los ensayos de rotura se programan
+    en la base de datos (trigger) igual que al guardar desde el formulario.
+
+    Args:
+        supabase: Cliente de Supabase
+        archivo: Archivo CSV o XLSX
+        nombre (str): Nombre del archivo
+        usuario (str): Correo del usuario que importa
+        progreso (callable, optional): Recibe el resultado parcial tras cada bloque
+
+    Returns:
+        dict: {'filas', 'guardadas', 'errores': [(fila, columna, mensaje)],
+               'advertencias': [...], 'sin_conexion'}
+
+    Raises:
+        ValueError: Si faltan columnas obligatorias
+    """
+    huella = huella_archivo(archivo)
+    resultado = _nuevo_resultado()
+
+    for validas in _bloques_validados(archivo, nombre, GUIAS, resultado):
+        filas = validas.index.to_numpy()
+        probetas = [[p for p in fila if p] for fila in validas[COLUMNAS_PROBETAS].to_numpy()]
+        registros = a_registros(validas.drop(columns=COLUMNAS_PROBETAS + COLUMNAS_SOLO_VALIDACION))
+        for fila, registro, codigos in zip(filas, registros, probetas):
+            registro['probetas'] = codigos
+            registro['id_local'] = str(uuid.uuid5(ESPACIO_IMPORTACION, f"{huella}:{fila}"))
+            registro['usuario'] = usuario
+
+        escritura = guardar_registros_muestreo(supabase, registros, clave_conflicto='id_local')
+        _acumular_escritura(resultado, escritura, filas)
+        if progreso:
+            progreso(resultado)
+        if resultado['sin_conexion']:
+            break
+
+    return resultado
+
+def importar_roturas(supabase, archivo, nombre, usuario, progreso=None):
+    """
+    Importa una planilla de roturas del laboratorio
+
+    Proyecto, proveedor, f'c y diámetro salen del muestreo de cada código de
+    muestra (una consulta por bloque). La resistencia se calcula con la carga
+    y el área de la probeta, y los ensayos programados de las probetas
+    guardadas se marcan como completados.
+
+    Args:
+        supabase: Cliente de Supabase
+        archivo: Archivo CSV o XLSX
+        nombre (str): Nombre del archivo
+        usuario (str): Correo del usuario que importa
+        progreso (callable, optional): Recibe el resultado parcial tras cada bloque
+
+    Returns:
+        dict: Ver importar_guias
+
+    Raises:
+        ValueError: Si faltan columnas obligatorias
+    """
+    resultado = _nuevo_resultado()
+
+    for validas in _bloques_validados(archivo, nombre, ROTURAS, resultado):
+        if validas.empty:
+            continue
+
+        muestras = obtener_muestras_por_codigo(supabase, validas['codigo_muestra'].unique().tolist(), COLUMNAS_MUESTRA)
+        if muestras is None:
+            resultado['sin_conexion'] = True
+            break
+
+        datos = pd.DataFrame(list(muestras.values()), columns=COLUMNAS_MUESTRA).set_index('codigo_muestra')
+        roturas = validas.join(datos, on='codigo_muestra', rsuffix='_muestra')
+
+        desconocidas = roturas['proyecto'].isna().to_numpy()
+        resultado['errores'] += [
+            (int(fila), 'codigo_muestra', f"Muestra no registrada: '{codigo}'")
+            for fila, codigo in zip(roturas.index[desconocidas], roturas['codigo_muestra'][desconocidas])
+        ]
+        roturas = roturas[~desconocidas]
+
+        diametro = roturas['diametro_cm'].astype(float).fillna(roturas['diametro_cm_muestra'].astype(float))
+        roturas = roturas.assign(
+            proveedor=roturas['proveedor'].fillna(''),
+            resistencia=(roturas['carga_kg'] / (np.pi * diametro ** 2 / 4)).round(1),
+            usuario=usuario
+        )
+        columnas = ['codigo_probeta', 'codigo_muestra', 'proyecto', 'proveedor', 'fc_diseno', 'edad_dias',
+                    'fecha_ensayo', 'carga_kg', 'resistencia', 'usuario']
+
+        filas = roturas.index.to_numpy()
+        escritura = guardar_registros_rotura(supabase, a_registros(roturas[columnas]))
+        rechazadas = _acumular_escritura(resultado, escritura, filas)
+
+        guardadas = roturas[~np.isin(np.arange(len(roturas)), list(rechazadas))]
+        for edad, grupo in guardadas.groupby('edad_dias'):
+            completar_ensayos(supabase, grupo['codigo_muestra'].unique().tolist(), int(edad))
+
+        if progreso:
+            progreso(resultado)
+        if resultado['sin_conexion']:
+            break
+
+    return resultado
@@ -0,0 +1,405 @@
+"""
+Journal local de escrituras
+Guarda los registros primero en SQLite y los sincroniza con Supabase en segundo plano
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import streamlit as st
+
+from auth.sesion import decodificar_jwt, token_acceso
+from database.supabase_client import cliente_para_token, guardar_registros_muestreo
+
+RUTA_JOURNAL = Path(__file__).resolve().parent.parent / 'datos_locales' / 'journal.sqlite3'
+
+# Columna única en Supabase que hace idempotente el reenvío de un registro
+CLAVE_IDEMPOTENCIA = 'id_local'
+
+# Parámetros de sincronización
+TAMAÑO_LOTE_SYNC = 100
+INTERVALO_SYNC = 5.0  # segundos entre ciclos sin novedades
+ESPERA_MAXIMA = 300.0  # tope del backoff exponencial
+MAX_INTENTOS = 5  # rechazos de la base de datos antes de marcar conflicto
+MARGEN_TOKEN = 60.0  # segundos de vigencia mínimos para usar el token de un usuario
+
+class JournalLocal:
+    """
+    Cola persistente de registros pendientes de enviar a Supabase
+
+    Cada registro queda en estado 'pendiente' hasta que se confirma su
+    escritura; si la base de datos lo rechaza MAX_INTENTOS veces pasa a
+    'conflicto' y deja de reintentarse hasta que alguien lo revise. Cada
+    registro guarda a su propietario (el usuario que lo creó), con cuyas
+    credenciales se envía.
+    """
+
+    def __init__(self, ruta=RUTA_JOURNAL):
+        """
+        Args:
+            ruta (Path): Archivo SQLite del journal
+        """
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(str(self.ruta), check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.execute("""
+            CREATE TABLE IF NOT EXISTS pendientes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tabla TEXT NOT NULL,
+                datos TEXT NOT NULL,
+                creado REAL NOT NULL,
+                intentos INTEGER NOT NULL DEFAULT 0,
+                estado TEXT NOT NULL DEFAULT 'pendiente',
+                ultimo_error TEXT,
+                propietario TEXT
+            )
+        """)
+        # Journals creados antes de guardar el propietario
+        columnas = [fila[1] for fila in self._conexion.execute("PRAGMA table_info(pendientes)")]
+        if 'propietario' not in columnas:
+            self._conexion.execute("ALTER TABLE pendientes ADD COLUMN propietario TEXT")
+        self._conexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pendientes_estado ON pendientes (estado, id)"
+        )
+        self._conexion.commit()
+
+    def registrar(self, tabla, datos, propietario=None):
+        """
+        Agrega un registro al journal
+
+        Args:
+            tabla (str): Tabla de destino
+            datos (dict): Datos del registro (serializables a JSON)
+            propietario (str, optional): Usuario que lo creó (claim sub de su token)
+
+        Returns:
+            dict: Datos guardados, incluyendo la clave de idempotencia
+        """
+        datos = dict(datos)
+        datos.setdefault(CLAVE_IDEMPOTENCIA, str(uuid.uuid4()))
+        with self._lock:
+            self._conexion.execute(
+                "INSERT INTO pendientes (tabla, datos, creado, propietario) VALUES (?, ?, ?, ?)",
+                (tabla, json.dumps(datos, default=str), time.time(), propietario)
+            )
+            self._conexion.commit()
+        return datos
+
+    def pendientes(self, tabla, limite, despues_de=0, propietario=None):
+        """
+        Retorna los registros pendientes más antiguos de una tabla y un propietario
+
+        Args:
+            tabla (str): Tabla de destino
+            limite (int): Número máximo de registros
+            despues_de (int): Solo registros con ID del journal mayor a este
+            propietario (str, optional): Usuario dueño de los registros
+
+        Returns:
+            list: Pares (id_journal, datos)
+        """
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT id, datos FROM pendientes WHERE tabla = ? AND estado = 'pendiente' "
+                "AND propietario IS ? AND id > ? ORDER BY id LIMIT ?",
+                (tabla, propietario, despues_de, limite)
+            ).fetchall()
+        return [(id_journal, json.loads(datos)) for id_journal, datos in filas]
+
+    def propietarios(self, tabla):
+        """
+        Retorna los usuarios con registros pendientes en una tabla
+
+        Args:
+            tabla (str): Tabla de destino
+
+        Returns:
+            list: Propietarios (None para registros anteriores a guardar el propietario)
+        """
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT DISTINCT propietario FROM pendientes WHERE tabla = ? AND estado = 'pendiente'",
+                (tabla,)
+            ).fetchall()
+        return [propietario for propietario, in filas]
+
+    def adoptar(self, propietario, usuario):
+        """
+        Asigna a un usuario los registros sin propietario que él mismo registró
+
+        Los registros anteriores a guardar el propietario solo conservan el
+        correo del usuario en sus datos.
+
+        Args:
+            propietario (str): Usuario (claim sub de su token)
+            usuario (str): Correo del usuario
+        """
+        with self._lock:
+            self._conexion.execute(
+                "UPDATE pendientes SET propietario = ? "
+                "WHERE propietario IS NULL AND json_extract(datos, '$.usuario') = ?",
+                (propietario, usuario)
+            )
+            self._conexion.commit()
+
+    def confirmar(self, ids):
+        """
+        Elimina del journal los registros ya escritos en Supabase
+
+        Args:
+            ids (list): IDs del journal
+        """
+        if not ids:
+            return
+        with self._lock:
+            self._conexion.executemany("DELETE FROM pendientes WHERE id = ?", [(i,) for i in ids])
+            self._conexion.commit()
+
+    def marcar_error(self, id_journal, mensaje):
+        """
+        Registra un rechazo de la base de datos para un registro
+
+        Args:
+            id_journal (int): ID del journal
+            mensaje (str): Error devuelto
+        """
+        with self._lock:
+            self._conexion.execute(
+                "UPDATE pendientes SET intentos = intentos + 1, ultimo_error = ?, "
+                "estado = CASE WHEN intentos + 1 >= ? THEN 'conflicto' ELSE estado END "
+                "WHERE id = ?",
+                (mensaje, MAX_INTENTOS, id_journal)
+            )
+            self._conexion.commit()
+
+    def resumen(self):
+        """
+        Cuenta los registros del journal por estado
+
+        Returns:
+            dict: {'pendiente': int, 'conflicto': int}
+        """
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT estado, COUNT(*) FROM pendientes GROUP BY estado"
+            ).fetchall()
+        resumen = {'pendiente': 0, 'conflicto': 0}
+        resumen.update(dict(filas))
+        return resumen
+
+class SincronizadorJournal:
+    """
+    Hilo en segundo plano que vacía el journal hacia Supabase por lotes
+
+    Los registros de cada usuario se envían con un cliente que lleva su
+    propio access token (el último que entregó alguna de sus sesiones), de
+    modo que las escrituras respetan sus políticas de acceso aunque otra
+    persona use después la misma sesión de navegador. Los registros de un
+    usuario sin token vigente esperan a que vuelva a ingresar. Ante fallos
+    de conexión espera con backoff exponencial y jitter antes de reintentar.
+    """
+
+    def __init__(self, journal, tabla='muestreos', crear_cliente=None):
+        """
+        Args:
+            journal (JournalLocal): Journal a sincronizar
+            tabla (str): Tabla de destino
+            crear_cliente (callable, optional): Access token -> cliente de Supabase
+                (por defecto cliente_para_token)
+        """
+        self.journal = journal
+        self.tabla = tabla
+        self.crear_cliente = crear_cliente or cliente_para_token
+        self._lock = threading.Lock()
+        self._credenciales = {}
+        self.ultima_sincronizacion = None
+        self.ultimo_error = None
+        self._fallos_seguidos = 0
+        self._evento = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name='sincronizador-journal', daemon=True)
+        self._hilo.start()
+
+    def actualizar_token(self, token):
+        """
+        Guarda el access token de un usuario para enviar sus registros
+
+        Se conserva el de vencimiento más lejano entre sus sesiones.
+
+        Args:
+            token (str): Access token de la sesión
+
+        Returns:
+            str: Usuario dueño del token (claim sub), o None si el token es inválido
+        """
+        claims = decodificar_jwt(token)
+        if claims is None or not claims.get('sub'):
+            return None
+        propietario = claims['sub']
+        with self._lock:
+            # Los tokens vencidos ya no sirven para enviar nada
+            for vencido in [p for p, c in self._credenciales.items() if c['expira'] < time.time()]:
+                del self._credenciales[vencido]
+            actual = self._credenciales.get(propietario)
+            if actual is not None and actual['expira'] >= claims['exp']:
+                return propietario
+            self._credenciales[propietario] = {'token': token, 'expira': claims['exp'], 'cliente': None}
+        if claims.get('email') and actual is None:
+            self.journal.adoptar(propietario, claims['email'])
+        return propietario
+
+    def _cliente(self, propietario):
+        """Cliente con el token vigente de un usuario, o None si no hay uno"""
+        with self._lock:
+            credencial = self._credenciales.get(propietario)
+            if credencial is None or credencial['expira'] - time.time() < MARGEN_TOKEN:
+                return None
+            if credencial['cliente'] is None:
+                credencial['cliente'] = self.crear_cliente(credencial['token'])
+            return credencial['cliente']
+
+    def despertar(self, token=None):
+        """
+        Solicita un ciclo de sincronización inmediato
+
+        Args:
+            token (str, optional): Access token de la sesión que registró datos
+        """
+        if token is not None:
+            self.actualizar_token(token)
+        self._evento.set()
+
+    def _espera(self):
+        """Calcula la espera hasta el próximo ciclo"""
+        if not self._fallos_seguidos:
+            return INTERVALO_SYNC
+        espera = min(ESPERA_MAXIMA, INTERVALO_SYNC * 2 ** self._fallos_seguidos)
+        return random.uniform(espera / 2, espera)
+
+    def _ciclo(self):
+        """Bucle principal del hilo"""
+        while True:
+            self._evento.wait(self._espera())
+            self._evento.clear()
+            try:
+                self.sincronizar()
+            except Exception as e:
+                self.ultimo_error = str(e)
+                self._fallos_seguidos += 1
+
+    def sincronizar(self):
+        """
+        Envía todos los registros pendientes en lotes, cada uno con las credenciales de su propietario
+
+        Returns:
+            int: Número de registros confirmados
+        """
+        confirmados = 0
+        rechazos = None
+        for propietario in self.journal.propietarios(self.tabla):
+            cliente = self._cliente(propietario) if propietario is not None else None
+            if cliente is None:
+                continue
+
+            ultimo_id = 0
+            while True:
+                # Cada registro se intenta a lo sumo una vez por ciclo
+                lote = self.journal.pendientes(self.tabla, TAMAÑO_LOTE_SYNC, ultimo_id, propietario)
+                if not lote:
+                    break
+                ultimo_id = lote[-1][0]
+
+                resultado = guardar_registros_muestreo(
+                    cliente,
+                    [datos for _, datos in lote],
+                    tamaño_lote=TAMAÑO_LOTE_SYNC,
+                    clave_conflicto=CLAVE_IDEMPOTENCIA
+                )
+                errores = dict(resultado['errores'])
+                ok = [id_journal for i, (id_journal, _) in enumerate(lote) if i not in errores]
+                self.journal.confirmar(ok)
+                confirmados += len(ok)
+
+                if resultado['sin_conexion']:
+                    # Se reintenta más tarde con backoff para no insistir sobre una red caída
+                    self.ultimo_error = next(iter(errores.values()))
+                    self._fallos_seguidos += 1
+                    return confirmados
+
+                for i, mensaje in errores.items():
+                    self.journal.marcar_error(lote[i][0], mensaje)
+                    rechazos = mensaje
+
+        self.ultimo_error = rechazos
+        self._fallos_seguidos = 0
+        self.ultima_sincronizacion = time.time()
+        return confirmados
+
+    def estado(self):
+        """
+        Retorna el estado de sincronización para mostrar en la interfaz
+
+        Returns:
+            dict: Pendientes, conflictos, último error y hora de la última sincronización
+        """
+        resumen = self.journal.resumen()
+        return {
+            'pendientes': resumen['pendiente'],
+            'conflictos': resumen['conflicto'],
+            'ultimo_error': self.ultimo_error,
+            'ultima_sincronizacion': self.ultima_sincronizacion
+        }
+
+@st.cache_resource(show_spinner=False)
+def obtener_sincronizador():
+    """
+    Crea el journal y su hilo de sincronización, uno por proceso
+
+    Returns:
+        SincronizadorJournal: Sincronizador en ejecución
+    """
+    return SincronizadorJournal(JournalLocal())
+
+def guardar_muestreo_local(datos):
+    """
+    Guarda un muestreo en el journal local y programa su envío a Supabase
+
+    Retorna de inmediato, sin esperar a la red. El registro queda a nombre
+    del usuario de la sesión y se envía con su token.
+
+    Args:
+        datos (dict): Datos del muestreo
+
+    Returns:
+        dict: Datos registrados, incluyendo la clave de idempotencia
+    """
+    sincronizador = obtener_sincronizador()
+    token = token_acceso()
+    propietario = sincronizador.actualizar_token(token)
+    registro = sincronizador.journal.registrar('muestreos', datos, propietario)
+    sincronizador.despertar()
+    return registro
+
+def estado_sincronizacion():
+    """
+    Retorna el estado del journal local
+
+    También entrega al sincronizador el token vigente de la sesión, para
+    que los registros pendientes del usuario sigan enviándose mientras
+    tenga una sesión abierta.
+
+    Returns:
+        dict: Ver SincronizadorJournal.estado
+    """
+    sincronizador = obtener_sincronizador()
+    token = token_acceso()
+    if token:
+        sincronizador.actualizar_token(token)
+    return sincronizador.estado()
@@ -0,0 +1,281 @@
+"""
+Métricas del dashboard
+KPIs calculados con agregados en la base de datos y refresco incremental
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import streamlit as st
+
+from auth.sesion import identidad_sesion
+from database.resiliencia import ejecutar
+
+# Ventana de días que cubren los KPIs (edad de ensayo final de las probetas)
+VENTANA_DIAS = 28
+# Cada cuánto se descarta el acumulado y se recalcula desde cero
+RECALCULO_COMPLETO = 5 * 60
+# Usuarios con acumulado propio (se descartan los menos usados)
+MAX_AMBITOS = 64
+
+class AcumuladorKpis:
+    """
+    Acumula agregados diarios de muestreos a partir de un watermark
+
+    Cada refresco pide a la base de datos solo los agregados de las filas
+    con id mayor al último visto. Las modificaciones y eliminaciones no
+    avanzan el id, por lo que se fuerza un recálculo completo tras ellas y
+    periódicamente cada RECALCULO_COMPLETO segundos.
+
+    Mientras la suscripción en tiempo real está activa (`en_vivo`), los
+    cambios llegan por aplicar_cambio y el refresco no consulta la base
+    de datos salvo para el recálculo periódico.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.en_vivo = False
+        self._reiniciar()
+
+    def _reiniciar(self):
+        """Descarta el acumulado (requiere el lock)"""
+        self.ultimo_id = 0
+        self.por_fecha = {}
+        self.cargado = False
+        self.recalculado = time.monotonic()
+
+    def _sumar(self, fila, signo, desde):
+        """Suma o resta un muestreo del día que le corresponde (requiere el lock)"""
+        fecha = fila.get('fecha_vaciado')
+        if fecha is None or fecha < desde:
+            return
+        dia = self.por_fecha.setdefault(fecha, {'muestras': 0, 'probetas': 0})
+        dia['muestras'] += signo
+        dia['probetas'] += signo * len(fila.get('probetas') or [])
+
+    def invalidar(self):
+        """Fuerza un recálculo completo en el próximo refresco"""
+        with self._lock:
+            self._reiniciar()
+
+    def refrescar(self, supabase, hoy=None):
+        """
+        Incorpora los muestreos nuevos desde el último watermark
+
+        Args:
+            supabase: Cliente de Supabase
+            hoy (date, optional): Fecha de referencia (por defecto hoy)
+        """
+        hoy = hoy or date.today()
+        desde = hoy - timedelta(days=VENTANA_DIAS)
+
+        with self._lock:
+            if time.monotonic() - self.recalculado > RECALCULO_COMPLETO:
+                self._reiniciar()
+
+            if not (self.en_vivo and self.cargado):
+                filas = ejecutar(supabase.rpc('resumen_muestreos_desde', {
+                    'p_desde_id': self.ultimo_id,
+                    'p_desde_fecha': desde.isoformat()
+                })).data
+
+                for fila in filas:
+                    dia = self.por_fecha.setdefault(fila['fecha_vaciado'], {'muestras': 0, 'probetas': 0})
+                    dia['muestras'] += fila['muestras']
+                    dia['probetas'] += fila['probetas']
+                    self.ultimo_id = max(self.ultimo_id, fila['ultimo_id'])
+                self.cargado = True
+
+            # Los días que salen de la ventana ya no aportan a los KPIs
+            for fecha in [f for f in self.por_fecha if f < desde.isoformat()]:
+                del self.por_fecha[fecha]
+
+    def aplicar_cambio(self, tipo, registro, anterior=None, hoy=None):
+        """
+        Incorpora un cambio de muestreos recibido en tiempo real
+
+        Las inserciones posteriores al watermark se suman y lo avanzan. En
+        modificaciones y eliminaciones se descuenta la fila anterior, que
+        llega completa con REPLICA IDENTITY FULL; si no viene completa, o la
+        fila todavía no estaba contada, se fuerza un recálculo.
+
+        Args:
+            tipo (str): 'INSERT', 'UPDATE' o 'DELETE'
+            registro (dict): Fila nueva (vacía en DELETE)
+            anterior (dict, optional): Fila anterior
+            hoy (date, optional): Fecha de referencia (por defecto hoy)
+        """
+        hoy = hoy or date.today()
+        desde = (hoy - timedelta(days=VENTANA_DIAS)).isoformat()
+        anterior = anterior or {}
+
+        with self._lock:
+            # Sin acumulado cargado, el próximo refresco ya trae el cambio
+            if not self.cargado:
+                return
+
+            if tipo == 'INSERT':
+                if registro.get('id', 0) > self.ultimo_id:
+                    self._sumar(registro, 1, desde)
+                    self.ultimo_id = registro['id']
+                return
+
+            if 'fecha_vaciado' not in anterior or anterior.get('id', 0) > self.ultimo_id:
+                self._reiniciar()
+                return
+
+            self._sumar(anterior, -1, desde)
+            if tipo == 'UPDATE':
+                self._sumar(registro, 1, desde)
+
+    def kpis(self, hoy=None):
+        """
+        Calcula los KPIs a partir del acumulado
+
+        Args:
+            hoy (date, optional): Fecha de referencia (por defecto hoy)
+
+        Returns:
+            dict: Muestras de hoy y ayer, probetas activas y de hoy
+        """
+        hoy = hoy or date.today()
+        vacio = {'muestras': 0, 'probetas': 0}
+        with self._lock:
+            dia_hoy = self.por_fecha.get(hoy.isoformat(), vacio)
+            dia_ayer = self.por_fecha.get((hoy - timedelta(days=1)).isoformat(), vacio)
+            return {
+                'muestras_hoy': dia_hoy['muestras'],
+                'muestras_ayer': dia_ayer['muestras'],
+                'probetas_hoy': dia_hoy['probetas'],
+                'probetas_activas': sum(d['probetas'] for d in self.por_fecha.values())
+            }
+
+class AcumuladoresKpis:
+    """
+    Un AcumuladorKpis por usuario
+
+    Las políticas RLS pueden darle a cada usuario un conjunto distinto de
+    muestreos, así que cada uno acumula lo que consultó con su propio
+    cliente. Los cambios en tiempo real llegan con el token de un solo
+    usuario (`ambito_en_vivo`) y solo se aplican a su acumulado; los demás
+    siguen refrescando desde su watermark.
+    """
+
+    def __init__(self, max_ambitos=MAX_AMBITOS):
+        """
+        Args:
+            max_ambitos (int): Número máximo de usuarios con acumulado propio
+        """
+        self.max_ambitos = max_ambitos
+        self._lock = threading.Lock()
+        self._acumuladores = OrderedDict()
+        self.en_vivo = False
+        self.ambito_en_vivo = None
+
+    def de(self, ambito):
+        """
+        Retorna el acumulado de un usuario, creándolo si hace falta
+
+        Args:
+            ambito (str): Usuario (ver auth.sesion.identidad_sesion)
+
+        Returns:
+            AcumuladorKpis: Acumulador del usuario
+        """
+        with self._lock:
+            acumulador = self._acumuladores.get(ambito)
+            if acumulador is None:
+                acumulador = self._acumuladores[ambito] = AcumuladorKpis()
+                while len(self._acumuladores) > self.max_ambitos:
+                    self._acumuladores.popitem(last=False)
+            self._acumuladores.move_to_end(ambito)
+            acumulador.en_vivo = self.en_vivo and ambito == self.ambito_en_vivo
+            return acumulador
+
+    def marcar_en_vivo(self, en_vivo, ambito=None):
+        """
+        Indica si llegan cambios en tiempo real y con el token de qué usuario
+
+        Todos los acumulados se recalculan: el del usuario en vivo parte de
+        cero al suscribirse y los demás dejan de recibir eventos.
+
+        Args:
+            en_vivo (bool): True si la suscripción a muestreos está activa
+            ambito (str, optional): Usuario del token de la suscripción
+        """
+        with self._lock:
+            self.en_vivo = en_vivo
+            self.ambito_en_vivo = ambito
+            for clave, acumulador in self._acumuladores.items():
+                acumulador.en_vivo = en_vivo and clave == ambito
+                acumulador.invalidar()
+
+    def cambiar_ambito(self, ambito):
+        """
+        Cambia el usuario con cuyo token llegan los cambios en tiempo real
+
+        Solo se recalculan los acumulados del usuario anterior y del nuevo.
+
+        Args:
+            ambito (str): Usuario del nuevo token de la suscripción
+        """
+        with self._lock:
+            anterior, self.ambito_en_vivo = self.ambito_en_vivo, ambito
+            if anterior == ambito:
+                return
+            for clave in (anterior, ambito):
+                acumulador = self._acumuladores.get(clave)
+                if acumulador is not None:
+                    acumulador.en_vivo = self.en_vivo and clave == ambito
+                    acumulador.invalidar()
+
+    def invalidar(self):
+        """Fuerza un recálculo completo de todos los acumulados"""
+        with self._lock:
+            acumuladores = list(self._acumuladores.values())
+        for acumulador in acumuladores:
+            acumulador.invalidar()
+
+    def aplicar_cambio(self, tipo, registro, anterior=None, ambito=None):
+        """
+        Incorpora un cambio recibido en tiempo real al acumulado de su usuario
+
+        Args:
+            tipo (str): 'INSERT', 'UPDATE' o 'DELETE'
+            registro (dict): Fila nueva (vacía en DELETE)
+            anterior (dict, optional): Fila anterior
+            ambito (str, optional): Usuario con cuyo token se recibió el evento
+        """
+        with self._lock:
+            acumulador = self._acumuladores.get(ambito)
+        if acumulador is not None and acumulador.en_vivo:
+            acumulador.aplicar_cambio(tipo, registro, anterior)
+
+@st.cache_resource(show_spinner=False)
+def obtener_acumulador_kpis():
+    """
+    Crea los acumuladores de KPIs compartidos por todo el proceso
+
+    Returns:
+        AcumuladoresKpis: Acumulados de métricas por usuario
+    """
+    return AcumuladoresKpis()
+
+def obtener_kpis_dashboard(supabase):
+    """
+    Refresca y retorna los KPIs del dashboard
+
+    Args:
+        supabase: Cliente de Supabase
+
+    Returns:
+        dict: Ver AcumuladorKpis.kpis
+    """
+    acumulador = obtener_acumulador_kpis().de(identidad_sesion())
+    try:
+        acumulador.refrescar(supabase)
+    except Exception as e:
+        st.error(f"Error al obtener métricas: {e}")
+    return acumulador.kpis()
@@ -0,0 +1,5 @@
+-- Clave de idempotencia para la sincronización del journal local.
+-- El sincronizador hace upsert sobre esta columna, así que reenviar un
+-- registro tras un corte de red no lo duplica.
+ALTER TABLE muestreos ADD COLUMN IF NOT EXISTS id_local uuid;
+CREATE UNIQUE INDEX IF NOT EXISTS muestreos_id_local_key ON muestreos (id_local);
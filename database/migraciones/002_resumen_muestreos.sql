@@ -0,0 +1,18 @@
+-- Agregados diarios de muestreos para los KPIs del dashboard.
+-- Solo considera filas con id mayor al watermark del cliente y dentro de la
+-- ventana de fechas, así cada refresco devuelve unas pocas filas agregadas.
+CREATE INDEX IF NOT EXISTS muestreos_fecha_vaciado_idx ON muestreos (fecha_vaciado);
+
+CREATE OR REPLACE FUNCTION resumen_muestreos_desde(p_desde_id bigint, p_desde_fecha date)
+RETURNS TABLE (fecha_vaciado date, muestras bigint, probetas bigint, ultimo_id bigint)
+LANGUAGE sql STABLE
+AS $$
+    SELECT m.fecha_vaciado,
+           count(*) AS muestras,
+           coalesce(sum(coalesce(cardinality(m.probetas), 0)), 0) AS probetas,
+           max(m.id) AS ultimo_id
+    FROM muestreos m
+    WHERE m.id > p_desde_id
+      AND m.fecha_vaciado >= p_desde_fecha
+    GROUP BY m.fecha_vaciado
+$$;
@@ -0,0 +1,10 @@
+-- Índices para el historial paginado por keyset.
+-- Cada orden del historial termina en id, por eso los índices también,
+-- así cada página es un recorrido acotado del índice.
+DROP INDEX IF EXISTS muestreos_fecha_vaciado_idx;
+CREATE INDEX IF NOT EXISTS muestreos_fecha_id_idx ON muestreos (fecha_vaciado, id);
+CREATE INDEX IF NOT EXISTS muestreos_proyecto_id_idx ON muestreos (proyecto, id);
+CREATE INDEX IF NOT EXISTS muestreos_elemento_id_idx ON muestreos (elemento, id);
+
+-- Historial de un proyecto ordenado por fecha (el caso más frecuente)
+CREATE INDEX IF NOT EXISTS muestreos_proyecto_fecha_id_idx ON muestreos (proyecto, fecha_vaciado, id);
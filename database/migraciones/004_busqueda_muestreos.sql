@@ -0,0 +1,44 @@
+-- Búsqueda de texto completo sobre muestreos, sin distinguir tildes ni
+-- mayúsculas y con coincidencia por prefijo ("conc" encuentra "Concreto").
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() no es IMMUTABLE; este envoltorio permite usarla en columnas generadas
+CREATE OR REPLACE FUNCTION f_unaccent(text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+$$;
+
+ALTER TABLE muestreos ADD COLUMN IF NOT EXISTS busqueda tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', f_unaccent(coalesce(proyecto, ''))), 'A') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(elemento, ''))), 'A') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(ubicacion, ''))), 'B') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(proveedor, ''))), 'B') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(guia_remision, ''))), 'C') ||
+    setweight(to_tsvector('simple', f_unaccent(coalesce(observaciones, ''))), 'D')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS muestreos_busqueda_idx ON muestreos USING gin (busqueda);
+
+-- Convierte el texto libre en una consulta con prefijo por cada palabra
+CREATE OR REPLACE FUNCTION consulta_busqueda(p_texto text)
+RETURNS tsquery
+LANGUAGE sql IMMUTABLE
+AS $$
+    SELECT to_tsquery('simple', string_agg(quote_literal(palabra) || ':*', ' & '))
+    FROM regexp_split_to_table(lower(f_unaccent(coalesce(p_texto, ''))), '[^[:alnum:]]+') AS palabra
+    WHERE palabra <> ''
+$$;
+
+CREATE OR REPLACE FUNCTION buscar_muestreos(p_texto text, p_limite int DEFAULT 20, p_desplazamiento int DEFAULT 0)
+RETURNS SETOF muestreos
+LANGUAGE sql STABLE
+AS $$
+    SELECT m.*
+    FROM muestreos m, consulta_busqueda(p_texto) AS q
+    WHERE m.busqueda @@ q
+    ORDER BY ts_rank_cd(m.busqueda, q) DESC, m.id DESC
+    LIMIT p_limite OFFSET p_desplazamiento
+$$;
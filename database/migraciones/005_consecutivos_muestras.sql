@@ -0,0 +1,20 @@
+-- Consecutivos diarios de muestras por proyecto.
+-- reservar_consecutivos() reserva un bloque completo en una sola sentencia:
+-- el upsert bloquea la fila del contador, así dos inspectores que guardan
+-- a la vez nunca reciben el mismo número.
+CREATE TABLE IF NOT EXISTS consecutivos_muestras (
+    proyecto text NOT NULL,
+    fecha date NOT NULL,
+    ultimo integer NOT NULL,
+    PRIMARY KEY (proyecto, fecha)
+);
+
+CREATE OR REPLACE FUNCTION reservar_consecutivos(p_proyecto text, p_fecha date, p_cantidad integer)
+RETURNS integer
+LANGUAGE sql VOLATILE
+AS $$
+    INSERT INTO consecutivos_muestras AS c (proyecto, fecha, ultimo)
+    VALUES (p_proyecto, p_fecha, p_cantidad)
+    ON CONFLICT (proyecto, fecha) DO UPDATE SET ultimo = c.ultimo + EXCLUDED.ultimo
+    RETURNING ultimo - p_cantidad + 1
+$$;
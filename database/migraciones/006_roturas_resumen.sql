@@ -0,0 +1,90 @@
+-- Resultados de rotura de probetas y resumen de resistencias por edad.
+-- El resumen se actualiza dentro de la misma transacción que inserta cada
+-- rotura, así los reportes leen unas pocas filas ya agregadas.
+CREATE TABLE IF NOT EXISTS roturas (
+    id bigserial PRIMARY KEY,
+    codigo_probeta text NOT NULL UNIQUE,
+    codigo_muestra text NOT NULL,
+    proyecto text NOT NULL,
+    proveedor text NOT NULL DEFAULT '',
+    fc_diseno integer NOT NULL,
+    edad_dias integer NOT NULL,
+    fecha_ensayo date NOT NULL,
+    carga_kg numeric,
+    resistencia numeric NOT NULL,
+    usuario text,
+    creado timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS roturas_muestra_idx ON roturas (codigo_muestra);
+
+CREATE TABLE IF NOT EXISTS resumen_resistencias (
+    proyecto text NOT NULL,
+    proveedor text NOT NULL,
+    fc_diseno integer NOT NULL,
+    edad_dias integer NOT NULL,
+    ensayos bigint NOT NULL,
+    suma numeric NOT NULL,
+    suma_cuadrados numeric NOT NULL,
+    minimo numeric NOT NULL,
+    maximo numeric NOT NULL,
+    cumplen bigint NOT NULL,
+    actualizado timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (proyecto, proveedor, fc_diseno, edad_dias)
+);
+
+-- Recalcula un grupo desde las roturas (solo tras modificaciones o eliminaciones)
+CREATE OR REPLACE FUNCTION recalcular_resumen_grupo(p_proyecto text, p_proveedor text, p_fc integer, p_edad integer)
+RETURNS void
+LANGUAGE sql
+AS $$
+    DELETE FROM resumen_resistencias
+    WHERE proyecto = p_proyecto AND proveedor = p_proveedor AND fc_diseno = p_fc AND edad_dias = p_edad;
+
+    INSERT INTO resumen_resistencias (proyecto, proveedor, fc_diseno, edad_dias, ensayos, suma,
+                                      suma_cuadrados, minimo, maximo, cumplen)
+    SELECT proyecto, proveedor, fc_diseno, edad_dias, count(*), sum(resistencia),
+           sum(resistencia * resistencia), min(resistencia), max(resistencia),
+           count(*) FILTER (WHERE resistencia >= fc_diseno)
+    FROM roturas
+    WHERE proyecto = p_proyecto AND proveedor = p_proveedor AND fc_diseno = p_fc AND edad_dias = p_edad
+    GROUP BY proyecto, proveedor, fc_diseno, edad_dias;
+$$;
+
+CREATE OR REPLACE FUNCTION actualizar_resumen_resistencias()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        -- Caso frecuente: suma incremental en O(1)
+        INSERT INTO resumen_resistencias AS r (proyecto, proveedor, fc_diseno, edad_dias, ensayos, suma,
+                                               suma_cuadrados, minimo, maximo, cumplen)
+        VALUES (NEW.proyecto, NEW.proveedor, NEW.fc_diseno, NEW.edad_dias, 1, NEW.resistencia,
+                NEW.resistencia * NEW.resistencia, NEW.resistencia, NEW.resistencia,
+                (NEW.resistencia >= NEW.fc_diseno)::int)
+        ON CONFLICT (proyecto, proveedor, fc_diseno, edad_dias) DO UPDATE SET
+            ensayos = r.ensayos + 1,
+            suma = r.suma + EXCLUDED.suma,
+            suma_cuadrados = r.suma_cuadrados + EXCLUDED.suma_cuadrados,
+            minimo = least(r.minimo, EXCLUDED.minimo),
+            maximo = greatest(r.maximo, EXCLUDED.maximo),
+            cumplen = r.cumplen + EXCLUDED.cumplen,
+            actualizado = now();
+        RETURN NEW;
+    END IF;
+
+    -- El mínimo y el máximo no se pueden descontar: se recalculan los grupos afectados
+    PERFORM recalcular_resumen_grupo(OLD.proyecto, OLD.proveedor, OLD.fc_diseno, OLD.edad_dias);
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM recalcular_resumen_grupo(NEW.proyecto, NEW.proveedor, NEW.fc_diseno, NEW.edad_dias);
+        RETURN NEW;
+    END IF;
+    RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS roturas_resumen ON roturas;
+CREATE TRIGGER roturas_resumen
+AFTER INSERT OR UPDATE OR DELETE ON roturas
+FOR EACH ROW EXECUTE FUNCTION actualizar_resumen_resistencias();
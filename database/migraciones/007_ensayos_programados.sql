@@ -0,0 +1,44 @@
+-- Cola de ensayos de rotura programados, generada al insertar cada muestreo.
+-- "Vencidos / hoy / esta semana" es un solo recorrido del índice parcial
+-- sobre fecha_programada de los ensayos aún no realizados.
+CREATE TABLE IF NOT EXISTS ensayos_programados (
+    id bigserial PRIMARY KEY,
+    muestreo_id bigint NOT NULL REFERENCES muestreos (id) ON DELETE CASCADE,
+    codigo_muestra text,
+    proyecto text NOT NULL,
+    proveedor text NOT NULL DEFAULT '',
+    fc_diseno integer NOT NULL,
+    diametro_cm numeric NOT NULL,
+    edad_dias integer NOT NULL,
+    fecha_programada date NOT NULL,
+    completado boolean NOT NULL DEFAULT false,
+    UNIQUE (muestreo_id, edad_dias)
+);
+
+CREATE INDEX IF NOT EXISTS ensayos_pendientes_fecha_idx
+    ON ensayos_programados (fecha_programada, id) WHERE NOT completado;
+
+CREATE OR REPLACE FUNCTION programar_ensayos_muestreo()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO ensayos_programados (muestreo_id, codigo_muestra, proyecto, proveedor, fc_diseno,
+                                     diametro_cm, edad_dias, fecha_programada)
+    SELECT NEW.id, NEW.codigo_muestra, NEW.proyecto, coalesce(NEW.proveedor, ''), NEW.fc_diseno,
+           NEW.diametro_cm, edad, NEW.fecha_vaciado + edad
+    FROM unnest(ARRAY[
+        CASE WHEN NEW.edad_7 THEN 7 END,
+        CASE WHEN NEW.edad_28 THEN 28 END,
+        NEW.otra_edad
+    ]) AS edad
+    WHERE edad IS NOT NULL
+    ON CONFLICT (muestreo_id, edad_dias) DO NOTHING;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS muestreos_programar_ensayos ON muestreos;
+CREATE TRIGGER muestreos_programar_ensayos
+AFTER INSERT ON muestreos
+FOR EACH ROW EXECUTE FUNCTION programar_ensayos_muestreo();
@@ -0,0 +1,19 @@
+-- Publica los cambios de muestreos y de la cola de ensayos para la
+-- suscripción en tiempo real (database/tiempo_real.py).
+-- Con REPLICA IDENTITY FULL los eventos UPDATE y DELETE traen la fila
+-- anterior completa, lo que permite descontarla de los KPIs sin recalcular.
+ALTER TABLE muestreos REPLICA IDENTITY FULL;
+ALTER TABLE ensayos_programados REPLICA IDENTITY FULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_publication_tables
+                   WHERE pubname = 'supabase_realtime' AND tablename = 'muestreos') THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE muestreos;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_publication_tables
+                   WHERE pubname = 'supabase_realtime' AND tablename = 'ensayos_programados') THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE ensayos_programados;
+    END IF;
+END;
+$$;
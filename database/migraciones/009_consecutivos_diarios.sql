@@ -0,0 +1,26 @@
+-- Consecutivos de muestras por día, comunes a todos los proyectos.
+-- El código M-AAAAMMDD-NNN no incluye el proyecto, así que el contador por
+-- (proyecto, fecha) de la migración 005 entregaba el mismo código (y los
+-- mismos códigos de probeta) a dos obras que muestrean el mismo día.
+-- Cada día arranca después del mayor consecutivo ya entregado a cualquier
+-- proyecto, para no repetir códigos existentes.
+CREATE TABLE IF NOT EXISTS consecutivos_diarios (
+    fecha date PRIMARY KEY,
+    ultimo integer NOT NULL
+);
+
+INSERT INTO consecutivos_diarios (fecha, ultimo)
+SELECT fecha, max(ultimo) FROM consecutivos_muestras GROUP BY fecha
+ON CONFLICT (fecha) DO UPDATE SET ultimo = GREATEST(consecutivos_diarios.ultimo, EXCLUDED.ultimo);
+
+DROP FUNCTION IF EXISTS reservar_consecutivos(text, date, integer);
+
+CREATE OR REPLACE FUNCTION reservar_consecutivos(p_fecha date, p_cantidad integer)
+RETURNS integer
+LANGUAGE sql VOLATILE
+AS $$
+    INSERT INTO consecutivos_diarios AS c (fecha, ultimo)
+    VALUES (p_fecha, p_cantidad)
+    ON CONFLICT (fecha) DO UPDATE SET ultimo = c.ultimo + EXCLUDED.ultimo
+    RETURNING ultimo - p_cantidad + 1
+$$;
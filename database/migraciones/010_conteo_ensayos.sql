@@ -0,0 +1,15 @@
+-- Conteo de ensayos pendientes para el dashboard: vencidos, de hoy y próximos
+-- hasta una fecha. La lista de ensayos que muestra el dashboard está acotada
+-- (LIMITE_ENSAYOS), así que los totales salen de un agregado sobre el mismo
+-- índice parcial de la migración 007, no del largo de esa lista.
+-- SECURITY INVOKER (por defecto): cuenta solo lo que las políticas RLS dejan ver.
+CREATE OR REPLACE FUNCTION contar_ensayos_pendientes(p_hoy date, p_hasta date)
+RETURNS TABLE (vencidos bigint, hoy bigint, proximos bigint)
+LANGUAGE sql STABLE
+AS $$
+    SELECT count(*) FILTER (WHERE fecha_programada < p_hoy),
+           count(*) FILTER (WHERE fecha_programada = p_hoy),
+           count(*) FILTER (WHERE fecha_programada > p_hoy)
+    FROM ensayos_programados
+    WHERE NOT completado AND fecha_programada <= p_hasta
+$$;
@@ -0,0 +1,109 @@
+"""
+Carga concurrente de datos
+Ejecuta en paralelo las consultas independientes de una página, con timeout por consulta
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from database.resiliencia import con_plazo
+
+# Hilos compartidos por todas las sesiones del proceso
+MAX_HILOS_CONSULTA = 16
+# Consultas en curso o en cola aceptadas por el pool; el resto se omite
+MAX_PENDIENTES = 4 * MAX_HILOS_CONSULTA
+# Segundos de espera por defecto para cada consulta
+TIMEOUT_CONSULTA = 8.0
+
+@st.cache_resource(show_spinner=False)
+def obtener_ejecutor():
+    """
+    Crea el pool de hilos de consultas compartido por todo el proceso
+
+    Returns:
+        ThreadPoolExecutor: Ejecutor de consultas
+    """
+    return ThreadPoolExecutor(max_workers=MAX_HILOS_CONSULTA, thread_name_prefix='consulta')
+
+@st.cache_resource(show_spinner=False)
+def obtener_cupos():
+    """
+    Crea el semáforo que acota las consultas pendientes del pool
+
+    Returns:
+        threading.BoundedSemaphore: MAX_PENDIENTES cupos
+    """
+    return threading.BoundedSemaphore(MAX_PENDIENTES)
+
+def _ejecutar_con_contexto(ctx, funcion, limite):
+    """
+    Ejecuta una consulta en un hilo del pool con el contexto de la sesión
+
+    El contexto permite que las funciones de acceso a datos sigan
+    mostrando sus mensajes de error con st.error; el plazo corta sus
+    solicitudes HTTP cuando vence el timeout (ver resiliencia.con_plazo).
+    """
+    add_script_run_ctx(None, ctx)
+    try:
+        with con_plazo(limite):
+            return funcion()
+    finally:
+        add_script_run_ctx(None, None)
+
+def cargar_en_paralelo(consultas, timeout=TIMEOUT_CONSULTA, por_defecto=None):
+    """
+    Ejecuta varias consultas independientes al mismo tiempo
+
+    La página espera lo que tarde la consulta más lenta (acotado por su
+    timeout) en lugar de la suma de todas. Al vencer el timeout, una
+    consulta que sigue en cola se cancela y una en curso ve cortadas sus
+    solicitudes HTTP, así no retiene un hilo del pool compartido. Si el
+    pool ya tiene MAX_PENDIENTES consultas, la nueva se omite en lugar de
+    encolarse detrás de ellas.
+
+    Args:
+        consultas (dict): Nombre -> función sin argumentos (p. ej. functools.partial)
+        timeout (float | dict): Segundos de espera, global o por nombre de consulta
+        por_defecto (dict, optional): Nombre -> valor a usar si la consulta falla o excede su timeout
+
+    Returns:
+        dict: Nombre -> resultado de cada consulta
+    """
+    por_defecto = por_defecto or {}
+    ejecutor = obtener_ejecutor()
+    cupos = obtener_cupos()
+    ctx = get_script_run_ctx()
+
+    inicio = time.monotonic()
+    limites = {
+        nombre: timeout.get(nombre, TIMEOUT_CONSULTA) if isinstance(timeout, dict) else timeout
+        for nombre in consultas
+    }
+    futuros = {}
+    resultados = {}
+    for nombre, funcion in consultas.items():
+        if not cupos.acquire(blocking=False):
+            st.warning(f"⚠️ El servidor está ocupado: la consulta '{nombre}' se omitió")
+            resultados[nombre] = por_defecto.get(nombre)
+            continue
+        # Todas empiezan a la vez: el plazo se mide desde el inicio común
+        futuro = ejecutor.submit(_ejecutar_con_contexto, ctx, funcion, inicio + limites[nombre])
+        futuro.add_done_callback(lambda _: cupos.release())
+        futuros[nombre] = futuro
+
+    for nombre, futuro in futuros.items():
+        limite = limites[nombre]
+        try:
+            resultados[nombre] = futuro.result(timeout=max(0.0, inicio + limite - time.monotonic()))
+        except TimeoutError:
+            futuro.cancel()
+            st.warning(f"⚠️ La consulta '{nombre}' tardó más de {limite:g} s y se omitió")
+            resultados[nombre] = por_defecto.get(nombre)
+        except Exception as e:
+            st.error(f"Error al cargar '{nombre}': {e}")
+            resultados[nombre] = por_defecto.get(nombre)
+    return resultados
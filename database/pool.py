@@ -0,0 +1,197 @@
+"""
+Pool de clientes Supabase
+Mantiene los clientes vivos durante toda la vida del proceso
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+from supabase import create_client
+from supabase.lib.client_options import SyncClientOptions
+
+from database.resiliencia import aplicar_plazo
+
+# Límites por defecto del pool
+MAX_CLIENTES = 200
+MAX_INACTIVIDAD = 60 * 60  # segundos sin uso antes de descartar un cliente
+MAX_CONEXIONES_HTTP = 50
+TIMEOUT_HTTP = 15.0
+
+class PoolSupabase:
+    """
+    Pool de clientes Supabase compartido por todo el proceso
+
+    Todas las sesiones comparten un único pool de conexiones HTTP
+    (keep-alive, TLS ya negociado), pero cada sesión de navegador tiene
+    su propio cliente para que el estado de autenticación no se mezcle
+    entre usuarios. Un cliente marcado como fallido se reconstruye de
+    forma perezosa en la siguiente solicitud de su sesión.
+    """
+
+    def __init__(self, url, key, max_clientes=MAX_CLIENTES, max_inactividad=MAX_INACTIVIDAD):
+        """
+        Args:
+            url (str): URL del proyecto Supabase
+            key (str): Clave pública (anon) del proyecto
+            max_clientes (int): Número máximo de sesiones con cliente propio
+            max_inactividad (float): Segundos sin uso antes de descartar un cliente
+        """
+        self.url = url
+        self.key = key
+        self.max_clientes = max_clientes
+        self.max_inactividad = max_inactividad
+        self._lock = threading.Lock()
+        self._clientes = OrderedDict()
+        self._http = self._crear_http()
+        self.creados = 0
+        self.reconstruidos = 0
+
+    def _crear_http(self):
+        """Crea el cliente HTTP compartido por todas las sesiones"""
+        # aplicar_plazo recorta el timeout de las consultas lanzadas con plazo (database.paralelo)
+        return httpx.Client(
+            timeout=TIMEOUT_HTTP,
+            event_hooks={'request': [aplicar_plazo]},
+            limits=httpx.Limits(
+                max_connections=MAX_CONEXIONES_HTTP,
+                max_keepalive_connections=MAX_CONEXIONES_HTTP
+            )
+        )
+
+    def _crear_cliente(self):
+        """Crea un cliente Supabase que reutiliza el pool HTTP compartido"""
+        if self._http.is_closed:
+            self._http = self._crear_http()
+        # La renovación de tokens la hace auth.sesion: sin el hilo de auto-refresh
+        # por cliente ni dos renovaciones compitiendo por el mismo refresh token
+        opciones = SyncClientOptions(httpx_client=self._http, auto_refresh_token=False)
+        self.creados += 1
+        return create_client(self.url, self.key, options=opciones)
+
+    def cliente_con_token(self, access_token):
+        """
+        Crea un cliente que actúa con el access token de un usuario
+
+        No pertenece a ninguna sesión ni guarda la sesión de autenticación:
+        cada solicitud lleva el token indicado, así las políticas RLS se
+        aplican a ese usuario aunque su sesión de navegador ya no exista o
+        la use otra persona. No renueva el token.
+
+        Args:
+            access_token (str): Access token del usuario
+
+        Returns:
+            Client: Cliente de Supabase
+        """
+        with self._lock:
+            if self._http.is_closed:
+                self._http = self._crear_http()
+            opciones = SyncClientOptions(httpx_client=self._http, auto_refresh_token=False, persist_session=False)
+        opciones.headers['Authorization'] = f"Bearer {access_token}"
+        return create_client(self.url, self.key, options=opciones)
+
+    def _saludable(self, entrada):
+        """
+        Verifica si un cliente del pool puede seguir usándose
+
+        Args:
+            entrada (dict): Entrada del pool
+
+        Returns:
+            bool: True si el cliente está sano
+        """
+        return not entrada['fallido'] and not self._http.is_closed
+
+    def obtener(self, id_sesion):
+        """
+        Retorna el cliente asociado a una sesión, creándolo si hace falta
+
+        Args:
+            id_sesion (str): Identificador de la sesión de navegador
+
+        Returns:
+            Client: Cliente de Supabase de la sesión
+        """
+        with self._lock:
+            entrada = self._clientes.get(id_sesion)
+
+            if entrada is None:
+                entrada = {'cliente': self._crear_cliente(), 'fallido': False}
+                self._clientes[id_sesion] = entrada
+            elif not self._saludable(entrada):
+                entrada['cliente'] = self._reconstruir(entrada['cliente'])
+                entrada['fallido'] = False
+
+            entrada['usado'] = time.monotonic()
+            self._clientes.move_to_end(id_sesion)
+            self._purgar()
+            return entrada['cliente']
+
+    def _reconstruir(self, anterior):
+        """
+        Crea un cliente nuevo conservando la sesión de autenticación del anterior
+
+        Args:
+            anterior (Client): Cliente fallido
+
+        Returns:
+            Client: Cliente nuevo
+        """
+        nuevo = self._crear_cliente()
+        self.reconstruidos += 1
+        try:
+            sesion = anterior.auth.get_session()
+            if sesion:
+                nuevo.auth.set_session(sesion.access_token, sesion.refresh_token)
+        except Exception:
+            # Sin sesión recuperable: el usuario deberá volver a ingresar
+            pass
+        return nuevo
+
+    def _purgar(self):
+        """Descarta clientes inactivos y los más antiguos si se supera el límite"""
+        ahora = time.monotonic()
+        for id_sesion in list(self._clientes):
+            if ahora - self._clientes[id_sesion]['usado'] > self.max_inactividad:
+                del self._clientes[id_sesion]
+        while len(self._clientes) > self.max_clientes:
+            self._clientes.popitem(last=False)
+
+    def reportar_fallo(self, cliente):
+        """
+        Marca un cliente como fallido para que se reconstruya en su próximo uso
+
+        Args:
+            cliente (Client): Cliente que produjo un error de conexión
+        """
+        with self._lock:
+            for entrada in self._clientes.values():
+                if entrada['cliente'] is cliente:
+                    entrada['fallido'] = True
+                    break
+
+    def liberar(self, id_sesion):
+        """
+        Elimina el cliente de una sesión (por ejemplo, al cerrar sesión)
+
+        Args:
+            id_sesion (str): Identificador de la sesión de navegador
+        """
+        with self._lock:
+            self._clientes.pop(id_sesion, None)
+
+    def estadisticas(self):
+        """
+        Retorna el estado actual del pool
+
+        Returns:
+            dict: Clientes activos, creados y reconstruidos
+        """
+        with self._lock:
+            return {
+                'activos': len(self._clientes),
+                'creados': self.creados,
+                'reconstruidos': self.reconstruidos
+            }
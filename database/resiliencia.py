@@ -0,0 +1,291 @@
+"""
+Resiliencia del acceso a datos
+Reintentos con backoff, clasificación de errores y circuit breaker frente a Supabase
+"""
+
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+import streamlit as st
+from postgrest.exceptions import APIError
+
+from utils.perfilador import medir
+
+# Reintentos por operación (en la sesión del usuario: deben ser cortos)
+MAX_INTENTOS = 3
+ESPERA_BASE = 0.2  # segundos antes del primer reintento
+ESPERA_MAXIMA = 2.0
+
+# Circuit breaker
+UMBRAL_FALLOS = 5  # fallos transitorios seguidos que abren el circuito
+TIEMPO_APERTURA = 30.0  # segundos que el circuito falla rápido antes de probar de nuevo
+
+# Respuestas HTTP que indican una falla temporal del servidor
+ESTADOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+# Códigos de Postgres (SQLSTATE) y PostgREST que indican una falla temporal
+CODIGOS_TRANSITORIOS = (
+    '08',  # excepciones de conexión
+    '40001',  # conflicto de serialización
+    '40P01',  # deadlock
+    '53',  # recursos insuficientes
+    '57014',  # consulta cancelada (statement_timeout)
+    '57P',  # servidor reiniciándose
+    'PGRST000', 'PGRST001', 'PGRST002'  # PostgREST sin conexión a la base de datos
+)
+
+# Errores en los que la solicitud nunca llegó al servidor
+ERRORES_SIN_ENVIO = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+class CircuitoAbierto(Exception):
+    """La base de datos se considera caída y la operación no se intentó"""
+
+class PlazoVencido(TimeoutError):
+    """La operación excedió el plazo del hilo (ver con_plazo) y se abandonó"""
+
+# Instante límite (time.monotonic) de las consultas de cada hilo
+_plazos = threading.local()
+
+@contextmanager
+def con_plazo(limite):
+    """
+    Limita las consultas del hilo hasta un instante
+
+    Dentro del bloque, ejecutar() no empieza intentos ni reintentos después
+    del límite y cada solicitud HTTP recibe como timeout el tiempo que
+    resta (ver aplicar_plazo), así el hilo queda libre poco después del
+    plazo aunque el servidor no responda.
+
+    Args:
+        limite (float): Instante de time.monotonic() en que vence el plazo
+    """
+    anterior = getattr(_plazos, 'limite', None)
+    _plazos.limite = limite
+    try:
+        yield
+    finally:
+        _plazos.limite = anterior
+
+def plazo_restante():
+    """
+    Retorna los segundos que le quedan al plazo del hilo
+
+    Returns:
+        float | None: Segundos restantes (negativo si venció), None sin plazo
+    """
+    limite = getattr(_plazos, 'limite', None)
+    return None if limite is None else limite - time.monotonic()
+
+def aplicar_plazo(solicitud):
+    """
+    Hook de httpx: acota los timeouts de la solicitud al plazo del hilo
+
+    Args:
+        solicitud (httpx.Request): Solicitud a punto de enviarse
+
+    Raises:
+        PlazoVencido: Si el plazo ya venció
+    """
+    restante = plazo_restante()
+    if restante is None:
+        return
+    if restante <= 0:
+        raise PlazoVencido("Plazo de la consulta vencido")
+    solicitud.extensions['timeout'] = {
+        fase: restante if valor is None else min(valor, restante)
+        for fase, valor in solicitud.extensions.get('timeout', {}).items()
+    }
+
+def es_transitorio(error):
+    """
+    Indica si un error es temporal y tiene sentido reintentar
+
+    Los errores permanentes (datos inválidos, restricciones, permisos)
+    fallarían igual en cada intento.
+
+    Args:
+        error (Exception): Error capturado
+
+    Returns:
+        bool: True si el error es transitorio
+    """
+    if isinstance(error, (httpx.TransportError, CircuitoAbierto)):
+        return True
+    if isinstance(error, APIError):
+        if isinstance(error.code, int):
+            return error.code in ESTADOS_TRANSITORIOS
+        return str(error.code or '').startswith(CODIGOS_TRANSITORIOS)
+    return False
+
+class CircuitBreaker:
+    """
+    Circuit breaker compartido por todas las sesiones del proceso
+
+    Tras UMBRAL_FALLOS errores transitorios seguidos el circuito se abre y
+    las operaciones fallan de inmediato durante TIEMPO_APERTURA segundos,
+    en lugar de esperar el timeout de red en cada rerun. Luego se deja
+    pasar una sola operación de prueba: si funciona el circuito se cierra,
+    si falla vuelve a abrirse.
+    """
+
+    def __init__(self, umbral_fallos=UMBRAL_FALLOS, tiempo_apertura=TIEMPO_APERTURA):
+        """
+        Args:
+            umbral_fallos (int): Fallos seguidos que abren el circuito
+            tiempo_apertura (float): Segundos de falla rápida
+        """
+        self.umbral_fallos = umbral_fallos
+        self.tiempo_apertura = tiempo_apertura
+        self._lock = threading.Lock()
+        self.estado = 'cerrado'
+        self.fallos_seguidos = 0
+        self.abierto_desde = 0.0
+        self.rechazadas = 0
+
+    def permitir(self):
+        """
+        Verifica si una operación puede intentarse
+
+        Raises:
+            CircuitoAbierto: Si el circuito está abierto o ya hay una prueba en curso
+        """
+        with self._lock:
+            if self.estado == 'cerrado':
+                return
+            restante = self.abierto_desde + self.tiempo_apertura - time.monotonic()
+            if restante <= 0:
+                # Esta operación es la prueba; las demás siguen fallando rápido
+                # (si la prueba nunca termina, se permite otra tras el mismo plazo)
+                self.estado = 'semiabierto'
+                self.abierto_desde = time.monotonic()
+                return
+            self.rechazadas += 1
+        raise CircuitoAbierto(
+            f"La base de datos no responde; se reintentará en {math.ceil(restante)} s"
+        )
+
+    def registrar_exito(self):
+        """Cierra el circuito tras una operación exitosa"""
+        with self._lock:
+            self.estado = 'cerrado'
+            self.fallos_seguidos = 0
+
+    def registrar_fallo(self):
+        """Cuenta un fallo transitorio y abre el circuito si corresponde"""
+        with self._lock:
+            self.fallos_seguidos += 1
+            if self.estado == 'semiabierto' or self.fallos_seguidos >= self.umbral_fallos:
+                self.estado = 'abierto'
+                self.abierto_desde = time.monotonic()
+
+    def estadisticas(self):
+        """
+        Retorna el estado actual del circuito
+
+        Returns:
+            dict: Estado, fallos seguidos y operaciones rechazadas
+        """
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'fallos_seguidos': self.fallos_seguidos,
+                'rechazadas': self.rechazadas
+            }
+
+@st.cache_resource(show_spinner=False)
+def obtener_circuito():
+    """
+    Crea el circuit breaker de Supabase compartido por todo el proceso
+
+    Returns:
+        CircuitBreaker: Circuito de la base de datos
+    """
+    return CircuitBreaker()
+
+def espera_reintento(intento):
+    """
+    Calcula la espera antes de un reintento (backoff exponencial con jitter completo)
+
+    Args:
+        intento (int): Número de reintento, desde 1
+
+    Returns:
+        float: Segundos de espera
+    """
+    return random.uniform(0, min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** (intento - 1)))
+
+def nombre_consulta(consulta):
+    """
+    Describe una consulta para el perfilador (ej: 'GET muestreos', 'POST rpc/buscar_muestreos')
+
+    Args:
+        consulta: Consulta de Supabase
+
+    Returns:
+        str: Método HTTP y recurso
+    """
+    solicitud = getattr(consulta, 'request', None)
+    if solicitud is None:
+        return type(consulta).__name__
+    recurso = str(solicitud.path).split('/rest/v1/', 1)[-1]
+    return f"{solicitud.http_method} {recurso}"
+
+def ejecutar(consulta, idempotente=True, max_intentos=MAX_INTENTOS):
+    """
+    Ejecuta una consulta de Supabase con reintentos y circuit breaker
+
+    Solo se reintentan los errores transitorios. Una operación no
+    idempotente (insert, rpc con efectos) se reintenta únicamente si la
+    solicitud no llegó al servidor, para no duplicar la escritura.
+
+    Args:
+        consulta: Consulta de Supabase lista para ejecutar (sin llamar a execute)
+        idempotente (bool): Si repetir la operación produce el mismo resultado
+        max_intentos (int): Intentos totales
+
+    Returns:
+        Respuesta de la consulta
+
+    Raises:
+        CircuitoAbierto: Si la base de datos se considera caída
+        Exception: El último error si no se pudo completar
+    """
+    with medir('consulta', nombre_consulta(consulta)):
+        return _ejecutar_con_reintentos(consulta, idempotente, max_intentos)
+
+def _ejecutar_con_reintentos(consulta, idempotente, max_intentos):
+    """Bucle de reintentos de ejecutar()"""
+    circuito = obtener_circuito()
+    intento = 1
+    while True:
+        restante = plazo_restante()
+        if restante is not None and restante <= 0:
+            raise PlazoVencido("Plazo de la consulta vencido")
+        circuito.permitir()
+        try:
+            respuesta = consulta.execute()
+        except PlazoVencido:
+            raise
+        except Exception as e:
+            if not es_transitorio(e):
+                # El servidor respondió: está disponible aunque rechace la operación
+                circuito.registrar_exito()
+                raise
+            restante = plazo_restante()
+            if restante is not None and restante <= 0:
+                # Cortada por el plazo del hilo: no dice nada de la salud del servidor
+                raise PlazoVencido("Plazo de la consulta vencido") from e
+            circuito.registrar_fallo()
+            reintentable = idempotente or isinstance(e, ERRORES_SIN_ENVIO)
+            espera = espera_reintento(intento)
+            if not reintentable or intento >= max_intentos or (restante is not None and espera >= restante):
+                raise
+            time.sleep(espera)
+            intento += 1
+            continue
+        circuito.registrar_exito()
+        return respuesta
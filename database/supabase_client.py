@@ -3,12 +3,86 @@ Cliente de conexión a Supabase
 Maneja todas las operaciones con la base de datos
 """
 
+import uuid
+from datetime import timedelta
+
+import httpx
 import streamlit as st
-from supabase import create_client
+
+from auth.sesion import identidad_sesion
+from database.aceptacion import obtener_aceptacion
+from database.cache import CacheConsultas
+from database.columnar import RegistrosColumnares
+from database.esquema import COLUMNAS_MUESTREOS
+from database.metricas import obtener_acumulador_kpis
+from database.pool import PoolSupabase
+from database.resiliencia import ejecutar, es_transitorio
+from utils.perfilador import perfilado
+
+# Clave en session_state que identifica a la sesión de navegador dentro del pool
+CLAVE_SESION_POOL = '_id_sesion_pool'
+
+# Paginación de lecturas masivas
+TAMAÑO_PAGINA = 1000
+COLUMNAS_ORDEN = ('id', 'fecha_vaciado', 'proyecto', 'elemento')
+
+# Ensayos programados traídos por consulta
+LIMITE_ENSAYOS = 200
+
+# Días hacia adelante que el dashboard muestra como próximos ensayos
+DIAS_PROXIMOS_ENSAYOS = 7
+
+# Escrituras masivas
+TAMAÑO_LOTE = 500
+
+# Valores por filtro `in` (acota el largo de la URL de cada consulta)
+TAMAÑO_FILTRO_IN = 200
+
+@st.cache_resource(show_spinner=False)
+def obtener_pool():
+    """
+    Crea el pool de clientes compartido por todo el proceso
+    
+    Returns:
+        PoolSupabase: Pool de clientes configurado con los secretos
+    """
+    url = st.secrets["supabase"]["url"]
+    key = st.secrets["supabase"]["key"]
+    return PoolSupabase(url, key)
+
+@st.cache_resource(show_spinner=False)
+def obtener_cache():
+    """
+    Crea la caché de consultas compartida por todo el proceso
+    
+    Returns:
+        CacheConsultas: Caché de lecturas
+    """
+    return CacheConsultas()
+
+def obtener_id_sesion():
+    """
+    Retorna el identificador de la sesión de navegador actual
+    
+    Returns:
+        str: Identificador único de la sesión
+    """
+    if CLAVE_SESION_POOL not in st.session_state:
+        st.session_state[CLAVE_SESION_POOL] = uuid.uuid4().hex
+    return st.session_state[CLAVE_SESION_POOL]
+
+@perfilado()
+def liberar_cliente_sesion():
+    """
+    Descarta el cliente de la sesión actual (al cerrar sesión)
+    
+    El próximo rerun recibe un cliente nuevo, sin la sesión de autenticación anterior.
+    """
+    obtener_pool().liberar(obtener_id_sesion())
 
 def inicializar_supabase():
     """
-    Inicializa y retorna el cliente de Supabase
+    Retorna el cliente de Supabase de la sesión actual desde el pool del proceso
     
     Returns:
         Client: Cliente de Supabase configurado
@@ -17,14 +91,36 @@ def inicializar_supabase():
         Exception: Si no se encuentran las credenciales
     """
     try:
-        url = st.secrets["supabase"]["url"]
-        key = st.secrets["supabase"]["key"]
-        supabase = create_client(url, key)
-        return supabase
+        pool = obtener_pool()
     except Exception as e:
         st.error("⚠️ Error: No se detectaron los secretos de conexión.")
         st.stop()
+    return pool.obtener(obtener_id_sesion())
 
+def cliente_para_token(access_token):
+    """
+    Crea un cliente que actúa con el access token de un usuario, fuera de su sesión
+    
+    Args:
+        access_token (str): Access token del usuario
+    
+    Returns:
+        Client: Cliente de Supabase (ver PoolSupabase.cliente_con_token)
+    """
+    return obtener_pool().cliente_con_token(access_token)
+
+def reportar_error_conexion(supabase, error):
+    """
+    Marca el cliente como fallido si el error es de conexión
+    
+    Args:
+        supabase: Cliente de Supabase
+        error (Exception): Error capturado
+    """
+    if isinstance(error, httpx.TransportError):
+        obtener_pool().reportar_fallo(supabase)
+
+@perfilado('acceso')
 def guardar_registro_muestreo(supabase, datos):
     """
     Guarda un registro de muestreo en la base de datos
@@ -37,36 +133,576 @@ def guardar_registro_muestreo(supabase, datos):
         bool: True si se guardó correctamente, False en caso contrario
     """
     try:
-        response = supabase.table('muestreos').insert(datos).execute()
+        response = ejecutar(supabase.table('muestreos').insert(datos), idempotente=False)
+        obtener_cache().invalidar_insercion('muestreos', datos)
+        # Cada muestreo nuevo programa sus ensayos de rotura (trigger en la base de datos)
+        obtener_cache().invalidar_tabla('ensayos_programados')
         return True
     except Exception as e:
+        reportar_error_conexion(supabase, e)
         st.error(f"Error al guardar: {e}")
         return False
 
-def obtener_registros_muestreo(supabase, filtros=None):
+@perfilado('acceso')
+def guardar_registros_muestreo(supabase, registros, tamaño_lote=TAMAÑO_LOTE, clave_conflicto=None):
+    """
+    Guarda registros de muestreo en bloque, enviándolos por lotes
+    
+    Si un lote es rechazado por la base de datos, sus filas se reenvían una
+    por una para identificar exactamente cuáles fallan; el resto se guarda.
+    
+    Args:
+        supabase: Cliente de Supabase
+        registros (iterable): Diccionarios con los datos de cada muestreo
+        tamaño_lote (int): Número de filas por solicitud
+        clave_conflicto (str, optional): Columna única para hacer upsert
+            (ej: 'codigo_muestra'); si se omite se insertan filas nuevas
+    
+    Returns:
+        dict: {'guardados': int, 'errores': [(índice, mensaje), ...],
+               'sin_conexion': bool}
+    """
+    resultado = {'guardados': 0, 'errores': [], 'sin_conexion': False}
+    lote = []
+    
+    for indice, registro in enumerate(registros):
+        lote.append((indice, registro))
+        if len(lote) >= tamaño_lote:
+            _enviar_lote(supabase, lote, clave_conflicto, resultado)
+            lote = []
+    
+    if lote:
+        _enviar_lote(supabase, lote, clave_conflicto, resultado)
+    
+    return resultado
+
+def _escribir_filas(supabase, filas, clave_conflicto):
+    """Ejecuta un insert o upsert de varias filas e invalida la caché"""
+    tabla = supabase.table('muestreos')
+    obtener_cache().invalidar_tabla('ensayos_programados')
+    if clave_conflicto:
+        ejecutar(tabla.upsert(filas, on_conflict=clave_conflicto))
+        # Un upsert puede modificar filas existentes cuyos valores previos no se conocen
+        obtener_cache().invalidar_tabla('muestreos')
+        obtener_acumulador_kpis().invalidar()
+    else:
+        ejecutar(tabla.insert(filas), idempotente=False)
+        obtener_cache().invalidar_insercion('muestreos', filas)
+
+def _enviar_lote(supabase, lote, clave_conflicto, resultado, escribir=_escribir_filas):
+    """
+    Envía un lote y, si la base de datos lo rechaza, aísla las filas con error
+    
+    Args:
+        supabase: Cliente de Supabase
+        lote (list): Pares (índice, registro)
+        clave_conflicto (str): Columna para upsert o None
+        resultado (dict): Acumulador de guardados y errores
+        escribir (callable): Función que escribe las filas (por defecto, muestreos)
+    """
+    try:
+        escribir(supabase, [registro for _, registro in lote], clave_conflicto)
+        resultado['guardados'] += len(lote)
+        return
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        if es_transitorio(e) or len(lote) == 1:
+            # Sin conexión no tiene sentido reintentar fila por fila
+            resultado['sin_conexion'] |= es_transitorio(e)
+            resultado['errores'].extend((indice, str(e)) for indice, _ in lote)
+            return
+    
+    for indice, registro in lote:
+        try:
+            escribir(supabase, [registro], clave_conflicto)
+            resultado['guardados'] += 1
+        except Exception as e:
+            reportar_error_conexion(supabase, e)
+            resultado['errores'].append((indice, str(e)))
+
+def aplicar_filtros(query, filtros=None, rangos=None):
+    """
+    Aplica filtros de igualdad y de rango a una consulta
+    
+    Args:
+        query: Consulta de Supabase
+        filtros (dict, optional): Columna -> valor exacto
+        rangos (dict, optional): Columna -> (mínimo, máximo); None deja el extremo abierto
+    
+    Returns:
+        Consulta con los filtros aplicados
+    """
+    if filtros:
+        for key, value in filtros.items():
+            query = query.eq(key, value)
+    
+    if rangos:
+        for key, (minimo, maximo) in rangos.items():
+            if minimo is not None:
+                query = query.gte(key, minimo)
+            if maximo is not None:
+                query = query.lte(key, maximo)
+    
+    return query
+
+@perfilado('acceso')
+def obtener_registros_muestreo(supabase, filtros=None, columnas=None, rangos=None, columnar=False):
     """
     Obtiene registros de muestreo de la base de datos
     
+    Con `columnar` el resultado se lee página por página y se guarda por
+    columnas (RegistrosColumnares): para lecturas de miles de filas ocupa
+    del orden de diez veces menos y la caché lo comparte entre las sesiones del usuario.
+    
     Args:
         supabase: Cliente de Supabase
         filtros (dict, optional): Filtros a aplicar en la consulta
+        columnas (list, optional): Columnas a traer (por defecto todas)
+        rangos (dict, optional): Columna -> (mínimo, máximo)
+        columnar (bool): Retornar un RegistrosColumnares en lugar de la lista
     
     Returns:
-        list: Lista de registros
+        list | RegistrosColumnares: Registros obtenidos
     """
+    cache = obtener_cache()
+    ambito = identidad_sesion()
+    datos = cache.obtener('muestreos', filtros, columnas, rangos, columnar, ambito)
+    if datos is not None:
+        return datos
+    
+    if columnar:
+        tipos = {c: COLUMNAS_MUESTREOS[c] for c in (columnas or COLUMNAS_MUESTREOS)}
+        try:
+            datos = RegistrosColumnares.desde_paginas(
+                iterar_paginas(supabase, 'muestreos', list(tipos), filtros, rangos), tipos
+            )
+        except Exception as e:
+            st.error(f"Error al obtener registros: {e}")
+            return RegistrosColumnares.desde_paginas([], tipos)
+        cache.guardar('muestreos', datos, filtros, columnas, rangos, columnar=True, ambito=ambito)
+        return datos
+    
     try:
-        query = supabase.table('muestreos').select('*')
-        
-        if filtros:
-            for key, value in filtros.items():
-                query = query.eq(key, value)
+        seleccion = ','.join(columnas) if columnas else '*'
+        query = supabase.table('muestreos').select(seleccion)
+        query = aplicar_filtros(query, filtros, rangos)
         
-        response = query.execute()
+        response = ejecutar(query)
+        cache.guardar('muestreos', response.data, filtros, columnas, rangos, ambito=ambito)
         return response.data
     except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al obtener registros: {e}")
+        return []
+
+def _literal_postgrest(valor):
+    """Entrecomilla un valor para usarlo dentro de un filtro lógico de PostgREST"""
+    texto = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{texto}"'
+
+def aplicar_cursor(query, orden, cursor, descendente=False):
+    """
+    Restringe la consulta a las filas posteriores al cursor (paginación keyset)
+    
+    Postgres ubica los nulos al final en orden ascendente y al inicio en
+    orden descendente; el filtro respeta ese orden para no saltar filas.
+    
+    Args:
+        query: Consulta de Supabase
+        orden (str): Columna de ordenamiento
+        cursor (tuple): (valor de la columna de orden, id) de la última fila leída
+        descendente (bool): Si el recorrido es descendente
+    
+    Returns:
+        Consulta restringida
+    """
+    valor, id_ultimo = cursor
+    op = 'lt' if descendente else 'gt'
+    
+    if orden == 'id':
+        return query.filter('id', op, id_ultimo)
+    
+    if valor is None:
+        if descendente:
+            return query.or_(f"{orden}.not.is.null,and({orden}.is.null,id.lt.{id_ultimo})")
+        return query.is_(orden, 'null').gt('id', id_ultimo)
+    
+    # Desempate por id para columnas con valores repetidos
+    literal = _literal_postgrest(valor)
+    condicion = f"{orden}.{op}.{literal},and({orden}.eq.{literal},id.{op}.{id_ultimo})"
+    if not descendente:
+        condicion += f",{orden}.is.null"
+    return query.or_(condicion)
+
+def _consultar_pagina(supabase, tabla, cursor, columnas, filtros, rangos, orden, descendente, tamaño_pagina):
+    """
+    Consulta una página keyset de una tabla (ver obtener_pagina_muestreos)
+    
+    Returns:
+        tuple: (lista de registros, cursor de la página siguiente o None)
+    
+    Raises:
+        Exception: Si la consulta falla
+    """
+    # La columna de orden y el id son necesarios para construir el cursor
+    extras = []
+    if columnas:
+        extras = [c for c in dict.fromkeys(('id', orden)) if c not in columnas]
+        seleccion = ','.join(list(columnas) + extras)
+    else:
+        seleccion = '*'
+    
+    query = supabase.table(tabla).select(seleccion)
+    query = aplicar_filtros(query, filtros, rangos)
+    if cursor is not None:
+        query = aplicar_cursor(query, orden, cursor, descendente)
+    query = query.order(orden, desc=descendente)
+    if orden != 'id':
+        query = query.order('id', desc=descendente)
+    # Una fila extra indica si existe una página siguiente
+    filas = ejecutar(query.limit(tamaño_pagina + 1)).data
+    
+    siguiente = None
+    if len(filas) > tamaño_pagina:
+        filas = filas[:tamaño_pagina]
+        siguiente = (filas[-1][orden], filas[-1]['id'])
+    
+    for fila in filas:
+        for columna in extras:
+            fila.pop(columna, None)
+    
+    return filas, siguiente
+
+@perfilado('acceso')
+def obtener_pagina_muestreos(supabase, cursor=None, columnas=None, filtros=None, rangos=None,
+                             orden='id', descendente=False, tamaño_pagina=TAMAÑO_PAGINA):
+    """
+    Obtiene una página de registros de muestreo ordenada en la base de datos
+    
+    Usa paginación keyset sobre la columna de orden (con desempate por id),
+    de modo que cada página cuesta lo mismo sin importar su posición.
+    
+    Args:
+        supabase: Cliente de Supabase
+        cursor (tuple, optional): Cursor devuelto por la página anterior
+        columnas (list, optional): Columnas a traer (por defecto todas)
+        filtros (dict, optional): Columna -> valor exacto
+        rangos (dict, optional): Columna -> (mínimo, máximo), ej. fechas o f'c
+        orden (str): Columna de ordenamiento (ver COLUMNAS_ORDEN)
+        descendente (bool): Ordenar de mayor a menor
+        tamaño_pagina (int): Filas por página
+    
+    Returns:
+        tuple: (lista de registros, cursor de la página siguiente o None)
+    """
+    if orden not in COLUMNAS_ORDEN:
+        raise ValueError(f"Orden no soportado: {orden}")
+    
+    try:
+        return _consultar_pagina(supabase, 'muestreos', cursor, columnas, filtros, rangos,
+                                 orden, descendente, tamaño_pagina)
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
         st.error(f"Error al obtener registros: {e}")
+        return [], None
+
+def iterar_paginas(supabase, tabla, columnas=None, filtros=None, rangos=None, tamaño_pagina=TAMAÑO_PAGINA):
+    """
+    Recorre todos los registros de una tabla página por página, en orden de id
+    
+    La memoria usada se limita a una página, sin importar el total de filas.
+    A diferencia de las lecturas de pantalla, un error corta el recorrido
+    con una excepción en lugar de devolver un resultado incompleto.
+    
+    Args:
+        supabase: Cliente de Supabase
+        tabla (str): Nombre de la tabla
+        columnas (list, optional): Columnas a traer (por defecto todas)
+        filtros (dict, optional): Columna -> valor exacto
+        rangos (dict, optional): Columna -> (mínimo, máximo), ej. fechas o f'c
+        tamaño_pagina (int): Filas por solicitud
+    
+    Yields:
+        list: Los registros de cada página
+    
+    Raises:
+        Exception: Si alguna consulta falla
+    """
+    cursor = None
+    while True:
+        try:
+            filas, cursor = _consultar_pagina(supabase, tabla, cursor, columnas, filtros, rangos,
+                                              'id', False, tamaño_pagina)
+        except Exception as e:
+            reportar_error_conexion(supabase, e)
+            raise
+        if filas:
+            yield filas
+        if cursor is None:
+            return
+
+@perfilado('acceso')
+def buscar_muestreos(supabase, texto, columnas=None, pagina=0, tamaño_pagina=20):
+    """
+    Busca muestreos por texto libre usando el índice de texto completo
+    
+    La búsqueda ignora tildes y mayúsculas, y cada palabra coincide por
+    prefijo en proyecto, elemento, ubicación, proveedor, guía y observaciones.
+    Los resultados vienen ordenados por relevancia.
+    
+    Args:
+        supabase: Cliente de Supabase
+        texto (str): Texto a buscar
+        columnas (list, optional): Columnas a traer (por defecto todas)
+        pagina (int): Número de página, desde 0
+        tamaño_pagina (int): Resultados por página
+    
+    Returns:
+        tuple: (lista de registros, True si hay más resultados)
+    """
+    if not texto or not texto.strip():
+        return [], False
+    
+    try:
+        response = ejecutar(supabase.rpc('buscar_muestreos', {
+            'p_texto': texto,
+            # Un resultado extra indica si existe una página siguiente
+            'p_limite': tamaño_pagina + 1,
+            'p_desplazamiento': pagina * tamaño_pagina
+        }).select(','.join(columnas) if columnas else '*'))
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al buscar registros: {e}")
+        return [], False
+    
+    filas = response.data or []
+    return filas[:tamaño_pagina], len(filas) > tamaño_pagina
+
+@perfilado('acceso')
+def obtener_resumen_resistencias(supabase, filtros=None):
+    """
+    Obtiene el resumen precalculado de resistencias por edad
+    
+    Cada fila agrupa las roturas de un proyecto, proveedor, f'c y edad con
+    sus sumas, de modo que varios grupos se pueden combinar sin perder exactitud.
+    
+    Args:
+        supabase: Cliente de Supabase
+        filtros (dict, optional): Columna -> valor exacto
+    
+    Returns:
+        list: Filas del resumen
+    """
+    cache = obtener_cache()
+    ambito = identidad_sesion()
+    datos = cache.obtener('resumen_resistencias', filtros, ambito=ambito)
+    if datos is not None:
+        return datos
+    
+    try:
+        query = aplicar_filtros(supabase.table('resumen_resistencias').select('*'), filtros)
+        response = ejecutar(query)
+        cache.guardar('resumen_resistencias', response.data, filtros, ambito=ambito)
+        return response.data
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al obtener el resumen de resistencias: {e}")
+        return []
+
+@perfilado('acceso')
+def obtener_ensayos_programados(supabase, hasta, desde=None):
+    """
+    Obtiene los ensayos de rotura pendientes dentro de un rango de fechas
+    
+    Es un único recorrido del índice parcial sobre fecha_programada.
+    
+    Args:
+        supabase: Cliente de Supabase
+        hasta (date): Última fecha programada a incluir
+        desde (date, optional): Primera fecha a incluir (por defecto, todos los vencidos)
+    
+    Returns:
+        list: Ensayos ordenados por fecha programada (hasta LIMITE_ENSAYOS)
+    """
+    rangos = {'fecha_programada': (desde.isoformat() if desde else None, hasta.isoformat())}
+    filtros = {'completado': False}
+    
+    cache = obtener_cache()
+    ambito = identidad_sesion()
+    datos = cache.obtener('ensayos_programados', filtros, rangos=rangos, ambito=ambito)
+    if datos is not None:
+        return datos
+    
+    try:
+        query = supabase.table('ensayos_programados').select('*')
+        query = aplicar_filtros(query, filtros, rangos)
+        response = ejecutar(query.order('fecha_programada').order('id').limit(LIMITE_ENSAYOS))
+        cache.guardar('ensayos_programados', response.data, filtros, rangos=rangos,
+                      orden=('fecha_programada', 'id'), limite=LIMITE_ENSAYOS, ambito=ambito)
+        return response.data
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al obtener ensayos programados: {e}")
         return []
 
+# Columnas del conteo de ensayos pendientes (sin id: la caché lo descarta ante
+# cualquier cambio en tiempo real en lugar de intentar actualizarlo)
+COLUMNAS_CONTEO_ENSAYOS = ['vencidos', 'hoy', 'proximos']
+
+@perfilado('acceso')
+def contar_ensayos_pendientes(supabase, hoy):
+    """
+    Cuenta los ensayos pendientes vencidos, de hoy y de los próximos DIAS_PROXIMOS_ENSAYOS días
+    
+    Es un agregado en la base de datos (migración 010): a diferencia del
+    largo de obtener_ensayos_programados, no está acotado por LIMITE_ENSAYOS.
+    
+    Args:
+        supabase: Cliente de Supabase
+        hoy (date): Fecha de referencia
+    
+    Returns:
+        dict: 'vencidos', 'hoy' y 'proximos', o None si la consulta falló
+    """
+    hasta = hoy + timedelta(days=DIAS_PROXIMOS_ENSAYOS)
+    # La ventana es fija: la fecha final identifica el día de referencia en la caché
+    rangos = {'fecha_programada': (None, hasta.isoformat())}
+    filtros = {'completado': False}
+    
+    cache = obtener_cache()
+    ambito = identidad_sesion()
+    datos = cache.obtener('ensayos_programados', filtros, COLUMNAS_CONTEO_ENSAYOS, rangos, ambito=ambito)
+    if datos is not None:
+        return datos[0]
+    
+    try:
+        response = ejecutar(supabase.rpc('contar_ensayos_pendientes', {
+            'p_hoy': hoy.isoformat(),
+            'p_hasta': hasta.isoformat()
+        }))
+        conteo = {c: int(response.data[0][c] or 0) for c in COLUMNAS_CONTEO_ENSAYOS}
+        cache.guardar('ensayos_programados', [conteo], filtros, COLUMNAS_CONTEO_ENSAYOS, rangos, ambito=ambito)
+        return conteo
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al contar ensayos pendientes: {e}")
+        return None
+
+@perfilado('acceso')
+def guardar_roturas(supabase, roturas):
+    """
+    Guarda resultados de rotura de probetas
+    
+    El resumen de resistencias se actualiza en la base de datos (trigger)
+    y los resultados a 28 días entran al estado de aceptación ACI 318.
+    
+    Args:
+        supabase: Cliente de Supabase
+        roturas (list): Diccionarios con los datos de cada probeta ensayada
+    
+    Returns:
+        bool: True si se guardaron correctamente
+    """
+    try:
+        response = ejecutar(supabase.table('roturas').insert(roturas), idempotente=False)
+        obtener_cache().invalidar_tabla('resumen_resistencias')
+        obtener_aceptacion().registrar(response.data, identidad_sesion())
+        return True
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al guardar roturas: {e}")
+        return False
+
+def _escribir_roturas(supabase, filas, clave_conflicto):
+    """Inserta roturas omitiendo las probetas ya registradas e invalida la caché"""
+    # Con ignore_duplicates la respuesta trae solo las filas insertadas
+    response = ejecutar(supabase.table('roturas').upsert(filas, on_conflict=clave_conflicto, ignore_duplicates=True))
+    obtener_cache().invalidar_tabla('resumen_resistencias')
+    obtener_aceptacion().registrar(response.data, identidad_sesion())
+
+@perfilado('acceso')
+def guardar_registros_rotura(supabase, registros, tamaño_lote=TAMAÑO_LOTE):
+    """
+    Guarda resultados de rotura en bloque, enviándolos por lotes
+    
+    Las probetas ya registradas (mismo codigo_probeta) se omiten, así
+    reenviar una planilla no duplica ni modifica resultados.
+    
+    Args:
+        supabase: Cliente de Supabase
+        registros (iterable): Diccionarios con los datos de cada probeta ensayada
+        tamaño_lote (int): Número de filas por solicitud
+    
+    Returns:
+        dict: Ver guardar_registros_muestreo
+    """
+    resultado = {'guardados': 0, 'errores': [], 'sin_conexion': False}
+    lote = []
+    
+    for indice, registro in enumerate(registros):
+        lote.append((indice, registro))
+        if len(lote) >= tamaño_lote:
+            _enviar_lote(supabase, lote, 'codigo_probeta', resultado, _escribir_roturas)
+            lote = []
+    
+    if lote:
+        _enviar_lote(supabase, lote, 'codigo_probeta', resultado, _escribir_roturas)
+    
+    return resultado
+
+@perfilado('acceso')
+def obtener_muestras_por_codigo(supabase, codigos, columnas=None):
+    """
+    Obtiene los muestreos de una lista de códigos de muestra
+    
+    Args:
+        supabase: Cliente de Supabase
+        codigos (list): Códigos de muestra
+        columnas (list, optional): Columnas a traer (por defecto todas)
+    
+    Returns:
+        dict: Código de muestra -> registro, o None si la consulta falló
+    """
+    seleccion = ','.join(columnas) if columnas else '*'
+    muestras = {}
+    try:
+        for inicio in range(0, len(codigos), TAMAÑO_FILTRO_IN):
+            query = supabase.table('muestreos').select(seleccion)
+            response = ejecutar(query.in_('codigo_muestra', codigos[inicio:inicio + TAMAÑO_FILTRO_IN]))
+            muestras.update((fila['codigo_muestra'], fila) for fila in response.data)
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al obtener muestras: {e}")
+        return None
+    return muestras
+
+@perfilado('acceso')
+def completar_ensayos(supabase, codigos_muestra, edad_dias):
+    """
+    Marca como completados los ensayos de una edad para varias muestras
+    
+    Args:
+        supabase: Cliente de Supabase
+        codigos_muestra (list): Códigos de muestra ensayados
+        edad_dias (int): Edad de ensayo
+    
+    Returns:
+        bool: True si se actualizaron correctamente
+    """
+    try:
+        for inicio in range(0, len(codigos_muestra), TAMAÑO_FILTRO_IN):
+            query = supabase.table('ensayos_programados').update({'completado': True})
+            query = query.in_('codigo_muestra', codigos_muestra[inicio:inicio + TAMAÑO_FILTRO_IN])
+            ejecutar(query.eq('edad_dias', edad_dias).eq('completado', False))
+        return True
+    except Exception as e:
+        reportar_error_conexion(supabase, e)
+        st.error(f"Error al completar ensayos: {e}")
+        return False
+    finally:
+        obtener_cache().invalidar_tabla('ensayos_programados')
+
+@perfilado('acceso')
 def actualizar_registro(supabase, tabla, id, datos):
     """
     Actualiza un registro existente
@@ -81,12 +717,17 @@ def actualizar_registro(supabase, tabla, id, datos):
         bool: True si se actualizó correctamente
     """
     try:
-        response = supabase.table(tabla).update(datos).eq('id', id).execute()
+        response = ejecutar(supabase.table(tabla).update(datos).eq('id', id))
+        obtener_cache().invalidar_registro(tabla, id)
+        if tabla == 'muestreos':
+            obtener_acumulador_kpis().invalidar()
         return True
     except Exception as e:
+        reportar_error_conexion(supabase, e)
         st.error(f"Error al actualizar: {e}")
         return False
 
+@perfilado('acceso')
 def eliminar_registro(supabase, tabla, id):
     """
     Elimina un registro de la base de datos
@@ -100,8 +741,14 @@ def eliminar_registro(supabase, tabla, id):
         bool: True si se eliminó correctamente
     """
     try:
-        response = supabase.table(tabla).delete().eq('id', id).execute()
+        response = ejecutar(supabase.table(tabla).delete().eq('id', id))
+        obtener_cache().invalidar_registro(tabla, id)
+        if tabla == 'muestreos':
+            obtener_acumulador_kpis().invalidar()
+            # Los ensayos programados se eliminan en cascada
+            obtener_cache().invalidar_tabla('ensayos_programados')
         return True
     except Exception as e:
+        reportar_error_conexion(supabase, e)
         st.error(f"Error al eliminar: {e}")
         return False
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""
+Cambios en tiempo real
+Suscripción a los cambios de Supabase compartida por todas las sesiones del
+proceso, que actualiza la caché de consultas y los KPIs sin volver a consultar
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import streamlit as st
+from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+from auth.sesion import decodificar_jwt
+from database.metricas import obtener_acumulador_kpis
+from database.supabase_client import obtener_cache
+
+# Tablas cuyos cambios se reciben (deben estar en la publicación, ver migración 008)
+TABLAS_SUSCRITAS = ('muestreos', 'ensayos_programados')
+
+# Segundos de espera de la confirmación de la suscripción
+TIMEOUT_SUSCRIPCION = 10.0
+# Cada cuánto se verifica que la conexión siga viva
+INTERVALO_VIGILANCIA = 5.0
+# Espera entre reconexiones (backoff exponencial con jitter)
+ESPERA_RECONEXION = 1.0
+ESPERA_RECONEXION_MAXIMA = 60.0
+# Segundos antes del vencimiento en que el socket acepta el token de otro usuario
+MARGEN_CAMBIO_TOKEN = 2 * 60
+
+# Cada cuánto se vuelven a dibujar las vistas en vivo desde el estado local
+INTERVALO_REFRESCO = 10
+
+class SuscripcionCambios:
+    """
+    Suscripción única por proceso a los cambios de las tablas en Supabase
+
+    Un hilo propio mantiene un cliente Realtime asíncrono y aplica cada
+    evento a la caché de consultas y a los KPIs del usuario dueño del token
+    del socket (`ambito`): Realtime filtra los eventos con sus políticas
+    RLS, así que solo sus consultas se actualizan en sitio y las de otros
+    usuarios afectadas por el evento se descartan. Mientras está suscrita,
+    las tablas se marcan en vivo; al perder la conexión se descartan sus
+    consultas en caché (pudieron perderse eventos) y se reconecta con backoff.
+    """
+
+    def __init__(self, url, key, cache, acumulador, tablas=TABLAS_SUSCRITAS):
+        """
+        Args:
+            url (str): URL del proyecto Supabase
+            key (str): Clave pública (anon) del proyecto
+            cache (CacheConsultas): Caché de consultas del proceso
+            acumulador (AcumuladoresKpis): Acumuladores de KPIs del proceso
+            tablas (tuple): Tablas a las que suscribirse
+        """
+        self.url = url
+        self.key = key
+        self.cache = cache
+        self.acumulador = acumulador
+        self.tablas = tuple(tablas)
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._loop = None
+        self._cliente = None
+        self._token = None
+        self._expira_token = 0
+        self.ambito = None
+        self.conectada = False
+        self.eventos = 0
+        self.reconexiones = 0
+        self.ultimo_error = None
+
+    def iniciar(self):
+        """Arranca el hilo de la suscripción si aún no está corriendo"""
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._hilo = threading.Thread(target=asyncio.run, args=(self._vigilar(),),
+                                          name='tiempo_real', daemon=True)
+            self._hilo.start()
+
+    def actualizar_token(self, token):
+        """
+        Entrega a la suscripción el access token de una sesión
+
+        Realtime aplica las políticas RLS con el token del socket. El
+        socket se queda con el mismo usuario mientras lleguen sus tokens
+        renovados; el de otro usuario solo se acepta cuando al actual le
+        quedan menos de MARGEN_CAMBIO_TOKEN segundos, así un inicio de
+        sesión no cambia el ámbito en vivo ni descarta consultas.
+
+        Args:
+            token (str): Access token de la sesión
+        """
+        claims = decodificar_jwt(token)
+        if claims is None:
+            return
+        with self._lock:
+            if claims['exp'] <= self._expira_token:
+                return
+            actual = decodificar_jwt(self._token) if self._token else None
+            mismo_usuario = actual is not None and claims.get('sub') == actual.get('sub')
+            if not mismo_usuario and self._expira_token - time.time() > MARGEN_CAMBIO_TOKEN:
+                return
+            self._token, self._expira_token = token, claims['exp']
+            loop, cliente = self._loop, self._cliente
+        if loop is not None and cliente is not None:
+            asyncio.run_coroutine_threadsafe(self._cambiar_token(cliente, token), loop)
+
+    async def _cambiar_token(self, cliente, token):
+        """Cambia el token del socket y, si es de otro usuario, el ámbito en vivo"""
+        await cliente.set_auth(token)
+        ambito = decodificar_jwt(token).get('sub')
+        # Los eventos se procesan en este mismo loop: los siguientes ya son del usuario nuevo
+        if ambito != self.ambito:
+            self.ambito = ambito
+            if self.conectada:
+                self.cache.cambiar_ambito_en_vivo(ambito)
+                self.acumulador.cambiar_ambito(ambito)
+
+    def _marcar_en_vivo(self, en_vivo):
+        """Marca las tablas y los KPIs del usuario del socket como en vivo o no"""
+        for tabla in self.tablas:
+            self.cache.marcar_en_vivo(tabla, en_vivo, self.ambito)
+        self.acumulador.marcar_en_vivo(en_vivo and 'muestreos' in self.tablas, self.ambito)
+
+    async def _vigilar(self):
+        """Mantiene la suscripción abierta, reconectando cuando se cae"""
+        self._loop = asyncio.get_running_loop()
+        intento = 0
+        while True:
+            try:
+                canal = await self._suscribir()
+                intento = 0
+                while self._cliente.is_connected and canal.is_joined:
+                    await asyncio.sleep(INTERVALO_VIGILANCIA)
+                self.ultimo_error = "Conexión cerrada por el servidor"
+            except Exception as e:
+                self.ultimo_error = str(e) or type(e).__name__
+
+            self._desconectar()
+            try:
+                await self._cliente.close()
+            except Exception:
+                pass
+            intento += 1
+            self.reconexiones += 1
+            espera = min(ESPERA_RECONEXION_MAXIMA, ESPERA_RECONEXION * 2 ** intento)
+            await asyncio.sleep(random.uniform(0, espera))
+
+    async def _suscribir(self):
+        """
+        Abre el socket y se suscribe a los cambios de las tablas
+
+        Returns:
+            AsyncRealtimeChannel: Canal suscrito
+
+        Raises:
+            ConnectionError: Si el servidor rechaza la suscripción
+        """
+        cliente = AsyncRealtimeClient(f"{self.url}/realtime/v1", token=self.key, auto_reconnect=False)
+        with self._lock:
+            self._cliente = cliente
+            token = self._token
+        if token:
+            await cliente.set_auth(token)
+        self.ambito = decodificar_jwt(token).get('sub') if token else None
+
+        canal = cliente.channel('cambios')
+        for tabla in self.tablas:
+            canal.on_postgres_changes('*', self._al_cambiar, table=tabla, schema='public')
+
+        confirmacion = asyncio.get_running_loop().create_future()
+
+        def al_suscribir(estado, error):
+            if not confirmacion.done():
+                confirmacion.set_result((estado, error))
+
+        await canal.subscribe(al_suscribir)
+        estado, error = await asyncio.wait_for(confirmacion, TIMEOUT_SUSCRIPCION)
+        if estado != RealtimeSubscribeStates.SUBSCRIBED:
+            raise ConnectionError(f"Suscripción rechazada ({estado}): {error}")
+
+        # Lo cacheado antes de suscribirse pudo perder cambios: se parte de cero
+        self._marcar_en_vivo(True)
+        self.conectada = True
+        self.ultimo_error = None
+        return canal
+
+    def _desconectar(self):
+        """Deja de confiar en el estado local mientras no hay suscripción"""
+        if not self.conectada:
+            return
+        self.conectada = False
+        self._marcar_en_vivo(False)
+
+    def _al_cambiar(self, payload):
+        """
+        Aplica un evento de cambio a la caché y a los KPIs
+
+        Args:
+            payload (dict): Evento de Realtime con el tipo, la fila y la fila anterior
+        """
+        datos = payload['data']
+        tabla, tipo = datos['table'], str(getattr(datos['type'], 'value', datos['type']))
+        registro = datos.get('record') or {}
+        anterior = datos.get('old_record') or {}
+
+        try:
+            self.cache.aplicar_cambio(tabla, tipo, registro, anterior, self.ambito)
+            if tabla == 'muestreos':
+                self.acumulador.aplicar_cambio(tipo, registro, anterior, self.ambito)
+        except Exception as e:
+            # Ante un evento que no se pudo aplicar, se vuelve a consultar la tabla
+            self.cache.invalidar_tabla(tabla)
+            if tabla == 'muestreos':
+                self.acumulador.invalidar()
+            self.ultimo_error = f"Evento no aplicado: {e}"
+
+        with self._lock:
+            self.eventos += 1
+
+    def estadisticas(self):
+        """
+        Retorna el estado de la suscripción
+
+        Returns:
+            dict: Conexión, eventos recibidos, reconexiones y último error
+        """
+        with self._lock:
+            return {
+                'conectada': self.conectada,
+                'eventos': self.eventos,
+                'reconexiones': self.reconexiones,
+                'ultimo_error': self.ultimo_error
+            }
+
+def tiempo_real_habilitado():
+    """
+    Indica si la suscripción en tiempo real está activada en los secretos
+
+    Se activa con `[tiempo_real] activo = true` una vez aplicada la migración 008.
+
+    Returns:
+        bool: True si está habilitada
+    """
+    try:
+        return bool(st.secrets["tiempo_real"].get("activo", False))
+    except Exception:
+        return False
+
+@st.cache_resource(show_spinner=False)
+def obtener_suscripcion():
+    """
+    Crea y arranca la suscripción compartida por todo el proceso
+
+    Returns:
+        SuscripcionCambios: Suscripción a los cambios
+    """
+    suscripcion = SuscripcionCambios(
+        st.secrets["supabase"]["url"],
+        st.secrets["supabase"]["key"],
+        obtener_cache(),
+        obtener_acumulador_kpis()
+    )
+    suscripcion.iniciar()
+    return suscripcion
+
+def iniciar_tiempo_real(token=None):
+    """
+    Arranca la suscripción (una vez por proceso) y le entrega el token de la sesión
+
+    Args:
+        token (str, optional): Access token de la sesión actual
+
+    Returns:
+        SuscripcionCambios: Suscripción, o None si no está habilitada
+    """
+    if not tiempo_real_habilitado():
+        return None
+    suscripcion = obtener_suscripcion()
+    if token:
+        suscripcion.actualizar_token(token)
+    return suscripcion
+
+def intervalo_refresco():
+    """
+    Intervalo con que las vistas en vivo se vuelven a dibujar
+
+    Returns:
+        int: Segundos entre refrescos, o None si no hay suscripción activa
+    """
+    if not tiempo_real_habilitado():
+        return None
+    return INTERVALO_REFRESCO if obtener_suscripcion().conectada else None
@@ -3,7 +3,16 @@ Módulo de Dashboard
 Pantalla principal con métricas y accesos rápidos
 """
 
+from datetime import date, timedelta
+from functools import partial
+
 import streamlit as st
+from database.metricas import obtener_kpis_dashboard
+from database.paralelo import cargar_en_paralelo
+from database.supabase_client import (DIAS_PROXIMOS_ENSAYOS, contar_ensayos_pendientes, obtener_ensayos_programados,
+                                      obtener_resumen_resistencias)
+from database.tiempo_real import intervalo_refresco
+from utils.helpers import combinar_resumenes
 
 def mostrar_dashboard(supabase):
     """
@@ -14,16 +23,53 @@ def mostrar_dashboard(supabase):
     """
     st.subheader("Dashboard - Control de Calidad de Concreto")
     
-    # Métricas principales
+    # Con la suscripción en tiempo real activa, el panel se vuelve a dibujar
+    # periódicamente desde la caché y los KPIs locales, sin recargar la página
+    st.fragment(renderizar_panel, run_every=intervalo_refresco())(supabase)
+
+def renderizar_panel(supabase):
+    """
+    Renderiza las métricas, los accesos rápidos y los próximos ensayos
+    
+    Args:
+        supabase: Cliente de Supabase
+    """
+    # Métricas principales (agregadas en la base de datos, consultadas en paralelo)
+    hoy = date.today()
+    datos = cargar_en_paralelo(
+        {
+            'kpis': partial(obtener_kpis_dashboard, supabase),
+            'conteo': partial(contar_ensayos_pendientes, supabase, hoy),
+            'ensayos': partial(obtener_ensayos_programados, supabase, hasta=hoy + timedelta(days=DIAS_PROXIMOS_ENSAYOS)),
+            'resumen': partial(obtener_resumen_resistencias, supabase, {'edad_dias': 28})
+        },
+        por_defecto={'ensayos': [], 'resumen': []}
+    )
+    kpis = datos['kpis']
+    # La lista está acotada (LIMITE_ENSAYOS): los totales salen del conteo
+    conteo = datos['conteo']
+    ensayos = datos['ensayos']
+    conformidad = combinar_resumenes(datos['resumen'])['cumplen']
+    
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Muestras Hoy", "0", delta="0")
+        if kpis:
+            st.metric("Muestras Hoy", kpis['muestras_hoy'], delta=kpis['muestras_hoy'] - kpis['muestras_ayer'])
+        else:
+            st.metric("Muestras Hoy", "—")
     with col2:
-        st.metric("Probetas Activas", "0", delta="0")
+        if kpis:
+            st.metric("Probetas Activas", kpis['probetas_activas'], delta=kpis['probetas_hoy'])
+        else:
+            st.metric("Probetas Activas", "—")
     with col3:
-        st.metric("Ensayos Pendientes", "0", delta="0")
+        if conteo:
+            st.metric("Ensayos Pendientes", conteo['vencidos'] + conteo['hoy'],
+                      delta=f"{conteo['vencidos']} vencidos", delta_color="inverse")
+        else:
+            st.metric("Ensayos Pendientes", "—")
     with col4:
-        st.metric("% Conformidad", "0%", delta="0%")
+        st.metric("% Conformidad", f"{conformidad:.0f}%" if conformidad is not None else "—")
     
     st.divider()
     
@@ -44,4 +90,13 @@ def mostrar_dashboard(supabase):
     
     with col2:
         st.warning("⚠️ **Próximos Ensayos**")
-        st.write("No hay ensayos programados")
\ No newline at end of file
+        if not ensayos:
+            st.write("No hay ensayos programados")
+        else:
+            if conteo:
+                st.write(f"🔴 Vencidos: **{conteo['vencidos']}** · 🟡 Hoy: **{conteo['hoy']}** · 🟢 Esta semana: **{conteo['proximos']}**")
+            for ensayo in ensayos[:8]:
+                st.write(
+                    f"- {ensayo['fecha_programada']} · {ensayo['codigo_muestra'] or 'sin código'} "
+                    f"({ensayo['proyecto']}) · {ensayo['edad_dias']} días"
+                )
\ No newline at end of file
@@ -3,8 +3,134 @@ Módulo de Registro de Muestreo
 Formulario completo para registro de toma de muestras de concreto
 """
 
+from datetime import date, datetime
+
 import streamlit as st
+from components.importacion import mostrar_importacion
+from database.codigos import asignar_codigos_muestra
+from database.journal import guardar_muestreo_local
+from database.supabase_client import buscar_muestreos, obtener_pagina_muestreos
 from utils.helpers import calcular_muestras_necesarias
+from utils.pdf import obtener_generador_pdf
+
+# Clave en session_state donde vive el borrador del formulario
+CLAVE_BORRADOR = 'borrador_muestreo'
+CLAVE_LIMPIAR = 'limpiar_muestreo'
+# Resultado del último guardado, mostrado en la ejecución siguiente al clic
+CLAVE_AVISO = 'aviso_muestreo'
+CLAVE_PDF = 'pdf_muestreo'
+PREFIJO_CAMPO = 'muestreo_'
+
+# Historial paginado en la base de datos
+CLAVE_HISTORIAL = 'historial_muestreo'
+COLUMNAS_HISTORIAL = [
+    'id', 'fecha_vaciado', 'proyecto', 'elemento', 'ubicacion', 'codigo_muestra',
+    'fc_diseno', 'slump_especificado', 'proveedor', 'responsable_muestreo'
+]
+ORDENES_HISTORIAL = {
+    "Fecha de vaciado": 'fecha_vaciado',
+    "Proyecto": 'proyecto',
+    "Elemento": 'elemento',
+    "Nº de registro": 'id'
+}
+
+# Búsqueda de texto completo
+TAMAÑO_BUSQUEDA = 20
+COLUMNAS_BUSQUEDA = COLUMNAS_HISTORIAL + ['guia_remision', 'observaciones']
+
+def borrador_inicial():
+    """
+    Retorna los valores iniciales del formulario de muestreo
+    
+    Returns:
+        dict: Campo -> valor por defecto
+    """
+    ahora = datetime.now().time().replace(second=0, microsecond=0)
+    return {
+        'proyecto': '', 'elemento': '', 'ubicacion': '',
+        'fecha_vaciado': date.today(), 'hora_vaciado': ahora, 'temperatura': 20.0,
+        'fc_diseno': 210, 'slump_especificado': 4.0,
+        'tipo_cemento': "Portland Tipo I", 'tamano_max_agregado': "3/8\"",
+        'relacion_ac': 0.50, 'aditivo': '',
+        'proveedor': '', 'guia_remision': '', 'num_camion': '', 'volumen_pedido': 8.0,
+        'hora_salida_planta': ahora, 'hora_llegada_obra': ahora,
+        'volumen_total': 100.0, 'num_camiones': 13,
+        'codigo_muestra': '', 'probeta_1': '', 'probeta_2': '', 'probeta_3': '', 'probeta_4': '',
+        'diametro_cm': 15, 'altura_cm': 30, 'edad_7': False, 'edad_28': True,
+        'edad_otra': False, 'otra_edad': 14,
+        'observaciones': '', 'responsable_muestreo': '', 'hora_moldeo': ahora
+    }
+
+def obtener_borrador():
+    """
+    Retorna el borrador del formulario guardado en la sesión
+    
+    Returns:
+        dict: Valores actuales del formulario
+    """
+    if CLAVE_BORRADOR not in st.session_state:
+        st.session_state[CLAVE_BORRADOR] = borrador_inicial()
+    return st.session_state[CLAVE_BORRADOR]
+
+def limpiar_borrador():
+    """
+    Descarta el borrador y el estado de los widgets del formulario
+    
+    Debe llamarse antes de crear los widgets; tras crearlos usar
+    st.session_state[CLAVE_LIMPIAR] = True para limpiar en la siguiente ejecución.
+    """
+    st.session_state.pop(CLAVE_LIMPIAR, None)
+    st.session_state.pop(CLAVE_BORRADOR, None)
+    for clave in [c for c in st.session_state if str(c).startswith(PREFIJO_CAMPO)]:
+        del st.session_state[clave]
+
+def _copiar_a_borrador(campo):
+    """Callback: copia el valor del widget al borrador"""
+    obtener_borrador()[campo] = st.session_state[PREFIJO_CAMPO + campo]
+
+def campo(widget, etiqueta, nombre, **kwargs):
+    """
+    Crea un widget enlazado a un campo del borrador
+    
+    El valor inicial sale del borrador y cada cambio se copia de vuelta, así
+    el formulario sobrevive a cambios de módulo o de pestaña.
+    
+    Args:
+        widget: Función de Streamlit (st.text_input, st.number_input, ...)
+        etiqueta (str): Etiqueta visible
+        nombre (str): Campo del borrador
+        **kwargs: Argumentos adicionales del widget
+    
+    Returns:
+        Valor actual del widget
+    """
+    clave = PREFIJO_CAMPO + nombre
+    if clave not in st.session_state:
+        st.session_state[clave] = obtener_borrador()[nombre]
+    return widget(etiqueta, key=clave, on_change=_copiar_a_borrador, args=(nombre,), **kwargs)
+
+def construir_registro_muestreo(borrador):
+    """
+    Convierte el borrador del formulario en un registro para la base de datos
+    
+    Args:
+        borrador (dict): Valores del formulario
+    
+    Returns:
+        dict: Registro serializable a JSON
+    """
+    registro = {
+        clave: valor for clave, valor in borrador.items()
+        if clave not in ('volumen_total', 'num_camiones', 'edad_otra') and not clave.startswith('probeta_')
+    }
+    for clave in ('fecha_vaciado', 'hora_vaciado', 'hora_salida_planta', 'hora_llegada_obra', 'hora_moldeo'):
+        registro[clave] = borrador[clave].isoformat()
+    registro['codigo_muestra'] = borrador['codigo_muestra'] or None
+    # La base de datos programa un ensayo por cada edad no nula (trigger)
+    registro['otra_edad'] = borrador['otra_edad'] if borrador['edad_otra'] else None
+    registro['probetas'] = [borrador[f'probeta_{i}'] for i in range(1, 5) if borrador[f'probeta_{i}']]
+    registro['usuario'] = st.session_state['usuario'].email
+    return registro
 
 def mostrar_muestreo(supabase):
     """
@@ -16,77 +142,284 @@ def mostrar_muestreo(supabase):
     st.subheader("Registro de Toma de Muestras")
     
     # Pestañas del módulo
-    tab_a, tab_b, tab_c = st.tabs(["📝 Nuevo Registro", "📋 Historial", "🔍 Buscar"])
+    tab_a, tab_b, tab_c, tab_d = st.tabs(["📝 Nuevo Registro", "📋 Historial", "🔍 Buscar", "📥 Importar"])
     
     with tab_a:
         renderizar_formulario_muestreo(supabase)
     
     with tab_b:
-        st.info("📋 Historial de registros - Próximamente")
+        renderizar_historial(supabase)
     
     with tab_c:
-        st.info("🔍 Búsqueda avanzada - Próximamente")
+        renderizar_busqueda(supabase)
+    
+    with tab_d:
+        mostrar_importacion(supabase, 'guias')
+
+@st.fragment
+def renderizar_historial(supabase):
+    """
+    Renderiza el historial de muestreos paginado en la base de datos
+    
+    El ordenamiento, los filtros y la paginación se resuelven en la consulta;
+    solo se descarga la página visible.
+    
+    Args:
+        supabase: Cliente de Supabase
+    """
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        proyecto = st.text_input("Proyecto", key="hist_proyecto", placeholder="Nombre exacto")
+        elemento = st.text_input("Elemento", key="hist_elemento", placeholder="Nombre exacto")
+    with col2:
+        desde = st.date_input("Desde", value=None, key="hist_desde")
+        hasta = st.date_input("Hasta", value=None, key="hist_hasta")
+    with col3:
+        orden = st.selectbox("Ordenar por", list(ORDENES_HISTORIAL), key="hist_orden")
+        descendente = st.toggle("Descendente", value=True, key="hist_desc")
+    with col4:
+        tamaño = st.selectbox("Filas por página", [25, 50, 100], index=1, key="hist_tamano")
+    
+    filtros = {k: v for k, v in (('proyecto', proyecto), ('elemento', elemento)) if v}
+    rangos = {}
+    if desde or hasta:
+        rangos['fecha_vaciado'] = (
+            desde.isoformat() if desde else None,
+            hasta.isoformat() if hasta else None
+        )
+    
+    # Al cambiar la consulta se vuelve a la primera página
+    consulta = (tuple(sorted(filtros.items())), str(rangos), orden, descendente, tamaño)
+    estado = st.session_state.get(CLAVE_HISTORIAL)
+    if estado is None or estado['consulta'] != consulta:
+        estado = st.session_state[CLAVE_HISTORIAL] = {'consulta': consulta, 'cursores': [None]}
+    
+    filas, siguiente = obtener_pagina_muestreos(
+        supabase,
+        cursor=estado['cursores'][-1],
+        columnas=COLUMNAS_HISTORIAL,
+        filtros=filtros,
+        rangos=rangos,
+        orden=ORDENES_HISTORIAL[orden],
+        descendente=descendente,
+        tamaño_pagina=tamaño
+    )
+    
+    if filas:
+        st.dataframe(filas, use_container_width=True, hide_index=True)
+    else:
+        st.info("No hay registros que coincidan con los filtros.")
+    
+    pagina = len(estado['cursores'])
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button(
+            "⬅️ Anterior", disabled=pagina == 1, use_container_width=True, key="hist_anterior",
+            on_click=estado['cursores'].pop
+        )
+    with col2:
+        st.caption(f"Página {pagina}")
+    with col3:
+        st.button(
+            "Siguiente ➡️", disabled=siguiente is None, use_container_width=True, key="hist_siguiente",
+            on_click=estado['cursores'].append, args=(siguiente,)
+        )
+
+@st.fragment
+def renderizar_busqueda(supabase):
+    """
+    Renderiza la búsqueda avanzada de texto libre sobre los muestreos
+    
+    Args:
+        supabase: Cliente de Supabase
+    """
+    texto = st.text_input(
+        "Buscar en todos los proyectos",
+        key="busq_texto",
+        placeholder="Ej: losa unicon, guía 001-2345, segregación..."
+    )
+    st.caption("Busca en proyecto, elemento, ubicación, proveedor, guía de remisión y observaciones.")
+    
+    # Una búsqueda nueva vuelve a la primera página
+    if st.session_state.get('busq_ultima') != texto:
+        st.session_state['busq_ultima'] = texto
+        st.session_state['busq_pagina'] = 0
+    pagina = st.session_state['busq_pagina']
+    
+    if not texto.strip():
+        return
+    
+    filas, hay_mas = buscar_muestreos(
+        supabase, texto, columnas=COLUMNAS_BUSQUEDA, pagina=pagina, tamaño_pagina=TAMAÑO_BUSQUEDA
+    )
+    
+    if filas:
+        st.dataframe(filas, use_container_width=True, hide_index=True)
+    else:
+        st.info("Sin resultados.")
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button(
+            "⬅️ Anterior", disabled=pagina == 0, use_container_width=True, key="busq_anterior",
+            on_click=st.session_state.update, kwargs={'busq_pagina': pagina - 1}
+        )
+    with col2:
+        st.caption(f"Página {pagina + 1}")
+    with col3:
+        st.button(
+            "Siguiente ➡️", disabled=not hay_mas, use_container_width=True, key="busq_siguiente",
+            on_click=st.session_state.update, kwargs={'busq_pagina': pagina + 1}
+        )
+
+def _guardar_registro():
+    """
+    Callback: guarda el borrador y limpia el formulario
+
+    Corre antes de crear los widgets, así el formulario ya aparece vacío
+    en la misma ejecución y nada de lo que se escriba después se pierde.
+    """
+    borrador = obtener_borrador()
+    if not borrador['proyecto']:
+        st.session_state[CLAVE_AVISO] = ('aviso', "⚠️ Ingresa el nombre del proyecto.")
+        return
+    
+    # Se guarda localmente y se sincroniza en segundo plano
+    guardar_muestreo_local(construir_registro_muestreo(borrador))
+    limpiar_borrador()
+    st.session_state[CLAVE_AVISO] = ('exito', "✅ Registro guardado exitosamente")
 
 def renderizar_formulario_muestreo(supabase):
     """
     Renderiza el formulario completo de registro de muestreo
     
+    Cada sección es un fragmento: interactuar con un widget solo vuelve a
+    ejecutar su sección, no el script completo.
+    
     Args:
         supabase: Cliente de Supabase
     """
+    if st.session_state.get(CLAVE_LIMPIAR):
+        limpiar_borrador()
     
-    # SECCIÓN 1: INFORMACIÓN DEL PROYECTO
+    seccion_proyecto()
+    st.divider()
+    seccion_mezcla()
+    st.divider()
+    seccion_suministro()
+    st.divider()
+    seccion_calculadora()
+    st.divider()
+    seccion_probetas(supabase)
+    st.divider()
+    seccion_observaciones()
+    st.divider()
+    
+    # BOTONES DE ACCIÓN
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.button("💾 Guardar Registro", type="primary", use_container_width=True, on_click=_guardar_registro)
+        tipo, mensaje = st.session_state.pop(CLAVE_AVISO, (None, None))
+        if tipo == 'exito':
+            st.success(mensaje)
+            st.balloons()
+        elif tipo:
+            st.warning(mensaje)
+    with col2:
+        if st.button("📄 Generar PDF", use_container_width=True):
+            registro = construir_registro_muestreo(obtener_borrador())
+            st.session_state[CLAVE_PDF] = (
+                obtener_generador_pdf().solicitar(registro),
+                f"{registro['codigo_muestra'] or 'muestreo'}.pdf"
+            )
+        mostrar_descarga_pdf()
+    with col3:
+        if st.button("🔄 Limpiar Formulario", use_container_width=True):
+            st.session_state[CLAVE_LIMPIAR] = True
+            st.rerun()
+
+def mostrar_descarga_pdf():
+    """Muestra el estado del PDF solicitado y el botón de descarga cuando está listo"""
+    if CLAVE_PDF not in st.session_state:
+        return
+    
+    futuro, nombre_archivo = st.session_state[CLAVE_PDF]
+    if not futuro.done():
+        esperar_pdf()
+    elif futuro.exception():
+        st.error(f"Error al generar el PDF: {futuro.exception()}")
+    else:
+        with open(futuro.result(), 'rb') as archivo:
+            st.download_button(
+                "⬇️ Descargar PDF",
+                archivo,
+                file_name=nombre_archivo,
+                mime="application/pdf",
+                use_container_width=True
+            )
+
+@st.fragment(run_every=1)
+def esperar_pdf():
+    """Consulta cada segundo si el PDF terminó, sin bloquear la sesión"""
+    futuro, _ = st.session_state[CLAVE_PDF]
+    if futuro.done():
+        st.rerun()
+    st.info("📄 Generando reporte PDF...")
+
+@st.fragment
+def seccion_proyecto():
+    """SECCIÓN 1: Información del proyecto"""
     st.write("### 📋 Datos del Proyecto")
     col1, col2 = st.columns(2)
     with col1:
-        proyecto = st.text_input("Nombre del Proyecto", placeholder="Ej: Edificio Los Robles")
-        elemento = st.text_input("Elemento Estructural", placeholder="Ej: Losa Nivel 3")
-        ubicacion = st.text_input("Ubicación en Obra", placeholder="Ej: Eje A-B / 1-3")
+        campo(st.text_input, "Nombre del Proyecto", 'proyecto', placeholder="Ej: Edificio Los Robles")
+        campo(st.text_input, "Elemento Estructural", 'elemento', placeholder="Ej: Losa Nivel 3")
+        campo(st.text_input, "Ubicación en Obra", 'ubicacion', placeholder="Ej: Eje A-B / 1-3")
     with col2:
-        fecha_vaciado = st.date_input("Fecha de Vaciado")
-        hora_vaciado = st.time_input("Hora de Vaciado")
-        temperatura = st.number_input("Temperatura Ambiente (°C)", min_value=0.0, max_value=50.0, value=20.0, step=0.5)
-    
-    st.divider()
-    
-    # SECCIÓN 2: DISEÑO DE MEZCLA
+        campo(st.date_input, "Fecha de Vaciado", 'fecha_vaciado')
+        campo(st.time_input, "Hora de Vaciado", 'hora_vaciado')
+        campo(st.number_input, "Temperatura Ambiente (°C)", 'temperatura', min_value=0.0, max_value=50.0, step=0.5)
+
+@st.fragment
+def seccion_mezcla():
+    """SECCIÓN 2: Diseño de mezcla"""
     st.write("### 🧪 Características del Concreto")
     col1, col2, col3 = st.columns(3)
     with col1:
-        fc_diseño = st.number_input("f'c Diseño (kg/cm²)", min_value=100, max_value=500, value=210, step=10)
-        slump_especificado = st.number_input("Slump Especificado (pulg)", min_value=1.0, max_value=10.0, value=4.0, step=0.5)
+        campo(st.number_input, "f'c Diseño (kg/cm²)", 'fc_diseno', min_value=100, max_value=500, step=10)
+        campo(st.number_input, "Slump Especificado (pulg)", 'slump_especificado', min_value=1.0, max_value=10.0, step=0.5)
     with col2:
-        tipo_cemento = st.selectbox("Tipo de Cemento", ["Portland Tipo I", "Portland Tipo II", "Portland Tipo V", "Puzolánico"])
-        tamaño_max = st.selectbox("Tamaño Máximo Agregado", ["3/8\"", "1/2\"", "3/4\"", "1\"", "1 1/2\""])
+        campo(st.selectbox, "Tipo de Cemento", 'tipo_cemento', options=["Portland Tipo I", "Portland Tipo II", "Portland Tipo V", "Puzolánico"])
+        campo(st.selectbox, "Tamaño Máximo Agregado", 'tamano_max_agregado', options=["3/8\"", "1/2\"", "3/4\"", "1\"", "1 1/2\""])
     with col3:
-        relacion_ac = st.number_input("Relación a/c", min_value=0.30, max_value=0.80, value=0.50, step=0.01)
-        aditivo = st.text_input("Aditivo (si aplica)", placeholder="Ej: Plastificante Sika")
-    
-    st.divider()
-    
-    # SECCIÓN 3: INFORMACIÓN DEL PROVEEDOR
+        campo(st.number_input, "Relación a/c", 'relacion_ac', min_value=0.30, max_value=0.80, step=0.01)
+        campo(st.text_input, "Aditivo (si aplica)", 'aditivo', placeholder="Ej: Plastificante Sika")
+
+@st.fragment
+def seccion_suministro():
+    """SECCIÓN 3: Información del proveedor"""
     st.write("### 🚛 Datos del Suministro")
     col1, col2, col3 = st.columns(3)
     with col1:
-        proveedor = st.text_input("Proveedor/Planta", placeholder="Ej: UNICON")
-        guia_remision = st.text_input("Guía de Remisión", placeholder="Nº de guía")
+        campo(st.text_input, "Proveedor/Planta", 'proveedor', placeholder="Ej: UNICON")
+        campo(st.text_input, "Guía de Remisión", 'guia_remision', placeholder="Nº de guía")
     with col2:
-        num_camion = st.text_input("Nº de Camión/Placa", placeholder="Ej: Mixer 05")
-        volumen_pedido = st.number_input("Volumen Pedido (m³)", min_value=0.0, value=8.0, step=0.5)
+        campo(st.text_input, "Nº de Camión/Placa", 'num_camion', placeholder="Ej: Mixer 05")
+        campo(st.number_input, "Volumen Pedido (m³)", 'volumen_pedido', min_value=0.0, step=0.5)
     with col3:
-        hora_salida_planta = st.time_input("Hora Salida Planta")
-        hora_llegada_obra = st.time_input("Hora Llegada Obra")
-    
-    st.divider()
-    
-    # SECCIÓN 4: CALCULADORA DE FRECUENCIA
+        campo(st.time_input, "Hora Salida Planta", 'hora_salida_planta')
+        campo(st.time_input, "Hora Llegada Obra", 'hora_llegada_obra')
+
+@st.fragment
+def seccion_calculadora():
+    """SECCIÓN 4: Calculadora de frecuencia (se recalcula sin rerun completo)"""
     st.write("### 📊 Calculadora de Muestreo")
     st.info("Calcula cuántas muestras necesitas según normativa peruana")
     
     col1, col2 = st.columns(2)
     with col1:
-        volumen_total = st.number_input("Volumen Total a Vaciar (m³)", min_value=0.0, value=100.0, step=1.0)
-        num_camiones = st.number_input("Número de Camiones", min_value=1, value=13, step=1)
+        volumen_total = campo(st.number_input, "Volumen Total a Vaciar (m³)", 'volumen_total', min_value=0.0, step=1.0)
+        num_camiones = campo(st.number_input, "Número de Camiones", 'num_camiones', min_value=1, step=1)
     
     with col2:
         if st.button("🔢 Calcular Muestras Necesarias", type="primary"):
@@ -98,60 +431,73 @@ def renderizar_formulario_muestreo(supabase):
             st.write(f"- Por camiones (cada 5): {resultado['por_camiones']}")
             st.write(f"- Por elemento (cada 50 m³): {resultado['por_elemento']}")
             st.caption("Se aplica el criterio más restrictivo")
+
+def _asignar_codigos(supabase):
+    """Callback: reserva el código de la muestra y sus probetas y los carga en el borrador"""
+    borrador = obtener_borrador()
+    if not borrador['proyecto']:
+        st.warning("⚠️ Ingresa el nombre del proyecto antes de asignar códigos.")
+        return
     
-    st.divider()
+    try:
+        # La cuarta probeta es opcional: se codifica solo si ya se ingresó
+        probetas = 4 if borrador['probeta_4'] else 3
+        codigos = asignar_codigos_muestra(supabase, borrador['fecha_vaciado'], probetas=probetas)[0]
+    except Exception as e:
+        st.error(f"Error al asignar códigos: {e}")
+        return
     
-    # SECCIÓN 5: REGISTRO DE PROBETAS
+    valores = {'codigo_muestra': codigos['codigo_muestra']}
+    for i, codigo in enumerate(codigos['probetas'], start=1):
+        valores[f'probeta_{i}'] = codigo
+    for nombre, valor in valores.items():
+        borrador[nombre] = valor
+        st.session_state[PREFIJO_CAMPO + nombre] = valor
+
+@st.fragment
+def seccion_probetas(supabase):
+    """SECCIÓN 5: Registro de probetas"""
     st.write("### 🧱 Registro de Probetas (Set Completo)")
     
-    num_muestra = st.text_input("Código de Muestra", placeholder="Ej: M-001", key="cod_muestra")
+    col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
+    with col1:
+        campo(st.text_input, "Código de Muestra", 'codigo_muestra', placeholder="Ej: M-20240115-001")
+    with col2:
+        st.button("🔢 Asignar código", on_click=_asignar_codigos, args=(supabase,), use_container_width=True)
     
     col1, col2 = st.columns(2)
     with col1:
         st.write("**Identificación de Probetas (mínimo 3 por set):**")
-        probeta_1 = st.text_input("Probeta 1", placeholder="Ej: P-001-A", key="prob1")
-        probeta_2 = st.text_input("Probeta 2", placeholder="Ej: P-001-B", key="prob2")
-        probeta_3 = st.text_input("Probeta 3", placeholder="Ej: P-001-C", key="prob3")
-        probeta_4 = st.text_input("Probeta 4 (opcional)", placeholder="Ej: P-001-D", key="prob4")
+        campo(st.text_input, "Probeta 1", 'probeta_1', placeholder="Ej: P-001-A")
+        campo(st.text_input, "Probeta 2", 'probeta_2', placeholder="Ej: P-001-B")
+        campo(st.text_input, "Probeta 3", 'probeta_3', placeholder="Ej: P-001-C")
+        campo(st.text_input, "Probeta 4 (opcional)", 'probeta_4', placeholder="Ej: P-001-D")
     
     with col2:
         st.write("**Dimensiones:**")
-        diametro = st.selectbox("Diámetro (cm)", [10, 15], index=1)
-        altura = st.selectbox("Altura (cm)", [20, 30], index=1)
+        campo(st.selectbox, "Diámetro (cm)", 'diametro_cm', options=[10, 15])
+        campo(st.selectbox, "Altura (cm)", 'altura_cm', options=[20, 30])
         
         st.write("**Edades de Ensayo:**")
-        edad_7 = st.checkbox("7 días", value=False)
-        edad_28 = st.checkbox("28 días", value=True)
-        otra_edad = st.number_input("Otra edad (días)", min_value=1, max_value=90, value=14)
-    
-    st.divider()
-    
-    # SECCIÓN 6: OBSERVACIONES
+        campo(st.checkbox, "7 días", 'edad_7')
+        campo(st.checkbox, "28 días", 'edad_28')
+        otra = campo(st.checkbox, "Otra edad", 'edad_otra')
+        campo(st.number_input, "Otra edad (días)", 'otra_edad', min_value=1, max_value=90, disabled=not otra)
+
+@st.fragment
+def seccion_observaciones():
+    """SECCIÓN 6: Observaciones"""
     st.write("### 📝 Observaciones")
-    observaciones = st.text_area(
+    campo(
+        st.text_area,
         "Observaciones del muestreo",
+        'observaciones',
         placeholder="Ej: Concreto con trabajabilidad adecuada, sin segregación...",
         height=100
     )
     
     col1, col2 = st.columns(2)
     with col1:
-        responsable_muestreo = st.text_input("Responsable del Muestreo", placeholder="Nombre del inspector")
+        campo(st.text_input, "Responsable del Muestreo", 'responsable_muestreo', placeholder="Nombre del inspector")
     with col2:
-        hora_moldeo = st.time_input("Hora de Moldeo")
-    
-    st.divider()
-    
-    # BOTONES DE ACCIÓN
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        if st.button("💾 Guardar Registro", type="primary", use_container_width=True):
-            # Aquí se guardará en la base de datos
-            st.success("✅ Registro guardado exitosamente")
-            st.balloons()
-    with col2:
-        if st.button("📄 Generar PDF", use_container_width=True):
-            st.info("📄 Generando reporte PDF...")
-    with col3:
-        if st.button("🔄 Limpiar Formulario", use_container_width=True):
-            st.rerun()
\ No newline at end of file
+        campo(st.time_input, "Hora de Moldeo", 'hora_moldeo')
\ No newline at end of file
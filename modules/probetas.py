@@ -0,0 +1,182 @@
+"""
+Módulo de Probetas en Laboratorio
+Seguimiento y ensayo de probetas de concreto
+"""
+
+import math
+from datetime import date, timedelta
+
+import streamlit as st
+from components.importacion import mostrar_importacion
+from database.aceptacion import obtener_estado_aceptacion
+from database.supabase_client import actualizar_registro, guardar_roturas, obtener_ensayos_programados
+from utils.helpers import calcular_resistencia_promedio, validar_resistencia
+
+# Probetas ensayadas por edad
+PROBETAS_POR_ENSAYO = 3
+
+def mostrar_probetas(supabase):
+    """
+    Renderiza el módulo de Probetas en Laboratorio
+
+    Args:
+        supabase: Cliente de Supabase
+    """
+    st.subheader("Probetas en Laboratorio")
+
+    hoy = date.today()
+    horizonte = st.selectbox("Mostrar ensayos hasta", ["Hoy", "Esta semana", "Próximos 30 días"], index=1)
+    dias = {"Hoy": 0, "Esta semana": 7, "Próximos 30 días": 30}[horizonte]
+    ensayos = obtener_ensayos_programados(supabase, hasta=hoy + timedelta(days=dias))
+
+    tab_a, tab_b, tab_c = st.tabs(["📅 Ensayos Programados", "🔨 Registrar Rotura", "📥 Importar Resultados"])
+
+    with tab_a:
+        renderizar_programados(ensayos, hoy)
+
+    with tab_b:
+        renderizar_registro_rotura(supabase, ensayos, hoy)
+
+    with tab_c:
+        mostrar_importacion(supabase, 'roturas')
+
+def renderizar_programados(ensayos, hoy):
+    """
+    Muestra los ensayos pendientes agrupados por estado
+
+    Args:
+        ensayos (list): Ensayos programados pendientes
+        hoy (date): Fecha de referencia
+    """
+    if not ensayos:
+        st.info("No hay ensayos programados en este periodo.")
+        return
+
+    tabla = []
+    for ensayo in ensayos:
+        if ensayo['fecha_programada'] < hoy.isoformat():
+            estado = "🔴 Vencido"
+        elif ensayo['fecha_programada'] == hoy.isoformat():
+            estado = "🟡 Hoy"
+        else:
+            estado = "🟢 Programado"
+        tabla.append({
+            "Estado": estado,
+            "Fecha": ensayo['fecha_programada'],
+            "Muestra": ensayo['codigo_muestra'],
+            "Proyecto": ensayo['proyecto'],
+            "Edad (días)": ensayo['edad_dias'],
+            "f'c (kg/cm²)": ensayo['fc_diseno']
+        })
+
+    st.dataframe(tabla, use_container_width=True, hide_index=True)
+
+def renderizar_registro_rotura(supabase, ensayos, hoy):
+    """
+    Renderiza el formulario de registro de resultados de rotura
+
+    Args:
+        supabase: Cliente de Supabase
+        ensayos (list): Ensayos programados pendientes
+        hoy (date): Fecha de referencia
+    """
+    pendientes = [e for e in ensayos if e['fecha_programada'] <= hoy.isoformat()]
+    # roturas.codigo_muestra es obligatorio: sin código de muestra no se puede guardar el resultado
+    sin_codigo = sum(1 for e in pendientes if not e['codigo_muestra'])
+    pendientes = [e for e in pendientes if e['codigo_muestra']]
+    if sin_codigo:
+        st.info(
+            f"ℹ️ {sin_codigo} ensayo(s) pendiente(s) sin código de muestra no se pueden registrar. "
+            "Asigna el código (🔢 Asignar código) al registrar el muestreo."
+        )
+    if not pendientes:
+        st.info("No hay ensayos pendientes para hoy.")
+        return
+
+    ensayo = st.selectbox(
+        "Ensayo",
+        pendientes,
+        format_func=lambda e: f"{e['codigo_muestra']} · {e['proyecto']} · {e['edad_dias']} días ({e['fecha_programada']})"
+    )
+
+    with st.form("form_rotura"):
+        st.write(f"**Diámetro:** {ensayo['diametro_cm']} cm · **f'c:** {ensayo['fc_diseno']} kg/cm²")
+        probetas = []
+        for i in range(PROBETAS_POR_ENSAYO):
+            col1, col2 = st.columns(2)
+            with col1:
+                codigo = st.text_input(f"Código probeta {i + 1}", key=f"rotura_codigo_{i}")
+            with col2:
+                carga = st.number_input(f"Carga de rotura {i + 1} (kg)", min_value=0.0, step=100.0, key=f"rotura_carga_{i}")
+            probetas.append((codigo, carga))
+
+        submit = st.form_submit_button("💾 Guardar Resultados", type="primary")
+
+    if submit:
+        registrar_rotura(supabase, ensayo, probetas, hoy)
+
+def registrar_rotura(supabase, ensayo, probetas, fecha_ensayo):
+    """
+    Calcula las resistencias, guarda las roturas y marca el ensayo como completado
+
+    Args:
+        supabase: Cliente de Supabase
+        ensayo (dict): Ensayo programado
+        probetas (list): Pares (código de probeta, carga en kg)
+        fecha_ensayo (date): Fecha de rotura
+    """
+    if not ensayo['codigo_muestra']:
+        st.warning("⚠️ El ensayo no tiene código de muestra: no se puede registrar su rotura.")
+        return
+
+    probetas = [(codigo, carga) for codigo, carga in probetas if codigo and carga > 0]
+    if not probetas:
+        st.warning("⚠️ Ingresa el código y la carga de al menos una probeta.")
+        return
+
+    area = math.pi * float(ensayo['diametro_cm']) ** 2 / 4
+    roturas = [{
+        'codigo_probeta': codigo,
+        'codigo_muestra': ensayo['codigo_muestra'],
+        'proyecto': ensayo['proyecto'],
+        'proveedor': ensayo['proveedor'],
+        'fc_diseno': ensayo['fc_diseno'],
+        'edad_dias': ensayo['edad_dias'],
+        'fecha_ensayo': fecha_ensayo.isoformat(),
+        'carga_kg': carga,
+        'resistencia': round(carga / area, 1),
+        'usuario': st.session_state['usuario'].email
+    } for codigo, carga in probetas]
+
+    if guardar_roturas(supabase, roturas) and actualizar_registro(supabase, 'ensayos_programados', ensayo['id'], {'completado': True}):
+        promedio = calcular_resistencia_promedio([r['resistencia'] for r in roturas])
+        cumple, mensaje = validar_resistencia(promedio, ensayo['fc_diseno'])
+        st.success(f"✅ Resultados guardados · Promedio: {promedio:.1f} kg/cm²")
+        if ensayo['edad_dias'] >= 28:
+            (st.success if cumple else st.error)(mensaje)
+        if ensayo['edad_dias'] == 28:
+            mostrar_estado_aceptacion(supabase, ensayo)
+
+def mostrar_estado_aceptacion(supabase, ensayo):
+    """
+    Muestra el estado ACI 318 del grupo (proyecto, f'c) del ensayo guardado
+
+    Args:
+        supabase: Cliente de Supabase
+        ensayo (dict): Ensayo programado a 28 días
+    """
+    grupo = next((g for g in obtener_estado_aceptacion(supabase, ensayo['proyecto'])
+                  if g['fc_diseño'] == ensayo['fc_diseno']), None)
+    if grupo is None:
+        return
+
+    detalle = f"{grupo['ensayos']} ensayos · f'cr {grupo['fcr']:.1f} kg/cm²"
+    if grupo['promedio_3'] is not None:
+        detalle += f" · Promedio de 3 consecutivos: {grupo['promedio_3']:.1f} kg/cm²"
+    if grupo['conforme']:
+        st.info(f"📐 ACI 318 · {ensayo['proyecto']} f'c {ensayo['fc_diseno']}: conforme ({detalle})")
+    else:
+        st.warning(
+            f"📐 ACI 318 · {ensayo['proyecto']} f'c {ensayo['fc_diseno']}: "
+            f"{grupo['fallas_promedio']} fallas de promedio y {grupo['fallas_individuales']} individuales ({detalle})"
+        )
@@ -0,0 +1,122 @@
+"""
+Módulo de Reportes y Estadísticas
+Reportes de resistencia y control estadístico
+"""
+
+import pandas as pd
+import streamlit as st
+from components.exportacion import mostrar_exportacion
+from database.aceptacion import obtener_estado_aceptacion
+from database.supabase_client import obtener_resumen_resistencias
+from utils.helpers import combinar_resumenes
+
+def mostrar_reportes(supabase):
+    """
+    Renderiza el módulo de reportes de resistencia
+    
+    Args:
+        supabase: Cliente de Supabase
+    """
+    st.subheader("Reportes y Estadísticas")
+    
+    tab_a, tab_b = st.tabs(["📊 Resistencias", "📤 Exportar Datos"])
+    
+    with tab_a:
+        renderizar_resistencias(supabase)
+    
+    with tab_b:
+        mostrar_exportacion(supabase)
+
+def renderizar_resistencias(supabase):
+    """
+    Renderiza el reporte de resistencia por f'c y edad
+    
+    Los datos salen del resumen precalculado por la base de datos; nunca se
+    recorren las roturas individuales.
+    
+    Args:
+        supabase: Cliente de Supabase
+    """
+    resumen = obtener_resumen_resistencias(supabase)
+    if not resumen:
+        st.info("📈 Aún no hay resultados de rotura registrados.")
+        return
+    
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        proyecto = st.selectbox("Proyecto", ["Todos"] + sorted({f['proyecto'] for f in resumen}))
+    with col2:
+        proveedor = st.selectbox("Proveedor", ["Todos"] + sorted({f['proveedor'] for f in resumen}))
+    with col3:
+        clases_fc = sorted({f['fc_diseno'] for f in resumen})
+        fc = st.selectbox("f'c (kg/cm²)", ["Todos"] + clases_fc)
+    
+    filas = [
+        f for f in resumen
+        if proyecto in ("Todos", f['proyecto'])
+        and proveedor in ("Todos", f['proveedor'])
+        and fc in ("Todos", f['fc_diseno'])
+    ]
+    
+    # Agrupación por f'c y edad (las sumas se combinan de forma exacta)
+    grupos = {}
+    for fila in filas:
+        grupos.setdefault((fila['fc_diseno'], fila['edad_dias']), []).append(fila)
+    
+    tabla = []
+    for (fc_diseno, edad), filas_grupo in sorted(grupos.items()):
+        estadisticas = combinar_resumenes(filas_grupo)
+        tabla.append({
+            "f'c (kg/cm²)": fc_diseno,
+            "Edad (días)": edad,
+            "Ensayos": estadisticas['ensayos'],
+            "Promedio (kg/cm²)": round(estadisticas['media'], 1),
+            "Desv. estándar": round(estadisticas['desviacion'], 1) if estadisticas['desviacion'] is not None else None,
+            "Mínimo": round(estadisticas['minimo'], 1),
+            "Máximo": round(estadisticas['maximo'], 1),
+            "% del f'c": round(estadisticas['media'] / fc_diseno * 100, 1),
+            "% que alcanza f'c": round(estadisticas['cumplen'], 1)
+        })
+    
+    st.write("### 📊 Resistencia a la Compresión por Edad")
+    st.dataframe(tabla, use_container_width=True, hide_index=True)
+    
+    st.write("### 📈 Desarrollo de Resistencia (% del f'c)")
+    desarrollo = pd.DataFrame(tabla).pivot(index="Edad (días)", columns="f'c (kg/cm²)", values="% del f'c")
+    desarrollo.columns = [f"f'c {c}" for c in desarrollo.columns]
+    st.line_chart(desarrollo)
+    
+    renderizar_aceptacion(supabase, None if proyecto == "Todos" else proyecto, None if fc == "Todos" else fc)
+
+def _redondear(valor):
+    """Redondea a un decimal conservando los nulos"""
+    return round(valor, 1) if valor is not None else None
+
+def renderizar_aceptacion(supabase, proyecto=None, fc=None):
+    """
+    Renderiza el estado de aceptación ACI 318 de los ensayos a 28 días
+    
+    Args:
+        supabase: Cliente de Supabase
+        proyecto (str, optional): Limitar a un proyecto
+        fc (int, optional): Limitar a una clase de f'c
+    """
+    grupos = [g for g in obtener_estado_aceptacion(supabase, proyecto) if fc in (None, g['fc_diseño'])]
+    if not grupos:
+        return
+    
+    st.write("### 📐 Aceptación ACI 318 (28 días)")
+    st.dataframe([{
+        "Proyecto": g['proyecto'],
+        "f'c (kg/cm²)": g['fc_diseño'],
+        "Ensayos": g['ensayos'],
+        "Promedio (kg/cm²)": _redondear(g['media']),
+        "Desv. estándar": _redondear(g['desviacion']),
+        "CV (%)": _redondear(g['coef_variacion']),
+        "f'cr (kg/cm²)": _redondear(g['fcr']),
+        "Promedio 3 consecutivos": _redondear(g['promedio_3']),
+        "Fallas de promedio": g['fallas_promedio'],
+        "Fallas individuales": g['fallas_individuales'],
+        "Estado": "✅ Conforme" if g['conforme'] else "❌ No conforme"
+    } for g in grupos], use_container_width=True, hide_index=True)
@@ -0,0 +1,16 @@
+"""
+Módulo de Ensayo de Slump
+Registro de ensayos de asentamiento del concreto fresco
+"""
+
+import streamlit as st
+
+def mostrar_slump(supabase):
+    """
+    Renderiza el módulo de Ensayo de Slump
+    
+    Args:
+        supabase: Cliente de Supabase
+    """
+    st.subheader("Ensayo de Slump")
+    st.info("🎯 Ensayo de Slump - Próximamente")
@@ -0,0 +1,225 @@
+"""
+Aceptación de concreto según ACI 318 (E.060)
+Estadísticas acumuladas por proyecto y f'c, actualizadas en O(1) por ensayo
+"""
+
+import math
+import threading
+from collections import deque
+
+# Límites en kg/cm² (equivalentes a 500 psi y 5000 psi)
+TOLERANCIA_INDIVIDUAL = 35
+FC_ALTA_RESISTENCIA = 350
+
+# Factor de corrección de la desviación estándar con menos de 30 ensayos
+FACTORES_DESVIACION = [(15, 1.16), (20, 1.08), (25, 1.03), (30, 1.00)]
+
+def factor_desviacion(num_ensayos):
+    """
+    Retorna el factor de corrección de la desviación estándar
+
+    Args:
+        num_ensayos (int): Número de ensayos (mínimo 15)
+
+    Returns:
+        float: Factor interpolado linealmente entre los valores de la norma
+    """
+    if num_ensayos >= 30:
+        return 1.0
+    for (n1, f1), (n2, f2) in zip(FACTORES_DESVIACION, FACTORES_DESVIACION[1:]):
+        if n1 <= num_ensayos <= n2:
+            return f1 + (f2 - f1) * (num_ensayos - n1) / (n2 - n1)
+    raise ValueError("Se requieren al menos 15 ensayos")
+
+def resistencia_promedio_requerida(fc_diseño, desviacion=None, num_ensayos=0):
+    """
+    Calcula la resistencia promedio requerida f'cr
+
+    Args:
+        fc_diseño (float): Resistencia de diseño en kg/cm²
+        desviacion (float, optional): Desviación estándar de la planta
+        num_ensayos (int): Ensayos con los que se calculó la desviación
+
+    Returns:
+        float: f'cr en kg/cm²
+    """
+    if desviacion is None or num_ensayos < 15:
+        if fc_diseño < 210:
+            return fc_diseño + 70
+        if fc_diseño <= FC_ALTA_RESISTENCIA:
+            return fc_diseño + 84
+        return 1.10 * fc_diseño + 50
+
+    s = desviacion * factor_desviacion(num_ensayos)
+    if fc_diseño <= FC_ALTA_RESISTENCIA:
+        return max(fc_diseño + 1.34 * s, fc_diseño + 2.33 * s - 35)
+    return max(fc_diseño + 1.34 * s, 0.90 * fc_diseño + 2.33 * s)
+
+def minimo_individual(fc_diseño):
+    """
+    Retorna la resistencia mínima aceptable de un ensayo individual
+
+    Args:
+        fc_diseño (float): Resistencia de diseño en kg/cm²
+
+    Returns:
+        float: Mínimo individual en kg/cm²
+    """
+    if fc_diseño <= FC_ALTA_RESISTENCIA:
+        return fc_diseño - TOLERANCIA_INDIVIDUAL
+    return 0.90 * fc_diseño
+
+class EstadoAceptacion:
+    """
+    Estado acumulado de un grupo (proyecto, f'c)
+
+    La media y la desviación se actualizan con el algoritmo de Welford y
+    solo se guardan los tres últimos ensayos, así cada ensayo nuevo cuesta
+    O(1) sin importar el historial.
+    """
+
+    __slots__ = ('fc_diseño', 'n', 'media', 'm2', 'ultimos', 'suma_ultimos',
+                 'fallas_promedio', 'fallas_individuales')
+
+    def __init__(self, fc_diseño):
+        """
+        Args:
+            fc_diseño (float): Resistencia de diseño en kg/cm²
+        """
+        self.fc_diseño = fc_diseño
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.ultimos = deque(maxlen=3)
+        self.suma_ultimos = 0.0
+        self.fallas_promedio = 0
+        self.fallas_individuales = 0
+
+    def agregar(self, resistencia):
+        """
+        Incorpora un ensayo (promedio de las probetas de un set)
+
+        Args:
+            resistencia (float): Resistencia del ensayo en kg/cm²
+
+        Returns:
+            dict: Evaluación del ensayo según ambos criterios de la norma
+        """
+        self.n += 1
+        delta = resistencia - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (resistencia - self.media)
+
+        if len(self.ultimos) == 3:
+            self.suma_ultimos -= self.ultimos[0]
+        self.ultimos.append(resistencia)
+        self.suma_ultimos += resistencia
+
+        promedio_3 = self.suma_ultimos / 3 if len(self.ultimos) == 3 else None
+        cumple_promedio = promedio_3 is None or promedio_3 >= self.fc_diseño
+        cumple_individual = resistencia >= minimo_individual(self.fc_diseño)
+
+        self.fallas_promedio += not cumple_promedio
+        self.fallas_individuales += not cumple_individual
+
+        return {
+            'resistencia': resistencia,
+            'promedio_3': promedio_3,
+            'cumple_promedio': cumple_promedio,
+            'cumple_individual': cumple_individual,
+            'cumple': cumple_promedio and cumple_individual
+        }
+
+    @property
+    def desviacion(self):
+        """Desviación estándar muestral (None con menos de 2 ensayos)"""
+        if self.n < 2:
+            return None
+        return math.sqrt(self.m2 / (self.n - 1))
+
+    def resumen(self):
+        """
+        Retorna las estadísticas acumuladas del grupo
+
+        Returns:
+            dict: Ensayos, media, desviación, coeficiente de variación,
+                  f'cr, promedio de los 3 últimos y número de fallas
+        """
+        desviacion = self.desviacion
+        return {
+            'fc_diseño': self.fc_diseño,
+            'ensayos': self.n,
+            'media': self.media if self.n else None,
+            'desviacion': desviacion,
+            'coef_variacion': desviacion / self.media * 100 if desviacion and self.media else None,
+            'fcr': resistencia_promedio_requerida(self.fc_diseño, desviacion, self.n),
+            'promedio_3': self.suma_ultimos / 3 if len(self.ultimos) == 3 else None,
+            'fallas_promedio': self.fallas_promedio,
+            'fallas_individuales': self.fallas_individuales,
+            'conforme': self.fallas_promedio == 0 and self.fallas_individuales == 0
+        }
+
+class MotorAceptacion:
+    """
+    Motor de aceptación con un estado por proyecto y clase de f'c
+
+    Los ensayos deben registrarse en orden cronológico para que el
+    promedio de tres consecutivos sea el de la norma.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estados = {}
+
+    def registrar_ensayo(self, proyecto, fc_diseño, resistencia):
+        """
+        Registra un ensayo a la edad de diseño
+
+        Args:
+            proyecto (str): Nombre del proyecto
+            fc_diseño (float): Resistencia de diseño en kg/cm²
+            resistencia (float): Resistencia del ensayo en kg/cm²
+
+        Returns:
+            dict: Evaluación del ensayo (ver EstadoAceptacion.agregar)
+        """
+        with self._lock:
+            estado = self._estados.get((proyecto, fc_diseño))
+            if estado is None:
+                estado = self._estados[(proyecto, fc_diseño)] = EstadoAceptacion(fc_diseño)
+            return estado.agregar(resistencia)
+
+    def cargar_historial(self, ensayos):
+        """
+        Inicializa el motor con ensayos existentes
+
+        Args:
+            ensayos (iterable): Tuplas (proyecto, fc_diseño, resistencia) en orden cronológico
+        """
+        for proyecto, fc_diseño, resistencia in ensayos:
+            self.registrar_ensayo(proyecto, fc_diseño, resistencia)
+
+    def resumen(self, proyecto, fc_diseño):
+        """
+        Retorna el estado de aceptación de un grupo
+
+        Args:
+            proyecto (str): Nombre del proyecto
+            fc_diseño (float): Resistencia de diseño en kg/cm²
+
+        Returns:
+            dict: Ver EstadoAceptacion.resumen, o None si no hay ensayos
+        """
+        with self._lock:
+            estado = self._estados.get((proyecto, fc_diseño))
+            return estado.resumen() if estado else None
+
+    def grupos(self):
+        """
+        Retorna los grupos (proyecto, f'c) con ensayos registrados
+
+        Returns:
+            list: Tuplas (proyecto, fc_diseño)
+        """
+        with self._lock:
+            return list(self._estados)
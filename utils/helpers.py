@@ -3,6 +3,14 @@ Funciones auxiliares y utilidades
 Cálculos, validaciones y funciones reutilizables
 """
 
+import numpy as np
+
+# Mensajes de validación (compartidos por las versiones escalares y por lotes)
+MENSAJE_SLUMP_OK = "✅ Slump conforme (diferencia: {:.1f}\")"
+MENSAJE_SLUMP_NO = "❌ Slump fuera de especificación (diferencia: {:.1f}\")"
+MENSAJE_RESISTENCIA_OK = "✅ Concreto conforme ({:.1f}% del f'c)"
+MENSAJE_RESISTENCIA_NO = "❌ Concreto no conforme ({:.1f}% del f'c)"
+
 def calcular_muestras_necesarias(volumen_total, num_camiones):
     """
     Calcula el número de muestras necesarias según normativa peruana
@@ -52,9 +60,9 @@ def validar_slump(slump_medido, slump_especificado, tolerancia=1.5):
     diferencia = abs(slump_medido - slump_especificado)
     
     if diferencia <= tolerancia:
-        return True, f"✅ Slump conforme (diferencia: {diferencia:.1f}\")"
+        return True, MENSAJE_SLUMP_OK.format(diferencia)
     else:
-        return False, f"❌ Slump fuera de especificación (diferencia: {diferencia:.1f}\")"
+        return False, MENSAJE_SLUMP_NO.format(diferencia)
 
 def calcular_resistencia_promedio(resistencias):
     """
@@ -84,9 +92,143 @@ def validar_resistencia(resistencia_promedio, fc_diseño):
     porcentaje = (resistencia_promedio / fc_diseño) * 100
     
     if resistencia_promedio >= fc_diseño:
-        return True, f"✅ Concreto conforme ({porcentaje:.1f}% del f'c)"
+        return True, MENSAJE_RESISTENCIA_OK.format(porcentaje)
     else:
-        return False, f"❌ Concreto no conforme ({porcentaje:.1f}% del f'c)"
+        return False, MENSAJE_RESISTENCIA_NO.format(porcentaje)
+
+def calcular_muestras_necesarias_lote(volumenes_totales, num_camiones):
+    """
+    Versión vectorizada de calcular_muestras_necesarias
+    
+    Args:
+        volumenes_totales (array): Volúmenes de concreto en m³
+        num_camiones (array): Número de camiones de cada vaciado
+    
+    Returns:
+        dict: Arreglos con el desglose de muestras por criterio
+    """
+    volumenes = np.asarray(volumenes_totales, dtype=float)
+    camiones = np.asarray(num_camiones, dtype=float)
+    
+    por_volumen = np.maximum(1, (volumenes / 120).astype(int))
+    por_dia = np.ones_like(por_volumen)
+    por_camiones = np.maximum(1, (camiones / 5).astype(int))
+    por_elemento = np.maximum(1, (volumenes / 50).astype(int))
+    
+    return {
+        'total': np.maximum.reduce([por_volumen, por_dia, por_camiones, por_elemento]),
+        'por_volumen': por_volumen,
+        'por_dia': por_dia,
+        'por_camiones': por_camiones,
+        'por_elemento': por_elemento
+    }
+
+def validar_slump_lote(slumps_medidos, slumps_especificados, tolerancia=1.5):
+    """
+    Versión vectorizada de validar_slump
+    
+    Los mensajes no se construyen aquí; usar mensajes_slump si se necesitan.
+    
+    Args:
+        slumps_medidos (array): Slumps medidos en pulgadas
+        slumps_especificados (array | float): Slumps especificados en pulgadas
+        tolerancia (float): Tolerancia permitida en pulgadas (default: 1.5")
+    
+    Returns:
+        dict: {'cumple': array bool, 'diferencia': array float}
+    """
+    diferencia = np.abs(np.asarray(slumps_medidos, dtype=float) - np.asarray(slumps_especificados, dtype=float))
+    return {'cumple': diferencia <= tolerancia, 'diferencia': diferencia}
+
+def mensajes_slump(resultado):
+    """
+    Genera bajo demanda los mensajes de un resultado de validar_slump_lote
+    
+    Args:
+        resultado (dict): Resultado de validar_slump_lote
+    
+    Yields:
+        str: Mensaje de cada medición
+    """
+    for cumple, diferencia in zip(resultado['cumple'], resultado['diferencia']):
+        yield (MENSAJE_SLUMP_OK if cumple else MENSAJE_SLUMP_NO).format(diferencia)
+
+def calcular_resistencia_promedio_lote(resistencias):
+    """
+    Versión vectorizada de calcular_resistencia_promedio
+    
+    Args:
+        resistencias (array 2D): Una fila por set de probetas; las probetas
+            faltantes se indican con NaN
+    
+    Returns:
+        array: Resistencia promedio de cada set (0 si el set está vacío)
+    """
+    matriz = np.atleast_2d(np.asarray(resistencias, dtype=float))
+    validas = ~np.isnan(matriz)
+    cantidad = validas.sum(axis=1)
+    suma = np.where(validas, matriz, 0.0).sum(axis=1)
+    return np.divide(suma, cantidad, out=np.zeros_like(suma), where=cantidad > 0)
+
+def validar_resistencia_lote(resistencias_promedio, fc_diseño):
+    """
+    Versión vectorizada de validar_resistencia
+    
+    Los mensajes no se construyen aquí; usar mensajes_resistencia si se necesitan.
+    
+    Args:
+        resistencias_promedio (array): Resistencias promedio en kg/cm²
+        fc_diseño (array | float): Resistencias de diseño en kg/cm²
+    
+    Returns:
+        dict: {'cumple': array bool, 'porcentaje': array float}
+    """
+    resistencias = np.asarray(resistencias_promedio, dtype=float)
+    fc = np.asarray(fc_diseño, dtype=float)
+    return {'cumple': resistencias >= fc, 'porcentaje': resistencias / fc * 100}
+
+def mensajes_resistencia(resultado):
+    """
+    Genera bajo demanda los mensajes de un resultado de validar_resistencia_lote
+    
+    Args:
+        resultado (dict): Resultado de validar_resistencia_lote
+    
+    Yields:
+        str: Mensaje de cada set
+    """
+    for cumple, porcentaje in zip(resultado['cumple'], resultado['porcentaje']):
+        yield (MENSAJE_RESISTENCIA_OK if cumple else MENSAJE_RESISTENCIA_NO).format(porcentaje)
+
+def combinar_resumenes(filas):
+    """
+    Combina filas del resumen de resistencias en un solo grupo
+    
+    Args:
+        filas (list): Filas con ensayos, suma, suma_cuadrados, minimo, maximo y cumplen
+    
+    Returns:
+        dict: Ensayos, media, desviación estándar, mínimo, máximo y % que cumple
+    """
+    ensayos = sum(f['ensayos'] for f in filas)
+    if not ensayos:
+        return {'ensayos': 0, 'media': None, 'desviacion': None, 'minimo': None, 'maximo': None, 'cumplen': None}
+    
+    suma = sum(float(f['suma']) for f in filas)
+    suma_cuadrados = sum(float(f['suma_cuadrados']) for f in filas)
+    media = suma / ensayos
+    desviacion = None
+    if ensayos > 1:
+        desviacion = max(0.0, (suma_cuadrados - suma * media) / (ensayos - 1)) ** 0.5
+    
+    return {
+        'ensayos': ensayos,
+        'media': media,
+        'desviacion': desviacion,
+        'minimo': min(float(f['minimo']) for f in filas),
+        'maximo': max(float(f['maximo']) for f in filas),
+        'cumplen': sum(f['cumplen'] for f in filas) / ensayos * 100
+    }
 
 def generar_codigo_muestra(fecha, consecutivo):
     """
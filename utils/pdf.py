@@ -0,0 +1,229 @@
+"""
+Generación de reportes PDF
+Renderiza los PDF en hilos de fondo y los guarda en una caché por contenido
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import streamlit as st
+
+RUTA_CACHE_PDF = Path(__file__).resolve().parent.parent / 'datos_locales' / 'pdf'
+
+# Cambiar al modificar la plantilla para no servir PDFs con el formato anterior
+VERSION_PLANTILLA = 1
+MAX_HILOS = 2
+# Tamaño máximo de la caché en disco; se borran primero los PDFs usados hace más tiempo
+MAX_BYTES_CACHE = 100 * 1024 * 1024
+# Temporales más antiguos que esto quedaron de un renderizado interrumpido
+EDAD_TEMPORAL = 60 * 60
+
+# Secciones del reporte de muestreo: título -> [(etiqueta, campo)]
+SECCIONES_MUESTREO = {
+    "Datos del Proyecto": [
+        ("Proyecto", 'proyecto'), ("Elemento estructural", 'elemento'),
+        ("Ubicación", 'ubicacion'), ("Fecha de vaciado", 'fecha_vaciado'),
+        ("Hora de vaciado", 'hora_vaciado'), ("Temperatura (°C)", 'temperatura')
+    ],
+    "Características del Concreto": [
+        ("f'c diseño (kg/cm²)", 'fc_diseno'), ("Slump especificado (pulg)", 'slump_especificado'),
+        ("Tipo de cemento", 'tipo_cemento'), ("Tamaño máximo agregado", 'tamano_max_agregado'),
+        ("Relación a/c", 'relacion_ac'), ("Aditivo", 'aditivo')
+    ],
+    "Datos del Suministro": [
+        ("Proveedor/Planta", 'proveedor'), ("Guía de remisión", 'guia_remision'),
+        ("Camión/Placa", 'num_camion'), ("Volumen pedido (m³)", 'volumen_pedido'),
+        ("Salida de planta", 'hora_salida_planta'), ("Llegada a obra", 'hora_llegada_obra')
+    ],
+    "Probetas": [
+        ("Código de muestra", 'codigo_muestra'), ("Probetas", 'probetas'),
+        ("Diámetro (cm)", 'diametro_cm'), ("Altura (cm)", 'altura_cm'),
+        ("Ensayo a 7 días", 'edad_7'), ("Ensayo a 28 días", 'edad_28'),
+        ("Otra edad (días)", 'otra_edad'), ("Hora de moldeo", 'hora_moldeo')
+    ],
+    "Observaciones": [
+        ("Observaciones", 'observaciones'), ("Responsable del muestreo", 'responsable_muestreo'),
+        ("Registrado por", 'usuario')
+    ]
+}
+
+def huella_registro(registro):
+    """
+    Calcula la huella de contenido de un registro
+
+    Args:
+        registro (dict): Datos del muestreo
+
+    Returns:
+        str: SHA-256 hexadecimal del registro y la versión de la plantilla
+    """
+    contenido = json.dumps([VERSION_PLANTILLA, registro], sort_keys=True, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+def _texto(valor):
+    """Formatea un valor para el PDF (las fuentes base solo admiten latin-1)"""
+    if isinstance(valor, bool):
+        valor = "Sí" if valor else "No"
+    elif isinstance(valor, (list, tuple)):
+        valor = ", ".join(str(v) for v in valor)
+    elif valor is None or valor == '':
+        valor = "—"
+    return str(valor).replace("—", "-").encode('latin-1', 'replace').decode('latin-1')
+
+def renderizar_pdf_muestreo(registro, ruta):
+    """
+    Renderiza el reporte PDF de un muestreo
+
+    Se ejecuta en un hilo de fondo; escribe a un archivo temporal y lo
+    renombra al final para que nunca se lea un PDF a medio escribir.
+
+    Args:
+        registro (dict): Datos del muestreo
+        ruta (str): Archivo PDF de destino
+
+    Returns:
+        str: Ruta del PDF generado
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF(format='A4')
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font('Helvetica', 'B', 14)
+    pdf.cell(0, 10, _texto("Registro de Toma de Muestras de Concreto"), new_x='LMARGIN', new_y='NEXT', align='C')
+    pdf.set_font('Helvetica', '', 9)
+    pdf.cell(0, 6, _texto(f"Muestra: {registro.get('codigo_muestra') or 'sin código'}"), new_x='LMARGIN', new_y='NEXT', align='C')
+
+    for titulo, campos in SECCIONES_MUESTREO.items():
+        pdf.ln(3)
+        pdf.set_font('Helvetica', 'B', 11)
+        pdf.set_fill_color(240, 242, 246)
+        pdf.cell(0, 8, _texto(titulo), new_x='LMARGIN', new_y='NEXT', fill=True)
+        for etiqueta, clave in campos:
+            pdf.set_font('Helvetica', 'B', 9)
+            pdf.cell(60, 6, _texto(etiqueta))
+            pdf.set_font('Helvetica', '', 9)
+            pdf.multi_cell(0, 6, _texto(registro.get(clave)), new_x='LMARGIN', new_y='NEXT')
+
+    temporal = f"{ruta}.{threading.get_ident()}.tmp"
+    pdf.output(temporal)
+    os.replace(temporal, ruta)
+    return ruta
+
+class GeneradorPdf:
+    """
+    Pool de hilos que renderiza PDFs fuera del hilo de la sesión
+
+    Los PDFs se guardan con el hash de su contenido como nombre, así un
+    reporte sin cambios se sirve de inmediato desde el disco, y dos
+    solicitudes simultáneas del mismo reporte comparten el mismo trabajo.
+    La caché no pasa de max_bytes: cada acierto actualiza la fecha de
+    modificación del archivo y, tras cada renderizado, se borran los PDFs
+    con la fecha más antigua (LRU) hasta volver bajo el límite.
+    """
+
+    def __init__(self, ruta_cache=RUTA_CACHE_PDF, max_hilos=MAX_HILOS, max_bytes=MAX_BYTES_CACHE):
+        """
+        Args:
+            ruta_cache (Path): Carpeta de la caché de PDFs
+            max_hilos (int): Renderizados en paralelo
+            max_bytes (int): Tamaño máximo de la caché en disco
+        """
+        self.ruta_cache = Path(ruta_cache)
+        self.ruta_cache.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix='pdf')
+        self._lock = threading.Lock()
+        self._lock_poda = threading.Lock()
+        self._en_curso = {}
+        self.podar()
+
+    def podar(self):
+        """
+        Reduce la caché a max_bytes borrando los PDFs usados hace más tiempo
+
+        También borra los temporales abandonados por un renderizado interrumpido.
+
+        Returns:
+            int: Bytes liberados
+        """
+        with self._lock_poda:
+            archivos = []
+            liberados = 0
+            limite_temporal = time.time() - EDAD_TEMPORAL
+            for entrada in os.scandir(self.ruta_cache):
+                try:
+                    info = entrada.stat()
+                    if entrada.name.endswith('.pdf'):
+                        archivos.append((info.st_mtime, info.st_size, entrada.path))
+                    elif entrada.name.endswith('.tmp') and info.st_mtime < limite_temporal:
+                        os.remove(entrada.path)
+                        liberados += info.st_size
+                except FileNotFoundError:
+                    continue
+
+            total = sum(tamaño for _, tamaño, _ in archivos)
+            archivos.sort()
+            for _, tamaño, ruta in archivos:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+                total -= tamaño
+                liberados += tamaño
+            return liberados
+
+    def _renderizar(self, registro, ruta):
+        """Renderiza un PDF y poda la caché (en un hilo del pool)"""
+        renderizar_pdf_muestreo(registro, ruta)
+        self.podar()
+        return ruta
+
+    def solicitar(self, registro):
+        """
+        Solicita el PDF de un registro
+
+        Args:
+            registro (dict): Datos del muestreo
+
+        Returns:
+            Future: Se resuelve con la ruta del PDF (ya resuelto si estaba en caché)
+        """
+        huella = huella_registro(registro)
+        ruta = self.ruta_cache / f"{huella}.pdf"
+
+        try:
+            # Marca el acierto como uso reciente para la poda LRU
+            os.utime(ruta)
+        except FileNotFoundError:
+            pass
+        else:
+            futuro = Future()
+            futuro.set_result(str(ruta))
+            return futuro
+
+        with self._lock:
+            futuro = self._en_curso.get(huella)
+            if futuro is None:
+                futuro = self._pool.submit(self._renderizar, registro, str(ruta))
+                self._en_curso[huella] = futuro
+                futuro.add_done_callback(lambda _: self._en_curso.pop(huella, None))
+        return futuro
+
+@st.cache_resource(show_spinner=False)
+def obtener_generador_pdf():
+    """
+    Crea el pool de renderizado de PDFs compartido por todo el proceso
+
+    Returns:
+        GeneradorPdf: Generador de reportes
+    """
+    return GeneradorPdf()
@@ -0,0 +1,285 @@
+"""
+Perfilador de la aplicación
+Mide el tiempo de cada etapa del rerun y de cada consulta, y lo exporta en formato Prometheus
+"""
+
+import functools
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Claves en session_state con las mediciones del rerun en curso y del anterior
+CLAVE_RERUN = '_perfil_rerun'
+CLAVE_RERUN_ANTERIOR = '_perfil_rerun_anterior'
+
+# Límites superiores (segundos) de los buckets de los histogramas
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefijo de las métricas exportadas
+PREFIJO_METRICAS = 'concreto'
+
+# Interfaz del endpoint de métricas: solo local salvo que se configure otra
+DIRECCION_METRICAS = '127.0.0.1'
+
+class Histograma:
+    """Histograma acumulado de duraciones con buckets fijos"""
+
+    __slots__ = ('conteos', 'suma', 'total')
+
+    def __init__(self):
+        self.conteos = [0] * len(BUCKETS)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, segundos):
+        """
+        Agrega una medición
+
+        Args:
+            segundos (float): Duración medida
+        """
+        for i, limite in enumerate(BUCKETS):
+            if segundos <= limite:
+                self.conteos[i] += 1
+                break
+        self.suma += segundos
+        self.total += 1
+
+    def percentil(self, p):
+        """
+        Estima un percentil a partir de los buckets
+
+        Args:
+            p (float): Percentil entre 0 y 1
+
+        Returns:
+            float: Límite superior del bucket que contiene el percentil (None si no hay datos)
+        """
+        if not self.total:
+            return None
+        objetivo = p * self.total
+        acumulado = 0
+        for limite, conteo in zip(BUCKETS, self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return limite
+        return float('inf')
+
+class Perfilador:
+    """
+    Histogramas de duración por tipo (etapa, módulo, consulta) y nombre
+
+    Es compartido por todas las sesiones del proceso; cada medición se
+    guarda además en la lista del rerun en curso de la sesión que la hizo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}
+
+    def observar(self, tipo, nombre, segundos):
+        """
+        Registra una duración
+
+        Args:
+            tipo (str): Tipo de medición (ej: 'etapa', 'consulta')
+            nombre (str): Nombre de la etapa o consulta
+            segundos (float): Duración medida
+        """
+        with self._lock:
+            histograma = self._histogramas.get((tipo, nombre))
+            if histograma is None:
+                histograma = self._histogramas[(tipo, nombre)] = Histograma()
+            histograma.observar(segundos)
+
+    def resumen(self):
+        """
+        Retorna las estadísticas acumuladas de cada medición
+
+        Returns:
+            list: Diccionarios con tipo, nombre, llamadas, promedio y p95 en segundos
+        """
+        with self._lock:
+            return [{
+                'tipo': tipo,
+                'nombre': nombre,
+                'llamadas': h.total,
+                'promedio': h.suma / h.total,
+                'p95': h.percentil(0.95)
+            } for (tipo, nombre), h in sorted(self._histogramas.items())]
+
+    def exportar_prometheus(self):
+        """
+        Exporta los histogramas en el formato de texto de Prometheus
+
+        Returns:
+            str: Un histograma <prefijo>_<tipo>_segundos por tipo, con la etiqueta nombre
+        """
+        with self._lock:
+            por_tipo = {}
+            for (tipo, nombre), h in sorted(self._histogramas.items()):
+                por_tipo.setdefault(tipo, []).append((nombre, h.conteos[:], h.suma, h.total))
+
+        lineas = []
+        for tipo, series in por_tipo.items():
+            metrica = f"{PREFIJO_METRICAS}_{tipo}_segundos"
+            lineas.append(f"# HELP {metrica} Duración de cada {tipo} en segundos")
+            lineas.append(f"# TYPE {metrica} histogram")
+            for nombre, conteos, suma, total in series:
+                etiqueta = _escapar_etiqueta(nombre)
+                acumulado = 0
+                for limite, conteo in zip(BUCKETS, conteos):
+                    acumulado += conteo
+                    lineas.append(f'{metrica}_bucket{{nombre="{etiqueta}",le="{limite}"}} {acumulado}')
+                lineas.append(f'{metrica}_bucket{{nombre="{etiqueta}",le="+Inf"}} {total}')
+                lineas.append(f'{metrica}_sum{{nombre="{etiqueta}"}} {suma}')
+                lineas.append(f'{metrica}_count{{nombre="{etiqueta}"}} {total}')
+        return "\n".join(lineas) + "\n"
+
+def _escapar_etiqueta(valor):
+    """Escapa un valor de etiqueta según el formato de texto de Prometheus"""
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+@st.cache_resource(show_spinner=False)
+def obtener_perfilador():
+    """
+    Crea el perfilador compartido por todo el proceso
+
+    Returns:
+        Perfilador: Perfilador de la aplicación
+    """
+    return Perfilador()
+
+def _mediciones_rerun():
+    """Retorna la lista de mediciones del rerun en curso (None fuera de una sesión)"""
+    if get_script_run_ctx() is None:
+        return None
+    return st.session_state.get(CLAVE_RERUN)
+
+def iniciar_rerun():
+    """
+    Comienza las mediciones de un rerun nuevo
+
+    Las del rerun anterior quedan disponibles para el panel de depuración.
+    """
+    if CLAVE_RERUN in st.session_state:
+        st.session_state[CLAVE_RERUN_ANTERIOR] = st.session_state[CLAVE_RERUN]
+    st.session_state[CLAVE_RERUN] = []
+
+def registrar(tipo, nombre, segundos):
+    """
+    Registra una duración en el histograma del proceso y en el rerun en curso
+
+    Args:
+        tipo (str): Tipo de medición
+        nombre (str): Nombre de la etapa o consulta
+        segundos (float): Duración medida
+    """
+    obtener_perfilador().observar(tipo, nombre, segundos)
+    mediciones = _mediciones_rerun()
+    if mediciones is not None:
+        mediciones.append((tipo, nombre, segundos))
+
+@contextmanager
+def medir(tipo, nombre):
+    """
+    Mide el tiempo de pared de un bloque
+
+    Args:
+        tipo (str): Tipo de medición
+        nombre (str): Nombre de la etapa o consulta
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(tipo, nombre, time.perf_counter() - inicio)
+
+def perfilado(tipo='etapa', nombre=None):
+    """
+    Decorador que mide cada llamada a la función
+
+    Args:
+        tipo (str): Tipo de medición
+        nombre (str, optional): Nombre de la medición (por defecto, el de la función)
+    """
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with medir(tipo, etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def ultimo_rerun():
+    """
+    Retorna las mediciones del último rerun completo de la sesión
+
+    Returns:
+        list: Tuplas (tipo, nombre, segundos) en orden de finalización
+    """
+    return st.session_state.get(CLAVE_RERUN_ANTERIOR, [])
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    """Responde GET /metrics con los histogramas del perfilador"""
+
+    perfilador = None
+    token = None
+
+    def _autorizado(self):
+        """Valida el token Bearer si el endpoint tiene uno configurado"""
+        if not self.token:
+            return True
+        esperado = f"Bearer {self.token}".encode('utf-8')
+        return hmac.compare_digest(self.headers.get('Authorization', '').encode('utf-8'), esperado)
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        if not self._autorizado():
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Bearer')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        cuerpo = self.perfilador.exportar_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+@st.cache_resource(show_spinner=False)
+def iniciar_servidor_metricas(puerto, direccion=DIRECCION_METRICAS, token=None):
+    """
+    Expone /metrics para Prometheus en un hilo aparte (uno por proceso)
+
+    Por defecto solo escucha en la interfaz local; para exponerlo a otra
+    máquina conviene configurar también un token.
+
+    Args:
+        puerto (int): Puerto HTTP del endpoint
+        direccion (str): Interfaz en la que escucha
+        token (str, optional): Token exigido en 'Authorization: Bearer <token>'
+
+    Returns:
+        ThreadingHTTPServer: Servidor en ejecución
+    """
+    manejador = type('ManejadorMetricas', (_ManejadorMetricas,), {
+        'perfilador': obtener_perfilador(),
+        'token': token
+    })
+    servidor = ThreadingHTTPServer((direccion, int(puerto)), manejador)
+    threading.Thread(target=servidor.serve_forever, name='metricas-prometheus', daemon=True).start()
+    return servidor
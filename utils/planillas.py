@@ -0,0 +1,355 @@
+"""
+Planillas de importación
+Lectura por bloques de archivos CSV/XLSX y validación vectorizada de sus columnas
+"""
+
+import csv
+import io
+import re
+import unicodedata
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import mensajes_slump, validar_slump_lote
+
+# Filas por bloque: acota la memoria sin importar el tamaño del archivo
+TAMAÑO_BLOQUE = 5000
+
+# Bytes leídos para detectar la codificación y el separador de un CSV
+MUESTRA_CSV = 64 * 1024
+
+VALORES_VERDADEROS = {'si', 'sí', 's', 'x', '1', 'true', 'verdadero'}
+VALORES_FALSOS = {'no', 'n', '0', 'false', 'falso'}
+
+# Reglas de las guías de remisión, las mismas del formulario de muestreo.
+# tipo: texto | numero | entero | fecha | hora | booleano
+GUIAS = {
+    'proyecto': {'tipo': 'texto', 'requerida': True},
+    'elemento': {'tipo': 'texto'},
+    'ubicacion': {'tipo': 'texto'},
+    'fecha_vaciado': {'tipo': 'fecha', 'requerida': True},
+    'hora_vaciado': {'tipo': 'hora'},
+    'temperatura': {'tipo': 'numero', 'rango': (0.0, 50.0)},
+    'fc_diseno': {'tipo': 'entero', 'requerida': True, 'rango': (100, 500)},
+    'slump_especificado': {'tipo': 'numero', 'requerida': True, 'rango': (1.0, 10.0)},
+    'slump_medido': {'tipo': 'numero', 'rango': (0.0, 12.0)},
+    'tipo_cemento': {'tipo': 'texto'},
+    'tamano_max_agregado': {'tipo': 'texto'},
+    'relacion_ac': {'tipo': 'numero', 'rango': (0.30, 0.80)},
+    'aditivo': {'tipo': 'texto'},
+    'proveedor': {'tipo': 'texto', 'requerida': True},
+    'guia_remision': {'tipo': 'texto', 'requerida': True},
+    'num_camion': {'tipo': 'texto'},
+    'volumen_pedido': {'tipo': 'numero', 'rango': (0.0, None)},
+    'hora_salida_planta': {'tipo': 'hora'},
+    'hora_llegada_obra': {'tipo': 'hora'},
+    'codigo_muestra': {'tipo': 'texto'},
+    'probeta_1': {'tipo': 'texto'},
+    'probeta_2': {'tipo': 'texto'},
+    'probeta_3': {'tipo': 'texto'},
+    'probeta_4': {'tipo': 'texto'},
+    'diametro_cm': {'tipo': 'entero', 'opciones': (10, 15), 'defecto': 15},
+    'altura_cm': {'tipo': 'entero', 'opciones': (20, 30), 'defecto': 30},
+    'edad_7': {'tipo': 'booleano', 'defecto': False},
+    'edad_28': {'tipo': 'booleano', 'defecto': True},
+    'otra_edad': {'tipo': 'entero', 'rango': (1, 90)},
+    'observaciones': {'tipo': 'texto'},
+    'responsable_muestreo': {'tipo': 'texto'},
+    'hora_moldeo': {'tipo': 'hora'}
+}
+
+# Reglas de las planillas de rotura del laboratorio
+ROTURAS = {
+    'codigo_probeta': {'tipo': 'texto', 'requerida': True},
+    'codigo_muestra': {'tipo': 'texto', 'requerida': True},
+    'edad_dias': {'tipo': 'entero', 'requerida': True, 'rango': (1, 90)},
+    'fecha_ensayo': {'tipo': 'fecha', 'requerida': True},
+    'carga_kg': {'tipo': 'numero', 'requerida': True, 'rango': (0.0, None), 'positivo': True},
+    'diametro_cm': {'tipo': 'entero', 'opciones': (10, 15)}
+}
+
+# Encabezados frecuentes en las planillas -> columna
+ALIAS = {
+    'obra': 'proyecto',
+    'fecha': 'fecha_vaciado',
+    'fecha_de_vaciado': 'fecha_vaciado',
+    'hora': 'hora_vaciado',
+    'fc': 'fc_diseno',
+    'f_c': 'fc_diseno',
+    'f_c_diseno': 'fc_diseno',
+    'slump': 'slump_medido',
+    'asentamiento': 'slump_medido',
+    'a_c': 'relacion_ac',
+    'relacion_a_c': 'relacion_ac',
+    'temperatura_c': 'temperatura',
+    'planta': 'proveedor',
+    'guia': 'guia_remision',
+    'guia_de_remision': 'guia_remision',
+    'n_guia': 'guia_remision',
+    'placa': 'num_camion',
+    'camion': 'num_camion',
+    'volumen': 'volumen_pedido',
+    'muestra': 'codigo_muestra',
+    'probeta': 'codigo_probeta',
+    'edad': 'edad_dias',
+    'carga': 'carga_kg',
+    'diametro': 'diametro_cm'
+}
+
+def normalizar_columna(nombre):
+    """
+    Convierte un encabezado de planilla en nombre de columna
+
+    Ej: "F'c Diseño" -> 'f_c_diseno', "Guía de Remisión" -> 'guia_remision'
+
+    Args:
+        nombre: Encabezado tal como viene en el archivo
+
+    Returns:
+        str: Nombre normalizado (con los alias aplicados)
+    """
+    texto = unicodedata.normalize('NFKD', str(nombre or '')).encode('ascii', 'ignore').decode()
+    texto = re.sub(r'[^0-9a-z]+', '_', texto.lower()).strip('_')
+    texto = ALIAS.get(texto, texto)
+    if texto in GUIAS or texto in ROTURAS:
+        return texto
+
+    # Encabezados con unidad, ej: "Volumen (m³)" o "Edad (días)"
+    sin_unidad = re.sub(r'_(kg_cm2|cm|kg|m3|pulg|dias)$', '', texto)
+    return ALIAS.get(sin_unidad, sin_unidad)
+
+def _celda_a_texto(valor):
+    """Convierte una celda de Excel al texto que tendría en un CSV"""
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.date().isoformat() if valor.time() == time() else valor.isoformat(sep=' ')
+    if isinstance(valor, (date, time)):
+        return valor.isoformat()
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def _bloque(filas, encabezado, inicio):
+    """Arma un DataFrame de texto con el número de fila de la planilla como índice"""
+    bloque = pd.DataFrame(filas, columns=encabezado, dtype=object)
+    bloque.index = pd.RangeIndex(inicio, inicio + len(bloque))
+    bloque = bloque.loc[:, ~bloque.columns.duplicated()]
+    return bloque[(bloque != '').any(axis=1)]
+
+def _leer_csv(archivo, tamaño):
+    """Lee un CSV por bloques detectando la codificación y el separador"""
+    muestra = archivo.read(MUESTRA_CSV)
+    archivo.seek(0)
+    try:
+        muestra.decode('utf-8')
+        codificacion = 'utf-8-sig'
+    except UnicodeDecodeError:
+        codificacion = 'cp1252'
+    try:
+        separador = csv.Sniffer().sniff(muestra.decode(codificacion, errors='ignore'), delimiters=',;\t').delimiter
+    except csv.Error:
+        separador = ','
+
+    lector = pd.read_csv(
+        archivo, sep=separador, encoding=codificacion, dtype=str,
+        keep_default_na=False, chunksize=tamaño, skip_blank_lines=True
+    )
+    for bloque in lector:
+        # Fila 1 = encabezado
+        yield _bloque(bloque.to_numpy(), [normalizar_columna(c) for c in bloque.columns], bloque.index[0] + 2)
+
+def _leer_xlsx(archivo, tamaño):
+    """Lee la primera hoja de un XLSX fila por fila (modo de solo lectura)"""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = [normalizar_columna(c) for c in next(filas, ())]
+        inicio, bloque = 2, []
+        for fila in filas:
+            bloque.append([_celda_a_texto(v) for v in fila[:len(encabezado)]])
+            if len(bloque) >= tamaño:
+                yield _bloque(bloque, encabezado, inicio)
+                inicio, bloque = inicio + len(bloque), []
+        if bloque:
+            yield _bloque(bloque, encabezado, inicio)
+    finally:
+        libro.close()
+
+def leer_por_bloques(archivo, nombre, tamaño=TAMAÑO_BLOQUE):
+    """
+    Lee una planilla CSV o XLSX por bloques sin cargarla completa
+
+    Args:
+        archivo: Archivo binario (ej: el de st.file_uploader)
+        nombre (str): Nombre del archivo (define el formato por su extensión)
+        tamaño (int): Filas por bloque
+
+    Yields:
+        DataFrame: Bloque con columnas normalizadas, valores como texto
+        e índice igual al número de fila en la planilla
+    """
+    archivo.seek(0)
+    if nombre.lower().endswith('.xlsx'):
+        yield from _leer_xlsx(archivo, tamaño)
+    else:
+        yield from _leer_csv(archivo, tamaño)
+
+def columnas_faltantes(bloque, reglas):
+    """
+    Retorna las columnas obligatorias que no están en la planilla
+
+    Args:
+        bloque (DataFrame): Primer bloque de la planilla
+        reglas (dict): Reglas de validación (GUIAS o ROTURAS)
+
+    Returns:
+        list: Columnas obligatorias ausentes
+    """
+    return [c for c, regla in reglas.items() if regla.get('requerida') and c not in bloque.columns]
+
+def _convertir(texto, regla):
+    """
+    Convierte una columna de texto según su tipo
+
+    Returns:
+        tuple: (Series convertida, máscara de valores no interpretables)
+    """
+    tipo = regla['tipo']
+    vacia = texto == ''
+
+    if tipo == 'texto':
+        return texto.where(~vacia, None), np.zeros(len(texto), dtype=bool)
+
+    if tipo in ('numero', 'entero'):
+        valores = pd.to_numeric(texto.str.replace(',', '.', regex=False), errors='coerce')
+        invalidos = ~vacia & valores.isna()
+        if tipo == 'entero':
+            invalidos |= valores.notna() & (valores % 1 != 0)
+        return valores, invalidos.to_numpy()
+
+    if tipo == 'fecha':
+        fechas = texto.str[:10]
+        valores = pd.to_datetime(fechas, format='%Y-%m-%d', errors='coerce')
+        pendientes = ~vacia & valores.isna()
+        valores[pendientes] = pd.to_datetime(fechas[pendientes], format='%d/%m/%Y', errors='coerce')
+        return valores.dt.strftime('%Y-%m-%d').where(valores.notna(), None), (~vacia & valores.isna()).to_numpy()
+
+    if tipo == 'hora':
+        valores = pd.to_datetime(texto.str[:5], format='%H:%M', errors='coerce')
+        return valores.dt.strftime('%H:%M:%S').where(valores.notna(), None), (~vacia & valores.isna()).to_numpy()
+
+    # booleano
+    minusculas = texto.str.lower()
+    verdaderos = minusculas.isin(VALORES_VERDADEROS)
+    falsos = minusculas.isin(VALORES_FALSOS)
+    valores = pd.Series(np.where(verdaderos, True, np.where(falsos, False, None)), index=texto.index, dtype=object)
+    return valores.where(~vacia, None), (~vacia & ~verdaderos & ~falsos).to_numpy()
+
+def validar_bloque(bloque, reglas):
+    """
+    Valida y convierte un bloque completo, columna por columna
+
+    Los errores descartan la fila; las advertencias (slump fuera de
+    especificación) se informan pero la fila se guarda.
+
+    Args:
+        bloque (DataFrame): Bloque leído con leer_por_bloques
+        reglas (dict): Reglas de validación (GUIAS o ROTURAS)
+
+    Returns:
+        tuple: (DataFrame con las filas válidas ya convertidas,
+                errores [(fila, columna, mensaje)], advertencias [(fila, columna, mensaje)])
+    """
+    errores = []
+    validos = np.ones(len(bloque), dtype=bool)
+    convertido = pd.DataFrame(index=bloque.index)
+
+    def registrar(mascara, columna, mensaje, texto):
+        nonlocal validos
+        if mascara.any():
+            validos &= ~mascara
+            errores.extend((fila, columna, f"{mensaje}: '{valor}'" if valor else mensaje)
+                           for fila, valor in zip(bloque.index[mascara], texto[mascara]))
+
+    for columna, regla in reglas.items():
+        if columna in bloque.columns:
+            texto = bloque[columna].fillna('').astype(str).str.strip()
+        else:
+            texto = pd.Series('', index=bloque.index, dtype=object)
+        vacia = (texto == '').to_numpy()
+
+        if regla.get('requerida'):
+            registrar(vacia, columna, "Campo obligatorio", texto)
+
+        valores, invalidos = _convertir(texto, regla)
+        registrar(invalidos, columna, f"Valor no válido ({regla['tipo']})", texto)
+
+        if 'rango' in regla:
+            minimo, maximo = regla['rango']
+            fuera = valores.notna() & ((valores < minimo if minimo is not None else False) |
+                                       (valores > maximo if maximo is not None else False))
+            if regla.get('positivo'):
+                fuera |= valores.notna() & (valores <= 0)
+            limites = f"{minimo if minimo is not None else '−∞'}–{maximo if maximo is not None else '∞'}"
+            registrar(fuera.to_numpy(), columna, f"Fuera de rango ({limites})", texto)
+
+        if 'opciones' in regla:
+            fuera = valores.notna() & ~valores.isin(regla['opciones'])
+            registrar(fuera.to_numpy(), columna, f"Valor no permitido ({', '.join(map(str, regla['opciones']))})", texto)
+
+        if 'defecto' in regla:
+            valores = valores.where(~vacia, regla['defecto'])
+
+        if regla['tipo'] == 'entero':
+            valores = valores.where(valores % 1 == 0).astype('Int64')
+        convertido[columna] = valores
+
+    advertencias = []
+    if 'slump_medido' in reglas:
+        medido = convertido['slump_medido']
+        con_slump = (validos & medido.notna() & convertido['slump_especificado'].notna()).to_numpy()
+        if con_slump.any():
+            resultado = validar_slump_lote(medido[con_slump], convertido['slump_especificado'][con_slump])
+            advertencias = [
+                (fila, 'slump_medido', mensaje)
+                for fila, cumple, mensaje in zip(bloque.index[con_slump], resultado['cumple'], mensajes_slump(resultado))
+                if not cumple
+            ]
+
+    errores.sort(key=lambda e: e[0])
+    return convertido[validos], errores, advertencias
+
+def a_registros(filas):
+    """
+    Convierte un DataFrame validado en diccionarios serializables a JSON
+
+    Args:
+        filas (DataFrame): Filas válidas
+
+    Returns:
+        list: Un dict por fila, con None en lugar de valores vacíos
+    """
+    return filas.astype(object).where(filas.notna(), None).to_dict('records')
+
+def reporte_csv(errores, advertencias=()):
+    """
+    Genera el reporte de errores por fila en formato CSV
+
+    Args:
+        errores (list): Tuplas (fila, columna, mensaje)
+        advertencias (list): Tuplas (fila, columna, mensaje)
+
+    Returns:
+        bytes: CSV con BOM para que Excel lo abra con tildes
+    """
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(["Fila", "Columna", "Tipo", "Mensaje"])
+    filas = [(f, c, "Error", m) for f, c, m in errores] + [(f, c, "Advertencia", m) for f, c, m in advertencias]
+    escritor.writerows(sorted(filas, key=lambda f: f[0]))
+    return salida.getvalue().encode('utf-8-sig')